@@ -0,0 +1,185 @@
+# analytics.py
+# Precomputed circulation summaries and the reports built on them
+
+import logging
+from typing import Any, List, Tuple
+
+from archive import HISTORY_VIEW
+from profiling import profiled
+
+# Summary tables. Each is keyed so that an issue or return touches exactly one row per table.
+SUMMARY_TABLES_DDL: Tuple[str, ...] = (
+    """
+    CREATE TABLE book_circulation (
+        BookID INT PRIMARY KEY,
+        times_issued INT NOT NULL DEFAULT 0,
+        last_issued DATE
+    )
+    """,
+    "CREATE INDEX idx_book_circulation_rank ON book_circulation (times_issued, BookID)",
+    """
+    CREATE TABLE member_circulation (
+        MemberID INT PRIMARY KEY,
+        times_borrowed INT NOT NULL DEFAULT 0,
+        last_borrowed DATE
+    )
+    """,
+    "CREATE INDEX idx_member_circulation_rank ON member_circulation (times_borrowed, MemberID)",
+    """
+    CREATE TABLE genre_circulation (
+        Genre VARCHAR(50) PRIMARY KEY,
+        times_issued INT NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE daily_circulation (
+        Day DATE PRIMARY KEY,
+        issues INT NOT NULL DEFAULT 0,
+        returns INT NOT NULL DEFAULT 0
+    )
+    """,
+)
+
+# Full rebuild of the summary tables, reading the loans from {source}
+_REBUILD_TEMPLATES: Tuple[str, ...] = (
+    "DELETE FROM book_circulation",
+    "DELETE FROM member_circulation",
+    "DELETE FROM genre_circulation",
+    "DELETE FROM daily_circulation",
+    """
+    INSERT INTO book_circulation (BookID, times_issued, last_issued)
+    SELECT BookID, COUNT(*), MAX(IssueDate) FROM {source} GROUP BY BookID
+    """,
+    """
+    INSERT INTO member_circulation (MemberID, times_borrowed, last_borrowed)
+    SELECT MemberID, COUNT(*), MAX(IssueDate) FROM {source} GROUP BY MemberID
+    """,
+    """
+    INSERT INTO genre_circulation (Genre, times_issued)
+    SELECT COALESCE(b.Genre, ''), COUNT(*)
+    FROM {source} t JOIN books b ON t.BookID = b.ID
+    GROUP BY COALESCE(b.Genre, '')
+    """,
+    """
+    INSERT INTO daily_circulation (Day, issues, returns)
+    SELECT Day, SUM(issued), SUM(returned)
+    FROM (
+        SELECT IssueDate AS Day, 1 AS issued, 0 AS returned FROM {source} WHERE IssueDate IS NOT NULL
+        UNION ALL
+        SELECT ReturnDate, 0, 1 FROM {source} WHERE ReturnDate IS NOT NULL
+    ) AS events
+    GROUP BY Day
+    """,
+)
+
+
+def rebuild_statements(source: str) -> Tuple[str, ...]:
+    """Full rebuild of the summary tables from ``source``, a table or view of loans."""
+    return tuple(statement.format(source=source) for statement in _REBUILD_TEMPLATES)
+
+
+# Backfill when the tables are created, before any loans were archived
+REBUILD_STATEMENTS = rebuild_statements("transactions")
+
+TOP_BOOKS_QUERY = """
+    SELECT b.title, b.Author, c.times_issued
+    FROM book_circulation c
+    JOIN books b ON b.ID = c.BookID
+    ORDER BY c.times_issued DESC, c.BookID DESC
+    LIMIT %s
+"""
+TOP_BORROWERS_QUERY = """
+    SELECT CONCAT(m.FirstName, ' ', m.LastName), m.Email, c.times_borrowed, c.last_borrowed
+    FROM member_circulation c
+    JOIN members m ON m.ID = c.MemberID
+    ORDER BY c.times_borrowed DESC, c.MemberID DESC
+    LIMIT %s
+"""
+TOP_GENRES_QUERY = """
+    SELECT Genre, times_issued FROM genre_circulation
+    ORDER BY times_issued DESC, Genre
+    LIMIT %s
+"""
+BUSIEST_DAYS_QUERY = """
+    SELECT Day, issues, returns, issues + returns AS total
+    FROM daily_circulation
+    ORDER BY total DESC, Day DESC
+    LIMIT %s
+"""
+
+
+class CirculationAnalytics:
+    """Maintains the circulation summary tables and serves top-N reports from them.
+
+    ``record_issue``/``record_return`` run on the caller's transaction cursor so
+    the summaries commit or roll back together with the loan itself. The
+    shared genre and daily rows are updated last to keep their locks short.
+    """
+
+    def __init__(self, lms: Any):
+        self.lms = lms
+        self.logger = logging.getLogger(__name__)
+        upsert = lms.backend.upsert
+        self._book_upsert = upsert(
+            "book_circulation", "BookID", "(BookID, times_issued, last_issued) VALUES (%s, 1, CURDATE())",
+            "times_issued = times_issued + 1, last_issued = CURDATE()")
+        self._member_upsert = upsert(
+            "member_circulation", "MemberID", "(MemberID, times_borrowed, last_borrowed) VALUES (%s, 1, CURDATE())",
+            "times_borrowed = times_borrowed + 1, last_borrowed = CURDATE()")
+        self._genre_upsert = upsert(
+            "genre_circulation", "Genre",
+            "(Genre, times_issued) SELECT COALESCE(Genre, ''), 1 FROM books WHERE ID = %s",
+            "times_issued = times_issued + 1")
+        self._issue_day_upsert = upsert(
+            "daily_circulation", "Day", "(Day, issues, returns) VALUES (CURDATE(), 1, 0)",
+            "issues = issues + 1")
+        self._return_day_upsert = upsert(
+            "daily_circulation", "Day", "(Day, issues, returns) VALUES (CURDATE(), 0, 1)",
+            "returns = returns + 1")
+
+    @property
+    def profiler(self) -> Any:
+        return self.lms.profiler
+
+    def record_issue(self, cursor: Any, book_id: int, member_id: int) -> None:
+        """Count a new loan in every summary (call inside the issuing transaction)."""
+        cursor.execute(self._book_upsert, (book_id,))
+        cursor.execute(self._member_upsert, (member_id,))
+        cursor.execute(self._genre_upsert, (book_id,))
+        cursor.execute(self._issue_day_upsert)
+
+    def record_return(self, cursor: Any) -> None:
+        """Count a return in the daily rollup (call inside the returning transaction)."""
+        cursor.execute(self._return_day_upsert)
+
+    @profiled("rebuild")
+    def rebuild(self) -> None:
+        """Recompute every summary table from the full transaction history, archive included."""
+        with self.lms.transaction() as cursor:
+            for statement in rebuild_statements(HISTORY_VIEW):
+                cursor.execute(statement)
+        self.logger.info("Circulation summaries rebuilt from transactions")
+
+    def _top(self, query: str, limit: int) -> List[Tuple]:
+        rows = self.lms.execute_query(query, (limit,), fetch=True)
+        return rows if isinstance(rows, list) else []
+
+    @profiled("top_books")
+    def top_books(self, limit: int = 5) -> List[Tuple]:
+        """(title, author, times issued) of the most issued books."""
+        return self._top(TOP_BOOKS_QUERY, limit)
+
+    @profiled("top_borrowers")
+    def top_borrowers(self, limit: int = 5) -> List[Tuple]:
+        """(name, email, loans, last loan date) of the most active members."""
+        return self._top(TOP_BORROWERS_QUERY, limit)
+
+    @profiled("top_genres")
+    def top_genres(self, limit: int = 5) -> List[Tuple]:
+        """(genre, times issued) ordered by circulation."""
+        return self._top(TOP_GENRES_QUERY, limit)
+
+    @profiled("busiest_days")
+    def busiest_days(self, limit: int = 5) -> List[Tuple]:
+        """(day, issues, returns, total) for the days with the most circulation."""
+        return self._top(BUSIEST_DAYS_QUERY, limit)
@@ -4,55 +4,230 @@ Library Management System
 A comprehensive Python + MySQL application for managing books, members, and transactions.
 """
 
-import mysql.connector
-from mysql.connector import Error
+from contextlib import contextmanager
 from datetime import datetime
 import logging
-from typing import Optional, List, Tuple, Union
-import sys
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, List, Tuple, Union
 
 # Import configuration
-from config import DB_CONFIG, APP_CONFIG, LOG_CONFIG
+from config import DB_BACKEND, DB_CONFIG, SQLITE_CONFIG, APP_CONFIG, LOG_CONFIG, CACHE_CONFIG
+from backends import StorageBackend, get_backend
+from cache import LRUCache
+from analytics import CirculationAnalytics
+from archive import HISTORY_VIEW, TransactionArchive
+from db_pool import ConnectionPool, PoolTimeoutError, split_pool_config
+from logging_setup import configure_logging
+from profiling import QueryProfiler, profiled
+from search_index import (CATALOG_BUMP_QUERY, CATALOG_CHANGE_INSERT_QUERY, CATALOG_CHANGES_QUERY,
+                          CATALOG_STATE_QUERY, BookSearchIndex)
+from errors import CirculationError, LibraryError
+from holds import HoldQueue
+from inventory import Inventory
+from member_status import MemberStatus
+
+
+def validation_error(value: str, field_type: str, required: bool = True) -> Optional[str]:
+    """Check a value against the rules for its field type; return an error message or None."""
+    if required and not value.strip():
+        return f"{field_type} is required and cannot be empty."
+        
+    if field_type == "email" and value:
+        if "@" not in value or "." not in value:
+            return "Invalid email format."
+            
+    if field_type == "phone" and value:
+        if not value.isdigit() or len(value) < 10:
+            return "Phone number must be at least 10 digits."
+            
+    if field_type == "year" and value:
+        try:
+            year = int(value)
+            if year < 1000 or year > datetime.now().year + 1:
+                return "Invalid year."
+        except ValueError:
+            return "Year must be a number."
+            
+    if field_type == "price" and value:
+        try:
+            price = float(value)
+            if price <= 0:
+                return "Price must be greater than 0."
+        except ValueError:
+            return "Price must be a number."
+    
+    if field_type == "id" and value:
+        if not value.isdigit() or int(value) <= 0:
+            return "ID must be a positive whole number."
+    
+    if field_type == "date" and value:
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            return "Date must be in YYYY-MM-DD format."
+    
+    if field_type == "flag" and value:
+        if value.strip().lower() not in ("0", "1", "y", "n", "yes", "no", "true", "false"):
+            return "Flag must be yes/no, true/false or 1/0."
+    
+    if field_type == "amount" and value:
+        try:
+            if float(value) < 0:
+                return "Amount cannot be negative."
+        except ValueError:
+            return "Amount must be a number."
+            
+    return None
+
 
 class LibraryManagementSystem:
     """Main class for Library Management System operations."""
     
-    def __init__(self):
-        """Initialize the Library Management System."""
+    # Circulation statements, kept here so tooling (e.g. EXPLAIN checks) can reuse them
+    ISSUE_INSERT_QUERY = """
+        INSERT INTO transactions (BookID, MemberID, CopyID, IssueDate) VALUES (%s, %s, %s, CURDATE())
+    """
+    RETURN_UPDATE_QUERY = """
+        UPDATE transactions
+        SET ReturnDate = CURDATE(),
+            FineAmount = CASE
+                WHEN DATEDIFF(CURDATE(), IssueDate) > %s
+                THEN (DATEDIFF(CURDATE(), IssueDate) - %s) * %s
+                ELSE 0
+            END
+        WHERE ID = %s AND ReturnDate IS NULL
+    """
+    TRANSACTIONS_SELECT = """
+        SELECT 
+            t.ID AS TransactionID,
+            b.title AS BookTitle,
+            CONCAT(m.FirstName, ' ', m.LastName) AS MemberName,
+            t.IssueDate,
+            t.ReturnDate,
+            t.FineAmount,
+            CASE 
+                WHEN t.ReturnDate IS NULL THEN 'Issued'
+                ELSE 'Returned'
+            END AS Status
+        FROM transactions t
+        JOIN books b ON t.BookID = b.ID
+        JOIN members m ON t.MemberID = m.ID
+    """
+    TRANSACTIONS_QUERY = TRANSACTIONS_SELECT + "ORDER BY t.IssueDate DESC, t.ID DESC"
+    # Keyset listings: (select, sort columns, positions of the sort columns in a row, descending)
+    LISTINGS = {
+        "books": ("SELECT b.ID, b.title, b.Author, b.Genre, b.PublishedYear, b.Price, "
+                  "i.available_copies, i.total_copies "
+                  "FROM books b LEFT JOIN book_inventory i ON i.BookID = b.ID",
+                  ("b.title", "b.ID"), (1, 0), False),
+        "members": ("SELECT ID, FirstName, LastName, Email, Phone FROM members",
+                    ("LastName", "FirstName", "ID"), (2, 1, 0), False),
+        "transactions": (TRANSACTIONS_SELECT, ("t.IssueDate", "t.ID"), (3, 0), True),
+    }
+    # Listings whose older rows live in an archive table: the same select over the archive
+    ARCHIVED_LISTINGS = {
+        "transactions": TRANSACTIONS_SELECT.replace("FROM transactions t", "FROM transactions_archive t"),
+    }
+    BOOK_COLUMNS = {"title": ("title", "title"), "author": ("Author", "author"), "genre": ("Genre", "genre"),
+                    "year": ("PublishedYear", "year"), "price": ("Price", "price")}
+    SEARCHED_BOOK_FIELDS = frozenset({"title", "author", "genre"})
+    BOOK_INSERT_QUERY = "INSERT INTO books (title, Author, Genre, PublishedYear, Price) VALUES (%s, %s, %s, %s, %s)"
+    BOOK_SELECT_COLUMNS = "ID, title, Author, Genre, PublishedYear, Price"
+    RETURN_DETAILS_QUERY = "SELECT BookID, MemberID, CopyID, FineAmount FROM transactions WHERE ID = %s"
+    # Does the member already have this title on loan? A seek into (MemberID, ReturnDate)
+    OPEN_LOAN_QUERY = "SELECT 1 FROM transactions WHERE MemberID = %s AND ReturnDate IS NULL AND BookID = %s"
+    PAY_FINE_QUERY = """
+        UPDATE transactions SET FinePaid = 1
+        WHERE ID = %s AND ReturnDate IS NOT NULL AND FinePaid = 0 AND FineAmount > 0
+    """
+    BOOK_TITLE_QUERY = "SELECT title FROM books WHERE ID = %s"
+    MEMBER_NAME_QUERY = "SELECT CONCAT(FirstName, ' ', LastName) FROM members WHERE ID = %s"
+    MEMBER_COLUMNS = {"first_name": ("FirstName", "first name"), "last_name": ("LastName", "last name"),
+                      "email": ("Email", "email"), "phone": ("Phone", "phone")}
+    MEMBER_INSERT_QUERY = "INSERT INTO members (FirstName, LastName, Email, Phone) VALUES (%s, %s, %s, %s)"
+    
+    def __init__(self, connection_factory: Optional[Callable[[], Any]] = None,
+                 backend: Optional[StorageBackend] = None):
+        """Initialize the Library Management System.
+
+        ``backend`` selects the storage engine (default: ``DB_BACKEND`` from config).
+        ``connection_factory`` overrides how new connections are opened (e.g. a
+        fake driver in tests).
+        """
         self.setup_logging()
         self.logger = logging.getLogger(__name__)
-        self.connection = None
+        dialect = backend.dialect if backend else DB_BACKEND
+        connect_config, pool_options = split_pool_config(SQLITE_CONFIG if dialect == "sqlite" else DB_CONFIG)
+        self.backend = backend or get_backend(DB_BACKEND, connect_config)
+        self.profiler = QueryProfiler(enabled=LOG_CONFIG["query_profiling"],
+                                      sample_rate=LOG_CONFIG["query_sample_rate"],
+                                      slow_query_ms=LOG_CONFIG["slow_query_ms"])
+        if self.profiler.enabled:
+            pool_options["on_acquire"] = self.profiler.record_connect
+        self.pool = ConnectionPool(connection_factory or self.open_connection, **pool_options)
+        self._schema_checked = False
+        self._schema_lock = threading.Lock()
+        self._search_index: Optional[BookSearchIndex] = None
+        self._search_index_state: Optional[Tuple] = None  # catalog (version, max ID) the index reflects
+        self._search_index_lock = threading.Lock()
+        self.analytics = CirculationAnalytics(self)
+        self.inventory = Inventory(self)
+        self.holds = HoldQueue(self)
+        self.member_status = MemberStatus(self)
+        self.archive = TransactionArchive(self)
+        self.entity_cache = LRUCache(max_entries=CACHE_CONFIG["max_entries"],
+                                     ttl_seconds=CACHE_CONFIG["ttl_seconds"],
+                                     enabled=CACHE_CONFIG["enabled"])
+        # The menu runs its operations through ``api``: this object, or a service client (see use_service)
+        self.api: Any = self
+        self._operation_errors: Optional[Tuple[type, ...]] = None
+    
+    @property
+    def Error(self) -> type:
+        """The database driver's base exception (resolved on use, so the driver is imported lazily)."""
+        return self.backend.Error
+    
+    @property
+    def operation_errors(self) -> Tuple[type, ...]:
+        """Exceptions the menu reports as a failed operation rather than a crash."""
+        return self._operation_errors or (self.Error, PoolTimeoutError)
         
     def setup_logging(self) -> None:
-        """Set up logging configuration."""
-        logging.basicConfig(
-            level=getattr(logging, LOG_CONFIG["level"]),
-            format=LOG_CONFIG["format"],
-            handlers=[
-                logging.FileHandler(LOG_CONFIG["file"]),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-    
-    def connect_database(self) -> Optional[Union[mysql.connector.MySQLConnection, mysql.connector.PooledMySQLConnection]]: # type: ignore
-        """Establish database connection with error handling."""
+        """Set up logging: records are queued and written (rotated, as JSON) by a background thread."""
+        configure_logging(LOG_CONFIG)
+    
+    def open_connection(self) -> Any:
+        """Open a new physical database connection (used by the connection pool)."""
+        connection = self.backend.connect()
+        self.logger.info("Successfully connected to %s database", self.backend.name)
+        if self.backend.config.get("auto_migrate"):
+            with self._schema_lock:
+                if not self._schema_checked:
+                    from migrations import MigrationRunner
+                    MigrationRunner(self).migrate(connection)
+                    self._schema_checked = True
+        return connection
+
+    def connect_database(self) -> Optional[Any]:
+        """Check out a pooled database connection with error handling."""
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
-            if connection.is_connected():
-                self.logger.info("Successfully connected to MySQL database")
-                return connection
-        except Error as e:
-            self.logger.error(f"Error connecting to MySQL database: {e}")
-            return None
+            return self.pool.acquire()
+        except self.Error as e:
+            self.logger.error("Error connecting to %s database: %s", self.backend.name, e)
+        except PoolTimeoutError as e:
+            self.logger.error("Connection pool exhausted: %s", e)
+        return None
     
     def execute_query(self, query: str, params: Optional[Tuple] = None, fetch: bool = False) -> Union[Optional[List[Tuple]], bool]:
-        """Execute database query with proper error handling."""
+        """Execute database query on a pooled connection with proper error handling."""
         connection = self.connect_database()
         if not connection:
             return None
             
+        cursor = None
+        discard = False
         try:
-            cursor = connection.cursor()
+            cursor = self.profiler.cursor(connection.cursor())
             cursor.execute(query, params or ())
             
             if fetch:
@@ -62,50 +237,214 @@ class LibraryManagementSystem:
                 connection.commit()
                 return True
                 
-        except Error as e:
-            self.logger.error(f"Database error: {e}")
+        except self.Error as e:
+            self.logger.error("Database error: %s", e)
+            discard = not connection.is_connected()
             return None
         finally:
-            if connection and connection.is_connected():
+            if cursor is not None:
                 cursor.close()
-                connection.close()
+            self.pool.release(connection, discard=discard)
+    
+    @contextmanager
+    def transaction(self, isolation_level: Optional[str] = None) -> Iterator[Any]:
+        """Run a block of statements as one atomic transaction on a pooled connection.
+
+        Yields a cursor; commits when the block completes and rolls back if it raises.
+        ``isolation_level`` (e.g. "READ COMMITTED") applies to this transaction only.
+        """
+        connection = self.pool.acquire()
+        cursor = None
+        discard = False
+        try:
+            if isolation_level:
+                connection.start_transaction(isolation_level=isolation_level)
+            else:
+                connection.start_transaction()
+            cursor = self.profiler.cursor(connection.cursor(buffered=True))
+            yield cursor
+            connection.commit()
+        except BaseException:
+            try:
+                connection.rollback()
+            except self.Error:
+                discard = True
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+            self.pool.release(connection, discard=discard)
+    
+    def stream_query(self, query: str, params: Optional[Tuple] = None, batch_size: int = 1000) -> Iterator[Tuple]:
+        """Yield result rows one at a time, fetching ``batch_size`` rows per round trip.
+
+        Closing the generator early (or an error in the consumer) drops the unread rows before the
+        connection goes back to the pool; errors while doing so never replace the original one.
+        """
+        connection = self.pool.acquire()
+        discard = False
+        exhausted = False
+        cursor = None
+        try:
+            cursor = self.profiler.cursor(connection.cursor())
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    exhausted = True
+                    break
+                yield from rows
+        finally:
+            try:
+                if not exhausted and hasattr(connection, "consume_results"):
+                    # An unbuffered MySQL cursor closed with rows unread raises "Unread result found"
+                    connection.consume_results()
+                if cursor is not None:
+                    cursor.close()
+            except Exception as e:
+                discard = True
+                if exhausted:
+                    raise
+                self.logger.debug("Discarding connection after an abandoned stream: %s", e)
+            finally:
+                self.pool.release(connection, discard=discard)
+    
+    @staticmethod
+    def seek_condition(columns: Tuple[str, ...], descending: bool = False) -> str:
+        """WHERE clause that resumes an ORDER BY ``columns`` listing after a given row.
+
+        ``(a, b) > (x, y)`` is written as ``a >= x AND (a > x OR (a = x AND b > y))``:
+        the leading ``a >= x`` is what lets MySQL and SQLite seek straight into
+        the sort index instead of filtering from the start of it.
+        """
+        op = "<" if descending else ">"
+        condition = f"{columns[-1]} {op} %s"
+        for column in reversed(columns[:-1]):
+            condition = f"{column} {op} %s OR ({column} = %s AND ({condition}))"
+        if len(columns) > 1:
+            condition = f"{columns[0]} {op}= %s AND ({condition})"
+        return condition
+    
+    @staticmethod
+    def seek_params(keys: List[Any]) -> List[Any]:
+        """Parameters for seek_condition() given the sort-key values of the last row seen."""
+        params = [keys[-1]]
+        for key in reversed(keys[:-1]):
+            params = [key, key, *params]
+        if len(keys) > 1:
+            params.insert(0, keys[0])
+        return params
+    
+    def page_query(self, listing: str, after: bool) -> str:
+        """SQL for one keyset page of ``listing``, optionally resuming after a row."""
+        select, columns, positions, descending = self.LISTINGS[listing]
+        direction = " DESC" if descending else ""
+        where = f" WHERE {self.seek_condition(columns, descending)}" if after else ""
+        order = ", ".join(f"{column}{direction}" for column in columns)
+        query = f"{select.rstrip()}{where} ORDER BY {order} LIMIT %s"
+        archived = self.ARCHIVED_LISTINGS.get(listing)
+        if archived is None:
+            return query
+        # Each table seeks its own sort index for a page; merging the two and keeping the
+        # first page of the result gives the same rows as one table would, at the same cost
+        merged_order = ", ".join(f"{position + 1}{direction}" for position in positions)
+        return (f"SELECT * FROM ({query}) AS live UNION ALL "
+                f"SELECT * FROM ({archived.rstrip()}{where} ORDER BY {order} LIMIT %s) AS archived "
+                f"ORDER BY {merged_order} LIMIT %s")
+    
+    def page_params(self, listing: str, after: Optional[List[Any]], page_size: int) -> Tuple:
+        """Parameters for page_query() resuming after the sort key ``after`` (None for the first page)."""
+        params = (*self.seek_params(after), page_size) if after else (page_size,)
+        return params * 2 + (page_size,) if listing in self.ARCHIVED_LISTINGS else params
+    
+    @profiled("list_page")
+    def fetch_page(self, listing: str, after: Optional[List[Any]] = None,
+                   page_size: Optional[int] = None) -> List[Tuple]:
+        """Fetch one page of a listing, starting right after the row whose sort key is ``after``."""
+        page_size = page_size or APP_CONFIG["list_page_size"]
+        with self.pool.connection() as connection:
+            cursor = self.profiler.cursor(connection.cursor())
+            try:
+                cursor.execute(self.page_query(listing, after=bool(after)),
+                               self.page_params(listing, after, page_size))
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+    
+    def iter_pages(self, listing: str, page_size: Optional[int] = None) -> Iterator[List[Tuple]]:
+        """Yield pages of rows for "books", "members" or "transactions" using the seek method.
+
+        Each page is a bounded indexed query that starts right after the last row
+        of the previous page, so memory stays constant and late pages cost the same
+        as the first one. Raises the backend's Error if a page cannot be read.
+        """
+        key_positions = self.LISTINGS[listing][2]
+        page_size = page_size or APP_CONFIG["list_page_size"]
+        after: Optional[List[Any]] = None
+        while True:
+            page = self.fetch_page(listing, after, page_size)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after = [page[-1][position] for position in key_positions]
+    
+    def _print_pages(self, listing: str, print_header: Callable[[], None],
+                     print_row: Callable[[Tuple], None], empty_message: str) -> None:
+        """Print a listing page by page, asking before fetching the next page."""
+        shown = 0
+        try:
+            for page in self.api.iter_pages(listing):
+                if shown == 0:
+                    print_header()
+                for row in page:
+                    print_row(row)
+                shown += len(page)
+                if len(page) == APP_CONFIG["list_page_size"]:
+                    if input(f"-- {shown} shown. Press Enter for more, or 'q' to stop: ").strip().lower() == "q":
+                        return
+        except self.operation_errors as e:
+            self.logger.error("Database error: %s", e)
+            print(empty_message)
+            return
+        if shown == 0:
+            print_header()
+    
+    def _lookup_value(self, query: str, key: int, cursor: Optional[Any] = None) -> Optional[Any]:
+        """Fetch the first column of a single-row lookup, on ``cursor`` if given."""
+        if cursor is not None:
+            cursor.execute(query, (key,))
+            row = cursor.fetchone()
+        else:
+            rows = self.execute_query(query, (key,), fetch=True)
+            row = rows[0] if rows else None
+        return row[0] if row else None
+    
+    def book_title(self, book_id: int, cursor: Optional[Any] = None) -> Optional[str]:
+        """Title of a book by ID (read-through entity cache); None if it does not exist."""
+        return self.entity_cache.get_or_load(
+            ("book", book_id), lambda: self._lookup_value(self.BOOK_TITLE_QUERY, book_id, cursor))
+    
+    def member_name(self, member_id: int, cursor: Optional[Any] = None) -> Optional[str]:
+        """Full name of a member by ID (read-through entity cache); None if it does not exist."""
+        return self.entity_cache.get_or_load(
+            ("member", member_id), lambda: self._lookup_value(self.MEMBER_NAME_QUERY, member_id, cursor))
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return entity cache counters (hits, misses, evictions, size, ...)."""
+        return self.entity_cache.stats()
+    
+    def pool_stats(self) -> Dict[str, int]:
+        """Return connection pool counters (hits, misses, created, discarded, ...)."""
+        return self.pool.stats()
     
     def validate_input(self, value: str, field_type: str, required: bool = True) -> bool:
         """Validate user input based on field type."""
-        if required and not value.strip():
-            print(f"❌ {field_type} is required and cannot be empty.")
+        error = validation_error(value, field_type, required)
+        if error:
+            print(f"❌ {error}")
             return False
-            
-        if field_type == "email" and value:
-            if "@" not in value or "." not in value:
-                print("❌ Invalid email format.")
-                return False
-                
-        if field_type == "phone" and value:
-            if not value.isdigit() or len(value) < 10:
-                print("❌ Phone number must be at least 10 digits.")
-                return False
-                
-        if field_type == "year" and value:
-            try:
-                year = int(value)
-                if year < 1000 or year > datetime.now().year + 1:
-                    print("❌ Invalid year.")
-                    return False
-            except ValueError:
-                print("❌ Year must be a number.")
-                return False
-                
-        if field_type == "price" and value:
-            try:
-                price = float(value)
-                if price <= 0:
-                    print("❌ Price must be greater than 0.")
-                    return False
-            except ValueError:
-                print("❌ Price must be a number.")
-                return False
-                
         return True
     
     def add_book(self) -> bool:
@@ -134,32 +473,102 @@ class LibraryManagementSystem:
             return False
         price = float(price_input)
         
-        # Insert into database
-        query = "INSERT INTO books (title, Author, Genre, PublishedYear, Price) VALUES (%s, %s, %s, %s, %s)"
-        result = self.execute_query(query, (title, author, genre, year, price))
+        copies_input = input("Enter number of copies (default 1): ").strip() or "1"
+        if not copies_input.isdigit() or int(copies_input) < 1:
+            print("❌ Number of copies must be a positive whole number.")
+            return False
         
-        if result:
-            print("✅ Book added successfully.")
-            self.logger.info(f"Book added: {title} by {author}")
-            return True
-        else:
+        try:
+            self.api.create_book(title, author, genre, year, price, int(copies_input))
+        except self.operation_errors as e:
+            self.logger.error("Database error: %s", e)
             print("❌ Error adding book.")
             return False
+        
+        print("✅ Book added successfully.")
+        return True
     
-    def show_books(self) -> None:
-        """Display all books in the library."""
-        query = "SELECT ID, title, Author, Genre, PublishedYear, Price FROM books ORDER BY title"
-        result = self.execute_query(query, fetch=True)
+    @profiled("create_book")
+    def create_book(self, title: str, author: str, genre: Optional[str], year: int, price: float,
+                    copies: int = 1) -> int:
+        """Insert a book with ``copies`` copies, add it to the search index and return its ID."""
+        with self.transaction() as cursor:
+            before = self._bump_catalog(cursor)
+            cursor.execute(self.BOOK_INSERT_QUERY, (title, author, genre, year, price))
+            book_id = cursor.lastrowid
+            cursor.execute(CATALOG_CHANGE_INSERT_QUERY, (book_id,))
+            self.inventory.add_copies(book_id, copies, cursor)
+            after = self._catalog_state(cursor)
+        self._patch_search_index(before, after, lambda index: index.add(book_id, title, author, genre))
+        self.logger.info("Book added: %s by %s", title, author, extra={"book_id": book_id})
+        return book_id
+    
+    @profiled("update_book")
+    def update_book(self, book_id: int, changes: Dict[str, Any]) -> None:
+        """Update book fields (title, author, genre, year, price) and refresh the search index.
+
+        Only a change to a searched field (title, author, genre) moves the catalog version.
+        """
+        assignments, values = [], []
+        for key, value in changes.items():
+            if key not in self.BOOK_COLUMNS:
+                raise LibraryError(f"Unknown book field '{key}'.")
+            column, field_type = self.BOOK_COLUMNS[key]
+            error = validation_error("" if value is None else str(value), field_type, required=key != "genre")
+            if error:
+                raise LibraryError(error)
+            assignments.append(f"{column} = %s")
+            values.append(value)
+        if not assignments:
+            return
+        searched = not changes.keys().isdisjoint(self.SEARCHED_BOOK_FIELDS)
         
-        if isinstance(result, list):
+        with self.transaction() as cursor:
+            before = self._bump_catalog(cursor) if searched else None
+            cursor.execute(f"UPDATE books SET {', '.join(assignments)} WHERE ID = %s", (*values, book_id))
+            cursor.execute("SELECT title, Author, Genre FROM books WHERE ID = %s", (book_id,))
+            row = cursor.fetchone()
+            if not row:
+                raise LibraryError("Book ID not found.")
+            if searched:
+                cursor.execute(CATALOG_CHANGE_INSERT_QUERY, (book_id,))
+                after = self._catalog_state(cursor)
+        self.entity_cache.invalidate(("book", book_id))
+        if searched:
+            self._patch_search_index(before, after, lambda index: index.add(book_id, *row))
+        self.logger.info("Book updated: %s (%s)", book_id, ", ".join(changes))
+    
+    @profiled("delete_book")
+    def delete_book(self, book_id: int) -> None:
+        """Delete a book that has no loan history and drop it from the search index."""
+        with self.transaction() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {HISTORY_VIEW} WHERE BookID = %s", (book_id,))
+            if cursor.fetchone()[0]:
+                raise LibraryError("Book has transaction history and cannot be deleted.")
+            before = self._bump_catalog(cursor)
+            self.inventory.remove_title(cursor, book_id)
+            cursor.execute("DELETE FROM books WHERE ID = %s", (book_id,))
+            if cursor.rowcount == 0:
+                raise LibraryError("Book ID not found.")
+            cursor.execute(CATALOG_CHANGE_INSERT_QUERY, (book_id,))
+            after = self._catalog_state(cursor)
+        self.entity_cache.invalidate(("book", book_id))
+        self._patch_search_index(before, after, lambda index: index.remove(book_id))
+        self.logger.info("Book deleted: %s", book_id)
+    
+    def show_books(self) -> None:
+        """Display all books in the library, one page at a time."""
+        def header() -> None:
             print("\n📚 Books in Library")
-            print("-" * 80)
-            print(f"{'ID':<4} {'Title':<25} {'Author':<20} {'Genre':<15} {'Year':<6} {'Price':<8}")
-            print("-" * 80)
-            for row in result:
-                print(f"{row[0]:<4} {row[1]:<25} {row[2]:<20} {row[3] or 'N/A':<15} {row[4]:<6} ${row[5]:<8}")
-        else:
-            print("❌ No books found or error retrieving books.")
+            print("-" * 90)
+            print(f"{'ID':<4} {'Title':<25} {'Author':<20} {'Genre':<15} {'Year':<6} {'Price':<8} {'Copies':<8}")
+            print("-" * 90)
+        
+        def row_line(row: Tuple) -> None:
+            copies = f"{row[6]}/{row[7]}" if row[7] is not None else "-"
+            print(f"{row[0]:<4} {row[1]:<25} {row[2]:<20} {row[3] or 'N/A':<15} {row[4]:<6} ${row[5]:<8} {copies:<8}")
+        
+        self._print_pages("books", header, row_line, "❌ No books found or error retrieving books.")
     
     def add_member(self) -> bool:
         """Add a new member to the library."""
@@ -182,33 +591,117 @@ class LibraryManagementSystem:
         if not self.validate_input(phone, "phone"):
             return False
         
-        # Insert into database
-        query = "INSERT INTO members (FirstName, LastName, Email, Phone) VALUES (%s, %s, %s, %s)"
-        result = self.execute_query(query, (first_name, last_name, email, phone))
-        
-        if result:
-            print("✅ Member added successfully.")
-            self.logger.info(f"Member added: {first_name} {last_name}")
-            return True
-        else:
+        try:
+            self.api.create_member(first_name, last_name, email, phone)
+        except self.operation_errors as e:
+            self.logger.error("Database error: %s", e)
             print("❌ Error adding member. Email might already exist.")
             return False
+        
+        print("✅ Member added successfully.")
+        return True
     
-    def show_members(self) -> None:
-        """Display all members."""
-        query = "SELECT ID, FirstName, LastName, Email, Phone FROM members ORDER BY LastName, FirstName"
-        result = self.execute_query(query, fetch=True)
+    @profiled("create_member")
+    def create_member(self, first_name: str, last_name: str, email: str, phone: str) -> int:
+        """Insert a member and return its ID."""
+        with self.transaction() as cursor:
+            cursor.execute(self.MEMBER_INSERT_QUERY, (first_name, last_name, email, phone))
+            member_id = cursor.lastrowid
+            self.member_status.add(cursor, member_id)
+        self.logger.info("Member added: %s %s", first_name, last_name, extra={"member_id": member_id})
+        return member_id
+    
+    @profiled("update_member")
+    def update_member(self, member_id: int, changes: Dict[str, Any]) -> None:
+        """Update member fields (first_name, last_name, email, phone) and invalidate the cached entry."""
+        assignments, values = [], []
+        for key, value in changes.items():
+            if key not in self.MEMBER_COLUMNS:
+                raise LibraryError(f"Unknown member field '{key}'.")
+            column, field_type = self.MEMBER_COLUMNS[key]
+            error = validation_error("" if value is None else str(value), field_type)
+            if error:
+                raise LibraryError(error)
+            assignments.append(f"{column} = %s")
+            values.append(value)
+        if not assignments:
+            return
         
-        if isinstance(result, list):
+        with self.transaction() as cursor:
+            cursor.execute(f"UPDATE members SET {', '.join(assignments)} WHERE ID = %s", (*values, member_id))
+            cursor.execute("SELECT 1 FROM members WHERE ID = %s", (member_id,))
+            if not cursor.fetchone():
+                raise LibraryError("Member ID not found.")
+        self.entity_cache.invalidate(("member", member_id))
+        self.logger.info("Member updated: %s (%s)", member_id, ", ".join(changes))
+    
+    @profiled("delete_member")
+    def delete_member(self, member_id: int) -> None:
+        """Delete a member with no loan history and invalidate the cached entry."""
+        with self.transaction() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {HISTORY_VIEW} WHERE MemberID = %s", (member_id,))
+            if cursor.fetchone()[0]:
+                raise LibraryError("Member has transaction history and cannot be deleted.")
+            self.member_status.remove(cursor, member_id)
+            cursor.execute("DELETE FROM members WHERE ID = %s", (member_id,))
+            if cursor.rowcount == 0:
+                raise LibraryError("Member ID not found.")
+        self.entity_cache.invalidate(("member", member_id))
+        self.logger.info("Member deleted: %s", member_id)
+    
+    def show_members(self) -> None:
+        """Display all members, one page at a time."""
+        def header() -> None:
             print("\n👥 Library Members")
             print("-" * 70)
             print(f"{'ID':<4} {'Name':<25} {'Email':<25} {'Phone':<15}")
             print("-" * 70)
-            for row in result:
-                full_name = f"{row[1]} {row[2]}"
-                print(f"{row[0]:<4} {full_name:<25} {row[3]:<25} {row[4]:<15}")
-        else:
-            print("❌ No members found or error retrieving members.")
+        
+        def row_line(row: Tuple) -> None:
+            full_name = f"{row[1]} {row[2]}"
+            print(f"{row[0]:<4} {full_name:<25} {row[3]:<25} {row[4]:<15}")
+        
+        self._print_pages("members", header, row_line, "❌ No members found or error retrieving members.")
+    
+    @profiled("issue")
+    def issue(self, book_id: int, member_id: int) -> Dict[str, Any]:
+        """Issue a copy of a book to a member in a single transaction.
+
+        The member's status row is locked first (``FOR UPDATE``) so concurrent issues
+        by the same member are serialized; its open loan count and unpaid fines
+        decide eligibility with that one primary-key read. A copy set aside for the member's hold is checked out
+        first; otherwise availability comes from the title's inventory counter,
+        whose conditional decrement also serializes concurrent issues of that title,
+        and a hold the member is still waiting on for the title is fulfilled.
+        A member may hold only one copy of a title at a time.
+        Raises CirculationError when a rule rejects the request.
+        """
+        with self.transaction() as cursor:
+            self.member_status.check_can_borrow(cursor, member_id)
+            # Member's status row, then the title's counter, then its holds: the order return uses too
+            if self.inventory.counts(cursor, book_id, lock=True) is None:
+                raise CirculationError("Book ID not found.")
+            # The member's status row is locked, so a concurrent issue to them cannot slip past this check
+            cursor.execute(self.OPEN_LOAN_QUERY, (member_id, book_id))
+            if cursor.fetchone():
+                raise CirculationError("Member already has a copy of this book on loan.")
+            copy_id = self.holds.claim(cursor, book_id, member_id)
+            if copy_id is None:
+                copy_id, copies_left = self.inventory.take(cursor, book_id)
+                self.holds.fulfil_waiting(cursor, book_id, member_id)
+            else:
+                copies_left = self.inventory.counts(cursor, book_id)[0]
+            cursor.execute(self.ISSUE_INSERT_QUERY, (book_id, member_id, copy_id))
+            transaction_id = cursor.lastrowid
+            self.member_status.record_issue(cursor, member_id)
+            self.analytics.record_issue(cursor, book_id, member_id)
+            book_title = self.book_title(book_id, cursor)
+            member_name = self.member_name(member_id, cursor)
+        
+        self.logger.info("Book issued: %s to %s", book_title, member_name,
+                         extra={"transaction_id": transaction_id, "book_id": book_id, "member_id": member_id})
+        return {"transaction_id": transaction_id, "book_title": book_title, "member_name": member_name,
+                "copy_id": copy_id, "copies_left": copies_left}
     
     def issue_book(self) -> bool:
         """Issue a book to a member."""
@@ -222,47 +715,73 @@ class LibraryManagementSystem:
             print("❌ Invalid input. Please enter numeric IDs.")
             return False
         
-        # Check if book exists
-        book_query = "SELECT title FROM books WHERE ID = %s"
-        book_result = self.execute_query(book_query, (book_id,), fetch=True)
-        if not book_result:
-            print("❌ Book ID not found.")
+        try:
+            result = self.api.issue(book_id, member_id)
+        except CirculationError as e:
+            print(f"⚠️ {e}")
+            counts = self.api.inventory.availability(book_id)
+            if counts and counts[0] == 0 and counts[1] > 0:
+                if input("Place a hold for this member? (y/n): ").strip().lower() == "y":
+                    self.place_hold(book_id, member_id)
             return False
-        
-        # Check if member exists
-        member_query = "SELECT CONCAT(FirstName, ' ', LastName) as name FROM members WHERE ID = %s"
-        member_result = self.execute_query(member_query, (member_id,), fetch=True)
-        if not member_result:
-            print("❌ Member ID not found.")
+        except self.operation_errors as e:
+            self.logger.error("Database error: %s", e)
+            print("❌ Error issuing book.")
             return False
         
-        # Check if book is already issued
-        issued_query = "SELECT * FROM transactions WHERE BookID = %s AND ReturnDate IS NULL"
-        issued_result = self.execute_query(issued_query, (book_id,), fetch=True)
-        if issued_result:
-            print("⚠️ This book is currently issued and hasn't been returned.")
+        print(f"✅ Book '{result['book_title']}' successfully issued to {result['member_name']}.")
+        print(f"📦 Copies left on the shelf: {result['copies_left']}")
+        return True
+    
+    def place_hold(self, book_id: int, member_id: int) -> bool:
+        """Queue a member for a book with no copy on the shelf."""
+        try:
+            hold = self.api.holds.place(book_id, member_id)
+        except CirculationError as e:
+            print(f"⚠️ {e}")
             return False
-        
-        # Check member's current book count
-        count_query = "SELECT COUNT(*) FROM transactions WHERE MemberID = %s AND ReturnDate IS NULL"
-        count_result = self.execute_query(count_query, (member_id,), fetch=True)
-        if isinstance(count_result, list) and count_result[0][0] >= APP_CONFIG["max_books_per_member"]:
-            print(f"⚠️ Member has reached maximum limit of {APP_CONFIG['max_books_per_member']} books.")
+        except self.operation_errors as e:
+            self.logger.error("Database error: %s", e)
+            print("❌ Error placing hold.")
             return False
         
-        # Issue the book
-        issue_query = "INSERT INTO transactions (BookID, MemberID, IssueDate) VALUES (%s, %s, CURDATE())"
-        result = self.execute_query(issue_query, (book_id, member_id))
+        print(f"📌 Hold #{hold['hold_id']} placed for {hold['member_name']} on '{hold['book_title']}' "
+              f"(position {hold['position']} in the queue).")
+        return True
+    
+    @profiled("return")
+    def return_transaction(self, transaction_id: int) -> Dict[str, Any]:
+        """Return a loan and record its fine in a single transaction.
+
+        The fine is computed by the same UPDATE that sets the return date, and
+        ``ReturnDate IS NULL`` in its WHERE clause makes concurrent returns of
+        the same loan safe; only the winner hands the copy on, to the oldest
+        waiting hold if there is one, otherwise back to the shelf.
+        Raises CirculationError if the loan is not open.
+        """
+        grace = APP_CONFIG["grace_period_days"]
+        with self.transaction() as cursor:
+            cursor.execute(self.RETURN_UPDATE_QUERY,
+                           (grace, grace, APP_CONFIG["fine_rate_per_day"], transaction_id))
+            if cursor.rowcount == 0:
+                raise CirculationError("Transaction not found or book already returned.")
+            cursor.execute(self.RETURN_DETAILS_QUERY, (transaction_id,))
+            book_id, member_id, copy_id, fine = cursor.fetchone()
+            # Member's status row before the title's counter (taken by pass_on), in the order issue takes
+            # them, so an issue and a return for the same member and title cannot deadlock
+            self.member_status.record_return(cursor, member_id, fine or 0)
+            passed_to = self.holds.pass_on(cursor, book_id, copy_id)
+            book_title = self.book_title(book_id, cursor)
+            member_name = self.member_name(member_id, cursor)
+            self.analytics.record_return(cursor)
         
-        if result and isinstance(book_result, list) and isinstance(member_result, list):
-            book_title = book_result[0][0]
-            member_name = member_result[0][0]
-            print(f"✅ Book '{book_title}' successfully issued to {member_name}.")
-            self.logger.info(f"Book issued: {book_title} to {member_name}")
-            return True
-        else:
-            print("❌ Error issuing book.")
-            return False
+        fine = float(fine or 0)
+        self.logger.info("Book returned: %s by %s, Fine: $%.2f", book_title, member_name, fine,
+                         extra={"transaction_id": transaction_id, "book_id": book_id, "member_id": member_id})
+        return {"transaction_id": transaction_id, "book_title": book_title,
+                "member_name": member_name, "fine": fine,
+                "hold_id": passed_to[0] if passed_to else None,
+                "held_for": passed_to[1] if passed_to else None}
     
     def return_book(self) -> bool:
         """Return a book and calculate fine."""
@@ -275,94 +794,199 @@ class LibraryManagementSystem:
             print("❌ Invalid input. Please enter numeric Transaction ID.")
             return False
         
-        # Check if transaction exists and book is not returned
-        check_query = """
-            SELECT t.BookID, t.MemberID, t.IssueDate, b.title, 
-                   CONCAT(m.FirstName, ' ', m.LastName) as member_name
-            FROM transactions t
-            JOIN books b ON t.BookID = b.ID
-            JOIN members m ON t.MemberID = m.ID
-            WHERE t.ID = %s AND t.ReturnDate IS NULL
-        """
-        check_result = self.execute_query(check_query, (transaction_id,), fetch=True)
-        
-        if not check_result:
-            print("❌ Transaction not found or book already returned.")
+        try:
+            result = self.api.return_transaction(transaction_id)
+        except CirculationError as e:
+            print(f"❌ {e}")
+            return False
+        except self.operation_errors as e:
+            self.logger.error("Database error: %s", e)
+            print("❌ Error returning book.")
             return False
         
-        # Update return date
-        return_query = "UPDATE transactions SET ReturnDate = CURDATE() WHERE ID = %s"
-        result = self.execute_query(return_query, (transaction_id,))
+        print(f"✅ Book '{result['book_title']}' returned by {result['member_name']}.")
+        print(f"💰 Fine: ${result['fine']:.2f}")
+        if result.get("hold_id"):
+            print(f"📌 Set this copy aside for member {result['held_for']} (hold #{result['hold_id']}).")
+        return True
+    
+    @profiled("pay_fine")
+    def pay_fine(self, transaction_id: int) -> Dict[str, Any]:
+        """Mark the fine of a returned loan as paid and take it off the member's balance."""
+        with self.transaction() as cursor:
+            cursor.execute(self.PAY_FINE_QUERY, (transaction_id,))
+            if cursor.rowcount == 0:
+                raise LibraryError("No unpaid fine on this transaction.")
+            cursor.execute(self.RETURN_DETAILS_QUERY, (transaction_id,))
+            _, member_id, _, amount = cursor.fetchone()
+            amount = float(amount)
+            self.member_status.record_payment(cursor, member_id, amount)
+            _, outstanding = self.member_status.lock(cursor, member_id)
         
-        if result:
-            # Calculate fine
-            fine_query = """
-                SELECT 
-                    CASE 
-                        WHEN DATEDIFF(ReturnDate, IssueDate) > %s 
-                        THEN (DATEDIFF(ReturnDate, IssueDate) - %s) * %s
-                        ELSE 0
-                    END AS fine
-                FROM transactions
-                WHERE ID = %s
-            """
-            fine_result = self.execute_query(
-                fine_query, 
-                (APP_CONFIG["grace_period_days"], APP_CONFIG["grace_period_days"], 
-                 APP_CONFIG["fine_rate_per_day"], transaction_id), 
-                fetch=True
-            )
-            
-            fine = fine_result[0][0] if isinstance(fine_result, list) and fine_result else 0
-            
-            # Update fine amount
-            if fine > 0:
-                update_fine_query = "UPDATE transactions SET FineAmount = %s WHERE ID = %s"
-                self.execute_query(update_fine_query, (fine, transaction_id))
-            
-            if isinstance(check_result, list):
-                book_title = check_result[0][3]
-                member_name = check_result[0][4]
-                print(f"✅ Book '{book_title}' returned by {member_name}.")
-                print(f"💰 Fine: ${fine:.2f}")
-                self.logger.info(f"Book returned: {book_title} by {member_name}, Fine: ${fine:.2f}")
-                return True
+        self.logger.info("Fine paid: $%.2f", amount,
+                         extra={"transaction_id": transaction_id, "member_id": member_id})
+        return {"transaction_id": transaction_id, "member_id": member_id, "amount": amount,
+                "outstanding": outstanding}
+    
+    def settle_fine(self) -> bool:
+        """Record payment of a returned loan's fine."""
+        print("\n💰 Pay Fine")
+        print("-" * 30)
+        
+        try:
+            transaction_id = int(input("Enter Transaction ID: "))
+        except ValueError:
+            print("❌ Invalid input. Please enter numeric Transaction ID.")
+            return False
         
-        print("❌ Error returning book.")
-        return False
+        try:
+            result = self.api.pay_fine(transaction_id)
+        except LibraryError as e:
+            print(f"⚠️ {e}")
+            return False
+        except self.operation_errors as e:
+            self.logger.error("Database error: %s", e)
+            print("❌ Error recording payment.")
+            return False
+        
+        print(f"✅ Fine of ${result['amount']:.2f} paid by member {result['member_id']}.")
+        print(f"💰 Still outstanding: ${result['outstanding']:.2f}")
+        return True
     
     def show_transactions(self) -> None:
-        """Display transaction history with book and member details."""
-        query = """
-            SELECT 
-                t.ID AS TransactionID,
-                b.title AS BookTitle,
-                CONCAT(m.FirstName, ' ', m.LastName) AS MemberName,
-                t.IssueDate,
-                t.ReturnDate,
-                t.FineAmount,
-                CASE 
-                    WHEN t.ReturnDate IS NULL THEN 'Issued'
-                    ELSE 'Returned'
-                END AS Status
-            FROM transactions t
-            JOIN books b ON t.BookID = b.ID
-            JOIN members m ON t.MemberID = m.ID
-            ORDER BY t.IssueDate DESC
-        """
-        result = self.execute_query(query, fetch=True)
-        
-        if isinstance(result, list):
+        """Display transaction history with book and member details, one page at a time."""
+        def header() -> None:
             print("\n📋 Transaction History")
             print("-" * 100)
             print(f"{'ID':<4} {'Book Title':<25} {'Member':<20} {'Issue Date':<12} {'Return Date':<12} {'Fine':<8} {'Status':<10}")
             print("-" * 100)
-            for row in result:
-                return_date = row[4].strftime('%Y-%m-%d') if row[4] else 'N/A'
-                fine = f"${row[5]:.2f}" if row[5] else "$0.00"
-                print(f"{row[0]:<4} {row[1]:<25} {row[2]:<20} {row[3]:<12} {return_date:<12} {fine:<8} {row[6]:<10}")
-        else:
-            print("❌ No transactions found.")
+        
+        def row_line(row: Tuple) -> None:
+            return_date = str(row[4]) if row[4] else 'N/A'
+            fine = f"${row[5]:.2f}" if row[5] else "$0.00"
+            print(f"{row[0]:<4} {row[1]:<25} {row[2]:<20} {str(row[3]):<12} {return_date:<12} {fine:<8} {row[6]:<10}")
+        
+        self._print_pages("transactions", header, row_line, "❌ No transactions found.")
+    
+    @property
+    def search_index(self) -> BookSearchIndex:
+        """The book search index, built from the books table on first use.
+
+        Every access reads the shared catalog state (one primary-key row plus
+        ``MAX(ID)``). When it differs from the state the index reflects, only the
+        books recorded in ``catalog_changes`` for the missed versions and those
+        above the old ``MAX(ID)`` are re-read, so books added or edited by another
+        process (bulk_import.py, another app.py) show up in this one's next search.
+        A full rebuild, when the changes are unknown, runs outside the lock and the
+        new index is swapped in, so searches meanwhile use the old one.
+        """
+        state = self._catalog_state()
+        with self._search_index_lock:
+            index, indexed = self._search_index, self._search_index_state
+        if index is not None and (state is None or state == indexed):
+            return index
+        delta = self._catalog_delta(indexed, state) if index is not None else None
+        if delta is None:
+            fresh = BookSearchIndex()
+            count = fresh.add_many(self.stream_query("SELECT ID, title, Author, Genre FROM books"))
+            self.logger.info("Search index built with %d books (catalog version %s)", count,
+                             state[0] if state else "unknown")
+            with self._search_index_lock:
+                # Keep an index another thread brought further forward in the meantime
+                current = self._search_index_state
+                if self._search_index is None or current is None or state is None or current[0] <= state[0]:
+                    self._search_index, self._search_index_state = fresh, state
+                return self._search_index
+        removed, rows = delta
+        with self._search_index_lock:
+            if self._search_index is index and self._search_index_state == indexed:
+                for book_id in removed:
+                    index.remove(book_id)
+                index.add_many(rows)
+                self._search_index_state = state
+            return self._search_index
+    
+    def invalidate_search_index(self) -> None:
+        """Drop the search index so it is rebuilt on the next search."""
+        with self._search_index_lock:
+            self._search_index = None
+            self._search_index_state = None
+    
+    def catalog_changed(self) -> None:
+        """Record a books change made outside create/update/delete_book (e.g. an UPDATE run by hand).
+
+        Bumps the shared catalog version without recording which books changed, so every
+        process rebuilds its search index on its next search.
+        """
+        with self.transaction() as cursor:
+            cursor.execute(CATALOG_BUMP_QUERY)
+        self.invalidate_search_index()
+    
+    def _catalog_state(self, cursor: Optional[Any] = None) -> Optional[Tuple]:
+        """(catalog version, highest book ID), or None if it cannot be read."""
+        if cursor is None:
+            rows = self.execute_query(CATALOG_STATE_QUERY, fetch=True)
+            return tuple(rows[0]) if rows else None
+        cursor.execute(CATALOG_STATE_QUERY)
+        return tuple(cursor.fetchone())
+    
+    def _catalog_delta(self, indexed: Optional[Tuple], state: Optional[Tuple]
+                       ) -> Optional[Tuple[List[int], List[Tuple]]]:
+        """(IDs to drop, rows to re-index) that bring an index at ``indexed`` up to ``state``.
+
+        None when the changes cannot be told from ``catalog_changes``: a version
+        with no rows recorded, or books gone from the top of the ID range.
+        """
+        if indexed is None or state is None or state[0] < indexed[0]:
+            return None
+        (old_version, old_max), (version, max_id) = indexed, state
+        if (old_max or 0) > (max_id or 0) and version == old_version:
+            return None
+        rows = self.execute_query(CATALOG_CHANGES_QUERY, (old_version, version), fetch=True)
+        if not isinstance(rows, list) or {v for v, _ in rows} != set(range(old_version + 1, version + 1)):
+            return None
+        changed = sorted({book_id for _, book_id in rows})
+        found: List[Tuple] = []
+        for start in range(0, len(changed), 1000):
+            chunk = changed[start:start + 1000]
+            query = f"SELECT ID, title, Author, Genre FROM books WHERE ID IN ({', '.join(['%s'] * len(chunk))})"
+            chunk_rows = self.execute_query(query, tuple(chunk), fetch=True)
+            if not isinstance(chunk_rows, list):
+                return None
+            found.extend(chunk_rows)
+        if (max_id or 0) > (old_max or 0):
+            # Books inserted since, including by plain SQL that recorded no change
+            found.extend(self.stream_query("SELECT ID, title, Author, Genre FROM books WHERE ID > %s",
+                                           (old_max or 0,)))
+        removed = set(changed) - {row[0] for row in found}
+        return sorted(removed), found
+
+    def _bump_catalog(self, cursor: Any) -> Tuple:
+        """Bump the catalog version inside a books write; returns the state just before the write."""
+        cursor.execute(CATALOG_BUMP_QUERY)  # also serializes books writes on the version row
+        version, max_id = self._catalog_state(cursor)
+        return version - 1, max_id
+    
+    def _patch_search_index(self, before: Tuple, after: Tuple, change: Callable[[BookSearchIndex], None]) -> None:
+        # Patch the index only if it reflects the catalog as it was just before this write;
+        # one that missed a write from elsewhere is left for the next search to rebuild
+        with self._search_index_lock:
+            if self._search_index is not None and self._search_index_state == before:
+                change(self._search_index)
+                self._search_index_state = after
+    
+    @profiled("search")
+    def search(self, keyword: str, limit: Optional[int] = None, offset: int = 0) -> Tuple[int, List[Tuple]]:
+        """Ranked book search; returns (total matches, rows for the requested page)."""
+        limit = min(limit or APP_CONFIG["search_page_size"], APP_CONFIG["search_max_results"])
+        total, book_ids = self.search_index.search(keyword, limit=limit, offset=offset)
+        if not book_ids:
+            return total, []
+        placeholders = ", ".join(["%s"] * len(book_ids))
+        query = f"SELECT {self.BOOK_SELECT_COLUMNS} FROM books WHERE ID IN ({placeholders})"
+        rows = self.execute_query(query, tuple(book_ids), fetch=True)
+        by_id = {row[0]: row for row in rows} if isinstance(rows, list) else {}
+        return total, [by_id[book_id] for book_id in book_ids if book_id in by_id]
     
     def search_books(self) -> None:
         """Search books by keyword."""
@@ -371,37 +995,46 @@ class LibraryManagementSystem:
             print("❌ Search keyword cannot be empty.")
             return
         
-        query = "SELECT ID, title, Author, Genre, PublishedYear, Price FROM books WHERE title LIKE %s OR Author LIKE %s"
-        result = self.execute_query(query, (f'%{keyword}%', f'%{keyword}%'), fetch=True)
-        
-        if isinstance(result, list):
-            print(f"\n🔍 Search Results for '{keyword}'")
-            print("-" * 80)
-            print(f"{'ID':<4} {'Title':<25} {'Author':<20} {'Genre':<15} {'Year':<6} {'Price':<8}")
-            print("-" * 80)
+        page_size = APP_CONFIG["search_page_size"]
+        offset = 0
+        while True:
+            try:
+                total, result = self.api.search(keyword, limit=page_size, offset=offset)
+            except self.operation_errors as e:
+                self.logger.error("Database error: %s", e)
+                result, total = [], 0
+            
+            if not result:
+                if offset == 0:
+                    print(f"❌ No books found matching '{keyword}'.")
+                return
+            
+            if offset == 0:
+                print(f"\n🔍 Search Results for '{keyword}' ({total} found)")
+                print("-" * 80)
+                print(f"{'ID':<4} {'Title':<25} {'Author':<20} {'Genre':<15} {'Year':<6} {'Price':<8}")
+                print("-" * 80)
             for row in result:
                 print(f"{row[0]:<4} {row[1]:<25} {row[2]:<20} {row[3] or 'N/A':<15} {row[4]:<6} ${row[5]:<8}")
-        else:
-            print(f"❌ No books found matching '{keyword}'.")
+            
+            offset += len(result)
+            if offset >= min(total, APP_CONFIG["search_max_results"]):
+                return
+            if input(f"-- {offset} of {total} shown. Press Enter for more, or 'q' to stop: ").strip().lower() == "q":
+                return
     
-    def most_issued_books(self) -> None:
-        """Display analytics for most issued books."""
+    def _ask_limit(self, prompt: str, default: int = 5) -> int:
         try:
-            limit = int(input("Enter number of top books to display (default 5): ") or "5")
+            return int(input(f"{prompt} (default {default}): ") or str(default))
         except ValueError:
-            limit = 5
-        
-        query = """
-            SELECT b.title, b.Author, COUNT(t.ID) as times_issued
-            FROM transactions t
-            JOIN books b ON t.BookID = b.ID
-            GROUP BY t.BookID, b.title, b.Author
-            ORDER BY times_issued DESC
-            LIMIT %s
-        """
-        result = self.execute_query(query, (limit,), fetch=True)
+            return default
+    
+    def most_issued_books(self) -> None:
+        """Display analytics for most issued books."""
+        limit = self._ask_limit("Enter number of top books to display")
+        result = self.api.analytics.top_books(limit)
         
-        if isinstance(result, list):
+        if result:
             print(f"\n📊 Top {limit} Most Issued Books")
             print("-" * 60)
             print(f"{'Title':<30} {'Author':<20} {'Times Issued':<12}")
@@ -411,6 +1044,86 @@ class LibraryManagementSystem:
         else:
             print("❌ No transaction data found.")
     
+    def top_genres_report(self) -> None:
+        """Display the genres with the most loans."""
+        limit = self._ask_limit("Enter number of genres to display")
+        result = self.api.analytics.top_genres(limit)
+        
+        if result:
+            print(f"\n📊 Top {limit} Genres")
+            print("-" * 40)
+            print(f"{'Genre':<25} {'Times Issued':<12}")
+            print("-" * 40)
+            for row in result:
+                print(f"{row[0] or 'N/A':<25} {row[1]:<12}")
+        else:
+            print("❌ No transaction data found.")
+    
+    def busiest_days_report(self) -> None:
+        """Display the days with the most issues and returns."""
+        limit = self._ask_limit("Enter number of days to display")
+        result = self.api.analytics.busiest_days(limit)
+        
+        if result:
+            print(f"\n📊 Top {limit} Busiest Days")
+            print("-" * 50)
+            print(f"{'Date':<12} {'Issues':<10} {'Returns':<10} {'Total':<10}")
+            print("-" * 50)
+            for row in result:
+                print(f"{str(row[0]):<12} {row[1]:<10} {row[2]:<10} {row[3]:<10}")
+        else:
+            print("❌ No transaction data found.")
+    
+    def top_borrowers_report(self) -> None:
+        """Display the members who have borrowed the most books."""
+        limit = self._ask_limit("Enter number of members to display")
+        result = self.api.analytics.top_borrowers(limit)
+        
+        if result:
+            print(f"\n📊 Top {limit} Borrowers")
+            print("-" * 80)
+            print(f"{'Member':<25} {'Email':<25} {'Loans':<8} {'Last Loan':<12}")
+            print("-" * 80)
+            for row in result:
+                print(f"{row[0]:<25} {row[1] or 'N/A':<25} {row[2]:<8} {str(row[3]):<12}")
+        else:
+            print("❌ No transaction data found.")
+    
+    def analytics_menu(self) -> None:
+        """Show the analytics submenu and run the chosen report."""
+        print("\n📊 Analytics Reports")
+        print("-" * 30)
+        print("1. Most Issued Books")
+        print("2. Top Genres")
+        print("3. Busiest Days")
+        print("4. Top Borrowers")
+        print("5. Rebuild Summaries")
+        choice = input("Enter your choice (1-5): ").strip()
+        
+        if choice == '1':
+            self.most_issued_books()
+        elif choice == '2':
+            self.top_genres_report()
+        elif choice == '3':
+            self.busiest_days_report()
+        elif choice == '4':
+            self.top_borrowers_report()
+        elif choice == '5':
+            try:
+                self.api.analytics.rebuild()
+                print("✅ Circulation summaries rebuilt.")
+            except self.operation_errors as e:
+                self.logger.error("Database error: %s", e)
+                print("❌ Error rebuilding summaries.")
+        else:
+            print("❌ Invalid choice. Please enter a number between 1-5.")
+    
+    def use_service(self, base_url: str) -> None:
+        """Send the menu's operations to a running service.py instead of the local database."""
+        from client import LibraryClient, ServiceError
+        self.api = LibraryClient(base_url)
+        self._operation_errors = (ServiceError,)
+    
     def show_menu(self) -> None:
         """Display the main menu."""
         print("\n" + "="*50)
@@ -424,23 +1137,30 @@ class LibraryManagementSystem:
         print("6.  Return Book")
         print("7.  Show Transactions")
         print("8.  Search Books")
-        print("9.  Most Issued Books")
-        print("10. Exit")
+        print("9.  Analytics Reports")
+        print("10. Pay Fine")
+        print("11. Exit")
         print("-"*50)
     
     def run(self) -> None:
         """Main application loop."""
         print("🚀 Starting Library Management System...")
         
-        # Test database connection
-        if not self.connect_database():
-            print("❌ Failed to connect to database. Please check your configuration.")
+        if self.api is self:
+            # Test database connection
+            connection = self.connect_database()
+            if not connection:
+                print("❌ Failed to connect to database. Please check your configuration.")
+                return
+            self.pool.release(connection)
+        elif not self.api.ping():
+            print(f"❌ Cannot reach the library service at {self.api.base_url}.")
             return
         
         while True:
             try:
                 self.show_menu()
-                choice = input("Enter your choice (1-10): ").strip()
+                choice = input("Enter your choice (1-11): ").strip()
                 
                 if choice == '1':
                     self.add_book()
@@ -459,13 +1179,20 @@ class LibraryManagementSystem:
                 elif choice == '8':
                     self.search_books()
                 elif choice == '9':
-                    self.most_issued_books()
+                    self.analytics_menu()
                 elif choice == '10':
+                    self.settle_fine()
+                elif choice == '11':
                     print("👋 Thank you for using Library Management System!")
                     self.logger.info("Application terminated by user")
+                    self.logger.info("Connection pool stats: %s", self.pool_stats())
+                    self.logger.info("Entity cache stats: %s", self.cache_stats())
+                    if self.profiler.enabled:
+                        self.logger.info("%s", self.profiler.report())
+                    self.pool.close_all()
                     break
                 else:
-                    print("❌ Invalid choice. Please enter a number between 1-10.")
+                    print("❌ Invalid choice. Please enter a number between 1-11.")
                 
                 input("\nPress Enter to continue...")
                 
@@ -475,17 +1202,25 @@ class LibraryManagementSystem:
                 break
             except Exception as e:
                 print(f"❌ An unexpected error occurred: {e}")
-                self.logger.error(f"Unexpected error: {e}")
+                self.logger.error("Unexpected error: %s", e)
 
 
 def main():
     """Main entry point of the application."""
+    import argparse  # only the script needs it, not modules importing app
+    
+    parser = argparse.ArgumentParser(description="Library Management System")
+    parser.add_argument("--remote", metavar="URL",
+                        help="use a running library service (python service.py) instead of the database")
+    args = parser.parse_args()
     try:
         lms = LibraryManagementSystem()
+        if args.remote:
+            lms.use_service(args.remote)
         lms.run()
     except Exception as e:
         print(f"❌ Failed to start application: {e}")
-        logging.error(f"Failed to start application: {e}")
+        logging.error("Failed to start application: %s", e)
 
 
 if __name__ == "__main__":
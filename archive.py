@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Transaction Archive
+Moves long-closed loans out of the live ``transactions`` table so the
+circulation queries keep working on a small table. A loan is archived once it
+was returned more than ``archive_after_days`` ago and its fine (if any) is
+paid; open loans and unpaid fines always stay live.
+
+Loans go to ``transactions_archive`` (the default), which the history listing,
+the ``transactions_all`` view and the analytics rebuild read alongside the
+live table. They can instead be written to compressed monthly partition files
+(CSV, or Parquet with pyarrow) for cold storage; those rows leave the
+database, so an analytics rebuild no longer counts them.
+
+Run it off-peak, e.g. monthly from cron:
+    0 3 1 * *  cd /opt/library && python archive.py run
+    python archive.py run --to parquet --dir /srv/library/archive
+    python archive.py status
+"""
+
+import argparse
+import csv
+import gzip
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import APP_CONFIG
+from profiling import profiled
+
+HISTORY_VIEW = "transactions_all"
+COLUMNS: Tuple[str, ...] = ("ID", "BookID", "MemberID", "CopyID", "IssueDate", "ReturnDate", "FineAmount", "FinePaid")
+_COLUMN_LIST = ", ".join(COLUMNS)
+
+# Same columns as transactions; IDs are kept, so there is no AUTO_INCREMENT
+ARCHIVE_DDL: Dict[str, Tuple[str, ...]] = {
+    "mysql": (
+        """
+        CREATE TABLE transactions_archive (
+            ID INT PRIMARY KEY,
+            BookID INT,
+            MemberID INT,
+            CopyID INT NULL,
+            IssueDate DATE,
+            ReturnDate DATE,
+            FineAmount DECIMAL(10,2) DEFAULT 0,
+            FinePaid BOOLEAN NOT NULL DEFAULT 1,
+            FOREIGN KEY (BookID) REFERENCES books(ID),
+            FOREIGN KEY (MemberID) REFERENCES members(ID)
+        )
+        """,
+    ),
+    "sqlite": (
+        """
+        CREATE TABLE transactions_archive (
+            ID INTEGER PRIMARY KEY,
+            BookID INTEGER,
+            MemberID INTEGER,
+            CopyID INTEGER,
+            IssueDate DATE,
+            ReturnDate DATE,
+            FineAmount DECIMAL(10,2) DEFAULT 0,
+            FinePaid BOOLEAN NOT NULL DEFAULT 1,
+            FOREIGN KEY (BookID) REFERENCES books(ID),
+            FOREIGN KEY (MemberID) REFERENCES members(ID)
+        )
+        """,
+    ),
+}
+ARCHIVE_SHARED_DDL: Tuple[str, ...] = (
+    # History pages seek into (IssueDate, ID) on both tables; the others answer "any loans for this book/member?"
+    "CREATE INDEX idx_archive_issue_date ON transactions_archive (IssueDate, ID)",
+    "CREATE INDEX idx_archive_book ON transactions_archive (BookID)",
+    "CREATE INDEX idx_archive_member ON transactions_archive (MemberID)",
+    f"""
+    CREATE VIEW {HISTORY_VIEW} AS
+    SELECT {_COLUMN_LIST} FROM transactions
+    UNION ALL
+    SELECT {_COLUMN_LIST} FROM transactions_archive
+    """,
+)
+
+# Returned before the cutoff implies issued before it, so the batch is a bounded range of the issue-date index
+_BATCH_SELECT = f"""
+    SELECT {_COLUMN_LIST} FROM transactions
+    WHERE IssueDate < %s AND ReturnDate < %s
+      AND (FinePaid = 1 OR COALESCE(FineAmount, 0) = 0){{resume}}
+    ORDER BY IssueDate, ID
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+ARCHIVE_BATCH_QUERY = _BATCH_SELECT.format(resume="")
+# Later batches seek past the last (IssueDate, ID) archived, so old open or unpaid loans that stay behind
+# are scanned once per run rather than once per batch (same shape as LibraryManagementSystem.seek_condition)
+ARCHIVE_RESUME_QUERY = _BATCH_SELECT.format(
+    resume="\n      AND IssueDate >= %s AND (IssueDate > %s OR (IssueDate = %s AND ID > %s))")
+# At REPEATABLE READ, MySQL would keep locks on every index row the batch scanned, including open loans
+# it skipped, and block their returns until the batch commits; READ COMMITTED releases them at once
+BATCH_ISOLATION = "READ COMMITTED"
+ARCHIVE_INSERT_QUERY = (f"INSERT INTO transactions_archive ({_COLUMN_LIST}) "
+                        f"VALUES ({', '.join(['%s'] * len(COLUMNS))})")
+# One DELETE per batch; the IN list is filled with one placeholder per archived loan
+ARCHIVE_DELETE_QUERY = "DELETE FROM transactions WHERE ID IN ({ids}) AND ReturnDate IS NOT NULL"
+
+TARGETS = ("table", "csv", "parquet")
+
+
+def load_pyarrow() -> Tuple[Any, Any]:
+    """(pyarrow, pyarrow.parquet), imported on first use.
+
+    pyarrow is optional and slow to import, and this module is loaded by every
+    app start, so only the Parquet code paths import it.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from None
+    return pyarrow, pyarrow.parquet
+
+
+@dataclass
+class ArchiveReport:
+    """Outcome of one archive run."""
+    target: str
+    cutoff: date
+    archived: int = 0
+    batches: int = 0
+    files: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        files = f" into {len(self.files)} files" if self.files else ""
+        return (f"Loans returned before {self.cutoff}: {self.archived} archived to {self.target}{files}, "
+                f"{self.batches} batches in {self.elapsed:.2f}s")
+
+
+class TransactionArchive:
+    """Moves closed loans out of ``transactions`` in bounded batches.
+
+    Each batch is one short READ COMMITTED transaction that copies up to
+    ``batch_size`` loans and deletes them from the live table, so issue and
+    return only ever wait on the few rows of the current batch. Each batch
+    resumes after the last loan of the one before. ``pause`` sleeps between
+    batches to leave room for circulation on a busy server.
+    """
+
+    def __init__(self, lms: Any):
+        self.lms = lms
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def profiler(self) -> Any:
+        return self.lms.profiler
+
+    @profiled("archive")
+    def run(self, older_than_days: Optional[int] = None, target: str = "table", directory: Optional[str] = None,
+            batch_size: Optional[int] = None, pause: float = 0.0, as_of: Optional[date] = None) -> ArchiveReport:
+        """Archive loans returned more than ``older_than_days`` before ``as_of`` (default today).
+
+        ``target`` is "table", or "csv"/"parquet" to write monthly partitions
+        under ``directory`` instead. A file is only kept if the batch that
+        removed its rows from the database commits.
+        """
+        if target not in TARGETS:
+            raise ValueError(f"Unknown archive target '{target}' (use {', '.join(TARGETS)})")
+        if target != "table" and not directory:
+            raise ValueError(f"The {target} target needs a directory for the partition files")
+        if target == "parquet":
+            load_pyarrow()
+        days = APP_CONFIG["archive_after_days"] if older_than_days is None else older_than_days
+        batch_size = batch_size or APP_CONFIG["archive_batch_size"]
+        cutoff = (as_of or date.today()) - timedelta(days=days)
+        report = ArchiveReport(target, cutoff)
+        started = time.perf_counter()
+        resume: Optional[Tuple[Any, int]] = None  # (IssueDate, ID) of the last loan archived
+        while True:
+            written: List[str] = []
+            try:
+                with self.lms.transaction(isolation_level=BATCH_ISOLATION) as cursor:
+                    if resume is None:
+                        cursor.execute(ARCHIVE_BATCH_QUERY, (cutoff, cutoff, batch_size))
+                    else:
+                        issued, last_id = resume
+                        cursor.execute(ARCHIVE_RESUME_QUERY,
+                                       (cutoff, cutoff, issued, issued, issued, last_id, batch_size))
+                    batch = cursor.fetchall()
+                    if batch:
+                        if target == "table":
+                            cursor.executemany(ARCHIVE_INSERT_QUERY, batch)
+                        else:
+                            written = self._write_partitions(batch, target, directory)
+                        cursor.execute(ARCHIVE_DELETE_QUERY.format(ids=", ".join(["%s"] * len(batch))),
+                                       [row[0] for row in batch])
+            except BaseException:
+                for path in written:
+                    os.remove(path)
+                raise
+            report.archived += len(batch)
+            report.files.extend(written)
+            report.batches += 1
+            if len(batch) < batch_size:
+                break
+            resume = (batch[-1][4], batch[-1][0])
+            if pause:
+                time.sleep(pause)
+        report.elapsed = time.perf_counter() - started
+        self.logger.info("%s", report.summary())
+        return report
+
+    def _write_partitions(self, rows: List[Tuple], target: str, directory: str) -> List[str]:
+        """Write a batch as one file per issue month: <dir>/month=YYYY-MM/transactions-<min ID>-<max ID>.<ext>."""
+        months: Dict[str, List[Tuple]] = {}
+        for row in rows:
+            months.setdefault(str(row[4])[:7], []).append(row)
+        written = []
+        try:
+            for month, month_rows in sorted(months.items()):
+                folder = os.path.join(directory, f"month={month}")
+                os.makedirs(folder, exist_ok=True)
+                extension = "csv.gz" if target == "csv" else "parquet"
+                ids = [row[0] for row in month_rows]
+                path = os.path.join(folder, f"transactions-{min(ids)}-{max(ids)}.{extension}")
+                if os.path.exists(path):
+                    raise FileExistsError(f"Archive partition already exists: {path}")
+                written.append(path)
+                if target == "csv":
+                    with gzip.open(path, "wt", encoding="utf-8", newline="") as handle:
+                        writer = csv.writer(handle)
+                        writer.writerow(COLUMNS)
+                        writer.writerows(month_rows)
+                else:
+                    columns = dict(zip(COLUMNS, map(list, zip(*month_rows))))
+                    # DECIMAL comes back as Decimal from MySQL and as float from SQLite
+                    columns["FineAmount"] = [None if v is None else float(v) for v in columns["FineAmount"]]
+                    pa, pq = load_pyarrow()
+                    pq.write_table(pa.table(columns), path, compression="zstd")
+        except BaseException:
+            for path in written:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        return written
+
+    def counts(self) -> Tuple[int, int]:
+        """(live, archived) loan rows."""
+        with self.lms.transaction() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM transactions")
+            live = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM transactions_archive")
+            return live, cursor.fetchone()[0]
+
+
+def main() -> None:
+    """Command-line entry point for transaction archival."""
+    from app import LibraryManagementSystem
+
+    parser = argparse.ArgumentParser(description="Move long-closed loans out of the live transactions table.")
+    parser.add_argument("command", choices=["run", "status"])
+    parser.add_argument("--days", type=int, help="archive loans returned more than this many days ago")
+    parser.add_argument("--to", choices=TARGETS, default="table", help="archive table, or monthly partition files")
+    parser.add_argument("--dir", help="directory for the csv/parquet partitions")
+    parser.add_argument("--batch-size", type=int, help="loans per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    args = parser.parse_args()
+
+    archive = LibraryManagementSystem().archive
+    if args.command == "run":
+        try:
+            report = archive.run(args.days, target=args.to, directory=args.dir, batch_size=args.batch_size,
+                                 pause=args.pause)
+        except (ValueError, RuntimeError) as e:  # checked before any loan moves; RuntimeError: no pyarrow
+            parser.error(str(e))
+        print(f"🗄️ {report.summary()}")
+    live, archived = archive.counts()
+    print(f"🗄️ Loans: {live:,} live, {archived:,} in the archive table")
+
+
+if __name__ == "__main__":
+    main()
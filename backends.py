@@ -0,0 +1,255 @@
+# backends.py
+# Storage backends for the Library Management System
+
+import logging
+import os
+import re
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple, Type
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql")
+
+
+class StorageBackend(ABC):
+    """Base class for a database backend.
+
+    A backend knows how to open DB-API connections that understand the SQL
+    used by ``LibraryManagementSystem`` (``%s`` placeholders and the MySQL
+    functions ``CURDATE``, ``DATEDIFF`` and ``CONCAT``), and which exception
+    class its driver raises. Subclasses must implement every abstract member,
+    so an incomplete backend fails when it is created rather than on first use.
+    """
+
+    name = "generic"
+    dialect = "generic"
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = dict(config or {})
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    @abstractmethod
+    def Error(self) -> Type[Exception]:
+        """Base exception raised by this backend's driver."""
+
+    @abstractmethod
+    def connect(self) -> Any:
+        """Open a new connection."""
+
+    @abstractmethod
+    def upsert(self, table: str, key_column: str, insert_body: str, update_assignments: str) -> str:
+        """Build an INSERT that updates the existing row when ``key_column`` already exists.
+
+        ``insert_body`` is everything after the table name, e.g. ``(a, b) VALUES (%s, 1)``.
+        """
+
+
+class MySQLBackend(StorageBackend):
+    """MySQL via mysql-connector-python (the original backend)."""
+
+    name = "MySQL"
+    dialect = "mysql"
+
+    @property
+    def Error(self) -> Type[Exception]:
+        from mysql.connector import Error
+        return Error
+
+    def connect(self) -> Any:
+        import mysql.connector
+        return mysql.connector.connect(**self.config)
+
+    def upsert(self, table: str, key_column: str, insert_body: str, update_assignments: str) -> str:
+        return f"INSERT INTO {table} {insert_body} ON DUPLICATE KEY UPDATE {update_assignments}"
+
+
+# SQLite support ---------------------------------------------------------------
+
+_FOR_UPDATE = re.compile(r"\s+(FOR\s+UPDATE(\s+OF\s+\w+(\s*,\s*\w+)*)?(\s+(SKIP\s+LOCKED|NOWAIT))?"
+                         r"|LOCK\s+IN\s+SHARE\s+MODE)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def translate_sql(query: str) -> str:
+    """Rewrite MySQL-flavoured SQL for SQLite (placeholders and locking clauses)."""
+    return _FOR_UPDATE.sub("", query).replace("%s", "?")
+
+
+def _to_date(value: Any) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _curdate() -> str:
+    return date.today().isoformat()
+
+
+def _datediff(end: Any, start: Any) -> Optional[int]:
+    end_date, start_date = _to_date(end), _to_date(start)
+    if end_date is None or start_date is None:
+        return None
+    return (end_date - start_date).days
+
+
+def _concat(*parts: Any) -> Optional[str]:
+    # MySQL CONCAT returns NULL if any argument is NULL
+    if any(part is None for part in parts):
+        return None
+    return "".join(str(part) for part in parts)
+
+
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()))
+
+
+class SQLiteCursor:
+    """DB-API cursor wrapper that translates MySQL-style SQL for SQLite."""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, query: str, params: Sequence[Any] = ()) -> "SQLiteCursor":
+        self._cursor.execute(translate_sql(query), tuple(params or ()))
+        return self
+
+    def executemany(self, query: str, seq_of_params: Sequence[Sequence[Any]]) -> "SQLiteCursor":
+        self._cursor.executemany(translate_sql(query), seq_of_params)
+        return self
+
+    def fetchone(self) -> Optional[Tuple]:
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: Optional[int] = None) -> list:
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self) -> list:
+        return self._cursor.fetchall()
+
+    def close(self) -> None:
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+
+class SQLiteConnection:
+    """Connection wrapper giving sqlite3 the mysql.connector methods the app relies on."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self, buffered: bool = False, **kwargs: Any) -> SQLiteCursor:
+        return SQLiteCursor(self._connection.cursor())
+
+    def start_transaction(self, isolation_level: Optional[str] = None) -> None:
+        # IMMEDIATE takes the write lock up front, the SQLite analogue of SELECT ... FOR UPDATE;
+        # with a single writer every transaction is serializable, so isolation_level has nothing to relax
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def is_connected(self) -> bool:
+        try:
+            self._connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def ping(self, reconnect: bool = False) -> None:
+        self._connection.execute("SELECT 1")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._connection.in_transaction
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded SQLite database in WAL mode, with the schema from sql/sqlite_schema.sql."""
+
+    name = "SQLite"
+    dialect = "sqlite"
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config)
+        self.path = self.config.get("path", "library_management_system.db")
+        self.config.setdefault("auto_migrate", True)
+        self._schema_ready = False
+
+    @property
+    def Error(self) -> Type[Exception]:
+        return sqlite3.Error
+
+    def connect(self) -> SQLiteConnection:
+        if self.path == ":memory:":
+            # Share one in-memory database between all pooled connections
+            target, uri = f"file:lms_{id(self)}?mode=memory&cache=shared", True
+        else:
+            target, uri = self.path, False
+        raw = sqlite3.connect(
+            target,
+            uri=uri,
+            timeout=self.config.get("timeout", 30),
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,       # autocommit; transactions are opened explicitly
+            check_same_thread=False,    # pooled connections move between threads
+        )
+        raw.execute(f"PRAGMA journal_mode={self.config.get('journal_mode', 'WAL')}")
+        raw.execute(f"PRAGMA synchronous={self.config.get('synchronous', 'NORMAL')}")
+        raw.execute("PRAGMA foreign_keys=ON")
+        raw.create_function("CURDATE", 0, _curdate)
+        raw.create_function("DATEDIFF", 2, _datediff, deterministic=True)
+        raw.create_function("CONCAT", -1, _concat, deterministic=True)
+        if not self._schema_ready:
+            self.create_schema(raw)
+            self._schema_ready = True
+        return SQLiteConnection(raw)
+
+    def upsert(self, table: str, key_column: str, insert_body: str, update_assignments: str) -> str:
+        return f"INSERT INTO {table} {insert_body} ON CONFLICT({key_column}) DO UPDATE SET {update_assignments}"
+
+    def create_schema(self, connection: sqlite3.Connection) -> None:
+        """Create the library tables if they do not exist yet."""
+        with open(os.path.join(SCHEMA_DIR, "sqlite_schema.sql"), encoding="utf-8") as handle:
+            connection.executescript(handle.read())
+
+
+BACKENDS: Dict[str, Type[StorageBackend]] = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def get_backend(name: str, config: Optional[Dict[str, Any]] = None) -> StorageBackend:
+    """Instantiate the backend registered under ``name``."""
+    try:
+        return BACKENDS[name.lower()](config)
+    except KeyError:
+        raise ValueError(f"Unknown DB backend '{name}'. Choose one of: {', '.join(BACKENDS)}") from None
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Circulation Load Benchmark
+Generates a synthetic library (catalog, members and loan history) at a
+configurable scale, then drives a weighted mix of circulation operations
+through the non-interactive API from several threads and reports throughput
+and p50/p95/p99 latency per operation.
+
+Results can be saved as JSON and compared with an earlier run to spot
+regressions. Runs on the embedded SQLite backend: a temporary file by
+default, an existing database file with --db, or ":memory:" for a purely
+in-process run.
+
+Usage:
+    python benchmarks/bench_circulation.py --books 20000 --members 5000 --loans 100000
+    python benchmarks/bench_circulation.py --loans 1000000 --db big.db --output after.json --compare before.json
+    python benchmarks/bench_circulation.py --mix issue=45,return=45,search=10 --threads 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import CirculationError, LibraryManagementSystem  # noqa: E402
+from backends import SQLiteBackend  # noqa: E402
+from bulk_import import ENTITIES  # noqa: E402
+from config import APP_CONFIG  # noqa: E402
+from bench_search import QUERIES, SURNAMES, populate as populate_books  # noqa: E402
+
+# Operation name -> relative weight. Names follow the CLI menu actions they stand in for.
+DEFAULT_MIX = {"issue_book": 30, "return_book": 30, "search_books": 25,
+               "show_transactions": 10, "most_issued_books": 5}
+OPEN_LOAN_FRACTION = 0.05   # Share of generated loans that are still out
+INSERT_BATCH = 50_000
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse "issue_book=30,return_book=30,..." (the _book/_books suffixes may be left out)."""
+    aliases = {name.split("_")[0]: name for name in DEFAULT_MIX}
+    aliases.update({"most": "most_issued_books", "show": "show_transactions"})
+    mix = {}
+    for part in filter(None, (piece.strip() for piece in text.split(","))):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        name = name if name in DEFAULT_MIX else aliases.get(name, name)
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}' (use {', '.join(DEFAULT_MIX)})")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight for '{name}' must be a whole number") from None
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("the mix needs at least one operation with a positive weight")
+    return mix
+
+
+# Synthetic data -----------------------------------------------------------------
+
+def _insert(lms: LibraryManagementSystem, entity: str, rows: List[Tuple]) -> None:
+    with lms.transaction() as cursor:
+        cursor.executemany(ENTITIES[entity].insert_query, rows)
+    rows.clear()
+
+
+def populate_members(lms: LibraryManagementSystem, size: int, seed: int = 42) -> None:
+    """Insert ``size`` synthetic members in large batches."""
+    rng = random.Random(seed)
+    batch: List[Tuple] = []
+    for i in range(size):
+        first, last = rng.choice(SURNAMES), rng.choice(SURNAMES)
+        batch.append((first, last, f"{first.lower()}.{last.lower()}.{i}@example.org", f"{5550000000 + i}"))
+        if len(batch) == INSERT_BATCH:
+            _insert(lms, "members", batch)
+    if batch:
+        _insert(lms, "members", batch)
+
+
+def populate_loans(lms: LibraryManagementSystem, loans: int, books: int, members: int, seed: int = 42) -> int:
+    """Insert ``loans`` synthetic loans; most are returned, a few are still open.
+
+    Open loans respect the circulation rules (one per book, fewer than the
+    borrowing limit per member) so the workload starts from a valid state.
+    Returns the number of open loans created.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    grace, rate = APP_CONFIG["grace_period_days"], APP_CONFIG["fine_rate_per_day"]
+    per_member = max(APP_CONFIG["max_books_per_member"] - 1, 0)
+    open_count = min(int(loans * OPEN_LOAN_FRACTION), books // 2, members * per_member)
+    borrowers = [member_id for member_id in range(1, members + 1) for _ in range(per_member)]
+    rng.shuffle(borrowers)
+    open_loans = zip(rng.sample(range(1, books + 1), open_count), borrowers)
+
+    batch: List[Tuple] = []
+    for _ in range(loans - open_count):
+        issued = today - timedelta(days=rng.randint(30, 730))
+        returned = min(issued + timedelta(days=rng.randint(1, 45)), today)
+        days = (returned - issued).days
+        # Historical fines are settled, so members start out free to borrow
+        batch.append((rng.randint(1, books), rng.randint(1, members), issued, returned,
+                      (days - grace) * rate if days > grace else 0.0, 1))
+        if len(batch) == INSERT_BATCH:
+            _insert(lms, "transactions", batch)
+    for book_id, member_id in open_loans:
+        batch.append((book_id, member_id, today - timedelta(days=rng.randint(0, 40)), None, 0.0, 0))
+        if len(batch) == INSERT_BATCH:
+            _insert(lms, "transactions", batch)
+    if batch:
+        _insert(lms, "transactions", batch)
+    lms.inventory.rebuild()  # one copy per title, held by its open loan if it has one
+    lms.member_status.rebuild()
+    lms.analytics.rebuild()
+    return open_count
+
+
+# Workload -------------------------------------------------------------------------
+
+class CirculationWorkload:
+    """Picks valid arguments for each operation and runs it against ``lms``.
+
+    Open loans are tracked in memory so issues mostly target books that are on
+    the shelf and returns target loans that are really open; a rule rejection
+    still counts as a completed (timed) operation.
+    """
+
+    def __init__(self, lms: LibraryManagementSystem):
+        self.lms = lms
+        self.member_count = lms.execute_query("SELECT COUNT(*) FROM members", fetch=True)[0][0]
+        self.book_ids = [row[0] for row in lms.stream_query("SELECT ID FROM books")]
+        self.open_loans: List[Tuple[int, int]] = list(
+            lms.stream_query("SELECT ID, BookID FROM transactions WHERE ReturnDate IS NULL"))
+        self.on_loan = {book_id for _, book_id in self.open_loans}
+        self._lock = threading.Lock()
+        self.operations: Dict[str, Callable[[random.Random], bool]] = {
+            "issue_book": self.issue_book,
+            "return_book": self.return_book,
+            "search_books": self.search_books,
+            "show_transactions": self.show_transactions,
+            "most_issued_books": self.most_issued_books,
+        }
+
+    def issue_book(self, rng: random.Random) -> bool:
+        with self._lock:
+            book_id = rng.choice(self.book_ids)
+            for _ in range(10):
+                if book_id not in self.on_loan:
+                    break
+                book_id = rng.choice(self.book_ids)
+            claimed = book_id not in self.on_loan
+            self.on_loan.add(book_id)
+        try:
+            result = self.lms.issue(book_id, rng.randint(1, self.member_count))
+        except CirculationError:
+            if claimed:
+                with self._lock:
+                    self.on_loan.discard(book_id)
+            return False
+        with self._lock:
+            self.open_loans.append((result["transaction_id"], book_id))
+        return True
+
+    def return_book(self, rng: random.Random) -> bool:
+        with self._lock:
+            if not self.open_loans:
+                return False
+            position = rng.randrange(len(self.open_loans))
+            self.open_loans[position], self.open_loans[-1] = self.open_loans[-1], self.open_loans[position]
+            transaction_id, book_id = self.open_loans.pop()
+        try:
+            self.lms.return_transaction(transaction_id)
+        except CirculationError:
+            return False
+        finally:
+            with self._lock:
+                self.on_loan.discard(book_id)
+        return True
+
+    def search_books(self, rng: random.Random) -> bool:
+        self.lms.search(rng.choice(QUERIES))
+        return True
+
+    def show_transactions(self, rng: random.Random) -> bool:
+        # The first two pages, as a clerk paging once through the history would see them
+        for _ in islice(self.lms.iter_pages("transactions"), 2):
+            pass
+        return True
+
+    def most_issued_books(self, rng: random.Random) -> bool:
+        self.lms.analytics.top_books(10)
+        return True
+
+
+def run_workload(workload: CirculationWorkload, mix: Dict[str, int], operations: int,
+                 threads: int, seed: int, warmup: int = 0) -> Tuple[float, Dict[str, Dict[str, Any]]]:
+    """Run ``operations`` weighted operations on ``threads`` threads; return (wall seconds, samples)."""
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+    warm_rng = random.Random(seed - 1)
+    for name in warm_rng.choices(names, weights, k=warmup):
+        workload.operations[name](warm_rng)
+
+    samples: Dict[str, Dict[str, Any]] = {name: {"latencies": [], "rejected": 0, "errors": 0} for name in names}
+    samples_lock = threading.Lock()
+
+    def worker(index: int, count: int) -> None:
+        rng = random.Random(seed + index)
+        local = {name: {"latencies": [], "rejected": 0, "errors": 0} for name in names}
+        for name in rng.choices(names, weights, k=count):
+            started = time.perf_counter()
+            try:
+                completed = workload.operations[name](rng)
+            except Exception as e:
+                local[name]["errors"] += 1
+                logging.getLogger(__name__).warning(f"{name} failed: {e}")
+                continue
+            local[name]["latencies"].append(time.perf_counter() - started)
+            if not completed:
+                local[name]["rejected"] += 1
+        with samples_lock:
+            for name, values in local.items():
+                samples[name]["latencies"].extend(values["latencies"])
+                samples[name]["rejected"] += values["rejected"]
+                samples[name]["errors"] += values["errors"]
+
+    shares = [operations // threads + (1 if i < operations % threads else 0) for i in range(threads)]
+    pool = [threading.Thread(target=worker, args=(i, share)) for i, share in enumerate(shares)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - started, samples
+
+
+def summarize(wall: float, samples: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-operation count, throughput and latency percentiles (milliseconds)."""
+    results = {}
+    for name, values in samples.items():
+        latencies = sorted(seconds * 1000 for seconds in values["latencies"])
+        if len(latencies) >= 2:
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0.0
+        results[name] = {
+            "count": len(latencies),
+            "rejected": values["rejected"],
+            "errors": values["errors"],
+            "throughput": round(len(latencies) / wall, 2) if wall else 0.0,
+            "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+            "p99_ms": round(p99, 3),
+            "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+        }
+    return results
+
+
+def print_results(result: Dict[str, Any]) -> None:
+    scale = result["scale"]
+    print(f"\n📊 {scale['books']:,} books, {scale['members']:,} members, {scale['loans']:,} loans - "
+          f"{result['operations']:,} operations on {result['threads']} threads in {result['wall_seconds']:.2f}s "
+          f"({result['throughput']:.1f} ops/s)")
+    print("-" * 92)
+    print(f"{'Operation':<20} {'Count':>7} {'Rejected':>9} {'Errors':>7} {'Ops/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Max ms':>8}")
+    print("-" * 92)
+    for name, stats in result["results"].items():
+        print(f"{name:<20} {stats['count']:>7} {stats['rejected']:>9} {stats['errors']:>7} "
+              f"{stats['throughput']:>9.1f} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}")
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], threshold: float) -> bool:
+    """Print throughput and p95 changes against an earlier run; True if anything regressed past ``threshold`` %."""
+    def change(new: float, old: float) -> float:
+        return (new - old) / old * 100 if old else 0.0
+
+    print(f"\n🔍 Compared with {previous.get('timestamp', 'previous run')} (regression threshold {threshold:g}%)")
+    if any(previous.get(key) != current[key] for key in ("scale", "mix", "threads", "backend")):
+        print("⚠️ Scale, mix, threads or backend differ between the runs; the comparison is only indicative.")
+    print("-" * 78)
+    print(f"{'Operation':<20} {'Ops/s before':>12} {'after':>9} {'change':>8} "
+          f"{'p95 before':>11} {'after':>8} {'change':>8}")
+    print("-" * 78)
+    regressed = False
+    for name, stats in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old:
+            print(f"{name:<20} {'(new)':>12}")
+            continue
+        throughput_change = change(stats["throughput"], old["throughput"])
+        p95_change = change(stats["p95_ms"], old["p95_ms"])
+        flag = throughput_change < -threshold or p95_change > threshold
+        regressed = regressed or flag
+        print(f"{name:<20} {old['throughput']:>12.1f} {stats['throughput']:>9.1f} {throughput_change:>+7.1f}% "
+              f"{old['p95_ms']:>11.2f} {stats['p95_ms']:>8.2f} {p95_change:>+7.1f}%{'  ⚠️' if flag else ''}")
+    print("❌ Regression detected." if regressed else "✅ No regressions beyond the threshold.")
+    return regressed
+
+
+def open_library(path: str) -> LibraryManagementSystem:
+    lms = LibraryManagementSystem(backend=SQLiteBackend({"path": path}))
+    # One INFO line per issue/return would dominate the timings and flood the log
+    logging.getLogger().setLevel(logging.WARNING)
+    return lms
+
+
+def benchmark(args: argparse.Namespace, path: str) -> Dict[str, Any]:
+    lms = open_library(path)
+    existing = lms.execute_query("SELECT COUNT(*) FROM books", fetch=True)[0][0]
+    started = time.perf_counter()
+    if existing:
+        print(f"♻️ Reusing the {existing:,} books already in {path}")
+    else:
+        print(f"🏗️ Generating {args.books:,} books, {args.members:,} members and {args.loans:,} loans...")
+        populate_books(lms, args.books, args.seed)
+        populate_members(lms, args.members, args.seed)
+        populate_loans(lms, args.loans, args.books, args.members, args.seed)
+    setup_seconds = time.perf_counter() - started
+    scale = {table: lms.execute_query(f"SELECT COUNT(*) FROM {table}", fetch=True)[0][0]
+             for table in ("books", "members")}
+    scale["loans"] = lms.execute_query("SELECT COUNT(*) FROM transactions", fetch=True)[0][0]
+
+    workload = CirculationWorkload(lms)
+    wall, samples = run_workload(workload, args.mix, args.operations, args.threads, args.seed, args.warmup)
+    results = summarize(wall, samples)
+    if lms.profiler.enabled:  # LMS_PROFILE=on
+        print(f"\n{lms.profiler.report()}")
+    lms.pool.close_all()
+    completed = sum(stats["count"] for stats in results.values())
+    return {
+        "benchmark": "circulation",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": lms.backend.name,
+        "scale": scale,
+        "mix": args.mix,
+        "threads": args.threads,
+        "operations": args.operations,
+        "seed": args.seed,
+        "setup_seconds": round(setup_seconds, 2),
+        "wall_seconds": round(wall, 3),
+        "throughput": round(completed / wall, 2) if wall else 0.0,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the circulation operations on synthetic data.")
+    parser.add_argument("--books", type=int, default=10_000, help="catalog size to generate")
+    parser.add_argument("--members", type=int, default=2_000, help="members to generate")
+    parser.add_argument("--loans", type=int, default=10_000, help="historical loans to generate")
+    parser.add_argument("--operations", type=int, default=2_000, help="timed operations to run")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent clerks")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed operations run first (builds caches)")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="weighted operation mix, e.g. issue=30,return=30,search=25,show=10,most=5")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="SQLite file to use (reused if it already has data) or ':memory:'")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on a regression")
+    args = parser.parse_args()
+
+    previous: Optional[Dict[str, Any]] = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            previous = json.load(handle)
+
+    if args.db == ":memory:" and args.threads > 1:
+        # Shared-cache in-memory databases fail fast on lock conflicts instead of waiting
+        print("⚠️ An in-memory database runs with a single thread; use a file for concurrent runs.")
+        args.threads = 1
+    if args.db:
+        result = benchmark(args, args.db)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = benchmark(args, os.path.join(tmp, "bench.db"))
+
+    print_results(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    if previous is not None and compare(result, previous, args.threshold) and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
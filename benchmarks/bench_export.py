@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Report Export Benchmark
+Generates a loan history on the embedded SQLite backend and exports it with
+export.py in each format, reporting rows per second, output size and the
+peak Python memory of the export (tracemalloc). For contrast it also times
+the old approach of fetching the whole result set before writing it.
+
+Usage:
+    python benchmarks/bench_export.py --loans 1000000
+    python benchmarks/bench_export.py --loans 10000000 --db big.db --formats csv.gz,parquet
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import LibraryManagementSystem  # noqa: E402
+from backends import SQLiteBackend  # noqa: E402
+from bench_circulation import populate_loans, populate_members  # noqa: E402
+from bench_search import populate as populate_books  # noqa: E402
+from archive import load_pyarrow  # noqa: E402
+from export import EXPORTS, ReportExporter, build_query  # noqa: E402
+
+
+def measure(func: Callable[[], Any]) -> Dict[str, float]:
+    """Wall time and peak traced Python memory of one call."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / 1e6}
+
+
+def fetch_all_then_write(lms: LibraryManagementSystem, path: str) -> None:
+    """The pre-export approach: the whole result set in memory, then written out."""
+    query, params = build_query(EXPORTS["transactions"], {})
+    rows = lms.execute_query(query, params, fetch=True) or []
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        csv.writer(handle).writerows(rows)
+
+
+def run(args: argparse.Namespace, directory: str) -> List[Dict[str, Any]]:
+    path = args.db or os.path.join(directory, "export.db")
+    fresh = not os.path.exists(path)
+    lms = LibraryManagementSystem(backend=SQLiteBackend({"path": path}))
+    logging.getLogger().setLevel(logging.WARNING)
+    if fresh:
+        print(f"🏗️ Generating {args.loans:,} loans...")
+        populate_books(lms, args.books)
+        populate_members(lms, args.members)
+        populate_loans(lms, args.loans, args.books, args.members)
+    total = lms.execute_query("SELECT COUNT(*) FROM transactions_all", fetch=True)[0][0]
+
+    results = []
+    exporter = ReportExporter(lms, batch_size=args.batch_size)
+    for suffix in args.formats:
+        if suffix == "parquet":
+            try:
+                load_pyarrow()
+            except RuntimeError:
+                print("⚠️ Skipping parquet: pyarrow is not installed")
+                continue
+        target = os.path.join(directory, f"transactions.{suffix}")
+        stats = measure(lambda: exporter.export("transactions", target))
+        results.append({"method": f"export.py -> {suffix}", **stats, "rows": total,
+                        "size_mb": os.path.getsize(target) / 1e6})
+        os.remove(target)
+    if args.fetch_all:
+        target = os.path.join(directory, "fetchall.csv")
+        stats = measure(lambda: fetch_all_then_write(lms, target))
+        results.append({"method": "fetchall -> csv", **stats, "rows": total,
+                        "size_mb": os.path.getsize(target) / 1e6})
+    lms.pool.close_all()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure streaming export speed and memory.")
+    parser.add_argument("--books", type=int, default=20_000, help="catalog size to generate")
+    parser.add_argument("--members", type=int, default=5_000, help="members to generate")
+    parser.add_argument("--loans", type=int, default=1_000_000, help="loans to generate")
+    parser.add_argument("--formats", type=lambda text: [part for part in text.split(",") if part],
+                        default=["csv", "csv.gz", "jsonl.gz", "parquet"], help="comma-separated file suffixes")
+    parser.add_argument("--batch-size", type=int, help="rows per fetch and write")
+    parser.add_argument("--no-fetch-all", dest="fetch_all", action="store_false",
+                        help="skip the fetch-everything baseline")
+    parser.add_argument("--db", help="SQLite file to reuse or create (default: a temporary file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(args, directory)
+    print(f"\n📤 Exporting {results[0]['rows']:,} transactions" if results else "\n📤 Nothing measured")
+    print(f"{'Method':<24} {'Seconds':>8} {'Rows/s':>10} {'Peak MB':>8} {'File MB':>8}")
+    for result in results:
+        print(f"{result['method']:<24} {result['seconds']:>8.2f} {result['rows'] / result['seconds']:>10,.0f} "
+              f"{result['peak_mb']:>8.1f} {result['size_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
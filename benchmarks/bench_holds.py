@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Hold Fulfilment Benchmark
+Builds bestsellers with deep hold queues (thousands of waiting members per
+title) on the embedded SQLite backend, then measures the circulation path
+that hold fulfilment adds to: returns that set the copy aside for the next
+hold and the pickup issue that collects it, against returns and issues of
+titles with no queue. Also times placing a hold at the back of a deep queue
+and the batch expiry of uncollected holds.
+
+Usage:
+    python benchmarks/bench_holds.py --titles 20 --copies 5 --holds 2000 --returns 5000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import LibraryManagementSystem  # noqa: E402
+from backends import SQLiteBackend  # noqa: E402
+from config import APP_CONFIG  # noqa: E402
+from bench_circulation import populate_members, summarize  # noqa: E402
+
+HOLD_INSERT = "INSERT INTO holds (BookID, MemberID, Status, PlacedOn) VALUES (%s, %s, 'waiting', %s)"
+
+
+class Timer:
+    """Collects latencies per operation name."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, Dict[str, Any]] = {}
+
+    def __call__(self, name: str, func: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        result = func()
+        self.samples.setdefault(name, {"latencies": [], "rejected": 0, "errors": 0})["latencies"].append(
+            time.perf_counter() - started)
+        return result
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        # Throughput per operation is serial: operations per second of time spent in that operation
+        return {name: summarize(sum(values["latencies"]), {name: values})[name]
+                for name, values in self.samples.items()}
+
+
+def build_library(lms: LibraryManagementSystem, titles: int, copies: int, holds: int,
+                  spare: int) -> Tuple[List[int], List[int], deque, deque]:
+    """Create queued and unqueued titles with every copy on loan; returns (queued, plain, loans, spare members)."""
+    queued = [lms.create_book(f"Bestseller {i}", "Benchmark Author", "Fiction", 2024, 20.0, copies)
+              for i in range(titles)]
+    plain = [lms.create_book(f"Backlist {i}", "Benchmark Author", "Fiction", 2001, 10.0, copies)
+             for i in range(titles)]
+    borrowers = 2 * titles * copies
+    populate_members(lms, borrowers + titles * holds + spare)
+    lms.member_status.rebuild()
+    member = iter(range(1, borrowers + titles * holds + spare + 1))
+
+    loans: deque = deque()
+    for book_id in queued + plain:
+        for _ in range(copies):
+            loans.append((lms.issue(book_id, next(member))["transaction_id"], book_id))
+    placed_on = date.today() - timedelta(days=30)
+    with lms.transaction() as cursor:
+        for book_id in queued:
+            cursor.executemany(HOLD_INSERT, [(book_id, next(member), placed_on) for _ in range(holds)])
+    return queued, plain, loans, deque(member)
+
+
+def run(args: argparse.Namespace, path: str) -> Dict[str, Any]:
+    lms = LibraryManagementSystem(backend=SQLiteBackend({"path": path}))
+    logging.getLogger().setLevel(logging.WARNING)
+
+    started = time.perf_counter()
+    # Spare members borrow the titles without holds in rotation, then place the timed holds
+    queued, plain, loans, spare = build_library(lms, args.titles, args.copies, args.holds,
+                                                args.titles * (args.copies * 2 + args.places))
+    print(f"🏗️ {args.titles} titles x {args.copies} copies with {args.holds:,} holds each, plus "
+          f"{args.titles} titles without holds ({time.perf_counter() - started:.1f}s)")
+    queued_set = set(queued)
+    timer = Timer()
+
+    # Returns of queued titles hand the copy to the next hold; the holder collects it straight away.
+    # Returns of plain titles put the copy back on the shelf and it is issued to another member.
+    for _ in range(args.returns):
+        transaction_id, book_id = loans.popleft()
+        if book_id in queued_set:
+            result = timer("return -> next hold", lambda: lms.return_transaction(transaction_id))
+            if result["held_for"] is None:
+                raise SystemExit("Hold queue ran dry; use more --holds or fewer --returns.")
+            issued = timer("issue (collect hold)", lambda: lms.issue(book_id, result["held_for"]))
+        else:
+            timer("return -> shelf", lambda: lms.return_transaction(transaction_id))
+            member_id = spare.popleft()
+            spare.append(member_id)
+            issued = timer("issue (from shelf)", lambda: lms.issue(book_id, member_id))
+        loans.append((issued["transaction_id"], book_id))
+
+    # Placing a hold at the back of each deep queue
+    for book_id in queued:
+        for _ in range(args.places):
+            member_id = spare.popleft()
+            timer("place hold (deep queue)", lambda: lms.holds.place(book_id, member_id))
+
+    # Uncollected holds: return every queued copy without a pickup, then expire them all in batches
+    for transaction_id, book_id in list(loans):
+        if book_id in queued_set:
+            lms.return_transaction(transaction_id)
+    lms.execute_query("UPDATE holds SET ReadyOn = %s WHERE Status = 'ready'",
+                      (date.today() - timedelta(days=APP_CONFIG["hold_pickup_days"] + 1),))
+    report = lms.holds.expire(batch_size=args.batch_size)
+    lms.pool.close_all()
+
+    return {
+        "benchmark": "holds",
+        "scale": {"titles": args.titles, "copies": args.copies, "holds_per_title": args.holds},
+        "returns": args.returns,
+        "results": timer.results(),
+        "expiry": {"expired": report.expired, "passed_on": report.passed_on, "batches": report.batches,
+                   "seconds": round(report.elapsed, 3),
+                   "per_second": round(report.expired / report.elapsed, 1) if report.elapsed else 0.0},
+    }
+
+
+def print_results(result: Dict[str, Any]) -> None:
+    print(f"\n📊 {result['returns']:,} return + issue cycles")
+    print("-" * 84)
+    print(f"{'Operation':<26} {'Count':>7} {'Ops/s':>9} {'Mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'Max ms':>8}")
+    print("-" * 84)
+    for name, stats in result["results"].items():
+        print(f"{name:<26} {stats['count']:>7} {stats['throughput']:>9.1f} {stats['mean_ms']:>8.2f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}")
+    expiry = result["expiry"]
+    print(f"\n📌 Expired {expiry['expired']:,} uncollected holds in {expiry['batches']} batches "
+          f"({expiry['seconds']:.2f}s, {expiry['per_second']:,.0f} holds/s); "
+          f"{expiry['passed_on']:,} copies passed to the next hold")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure return throughput with hold fulfilment.")
+    parser.add_argument("--titles", type=int, default=20, help="titles with a hold queue (and as many without)")
+    parser.add_argument("--copies", type=int, default=5, help="copies per title")
+    parser.add_argument("--holds", type=int, default=2_000, help="waiting holds per queued title")
+    parser.add_argument("--returns", type=int, default=5_000, help="timed return + issue cycles")
+    parser.add_argument("--places", type=int, default=20, help="holds placed per queued title during the run")
+    parser.add_argument("--batch-size", type=int, help="holds per expiry transaction")
+    parser.add_argument("--db", help="SQLite file to create (default: a temporary file)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.db:
+        result = run(args, args.db)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run(args, os.path.join(tmp, "holds.db"))
+    print_results(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Logging Overhead Benchmark
+Measures what a log call costs the thread that makes it, comparing the old
+synchronous FileHandler + f-string setup with the queued pipeline from
+logging_setup (deferred %-formatting, JSON written by a listener thread),
+then bounds the overhead per issue + return cycle on the SQLite backend.
+
+Usage:
+    python benchmarks/bench_logging.py --calls 50000 --cycles 2000
+"""
+
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import LOG_CONFIG  # noqa: E402
+from logging_setup import (BatchingQueueListener, DeferredQueueHandler, JSONFormatter,  # noqa: E402
+                           configure_logging, stop_logging)
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"mean": statistics.fmean(samples), "p50": cuts[49], "p99": cuts[98]}
+
+
+def time_calls(log: Callable[[int], None], calls: int) -> Dict[str, float]:
+    """Per-call latency in microseconds, as seen by the calling thread."""
+    samples = []
+    for i in range(calls):
+        started = time.perf_counter()
+        log(i)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return _percentiles(samples)
+
+
+def _logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers[:] = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def bench_calls(calls: int, directory: str) -> None:
+    title, member, fine = "The Left Hand of Darkness", "Ursula Kowalski", 12.5
+
+    sync_handler = logging.FileHandler(os.path.join(directory, "sync.log"))
+    sync_handler.setFormatter(logging.Formatter(LOG_CONFIG["format"]))
+    sync = _logger("sync", sync_handler)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    file_handler = logging.handlers.RotatingFileHandler(os.path.join(directory, "queued.log"),
+                                                        maxBytes=LOG_CONFIG["max_bytes"], backupCount=2)
+    file_handler.setFormatter(JSONFormatter())
+    listener = BatchingQueueListener(log_queue, file_handler, flush_interval=LOG_CONFIG["flush_interval"])
+    listener.start()
+    queued = _logger("queued", DeferredQueueHandler(log_queue))
+
+    results = {
+        "sync FileHandler, f-string": time_calls(
+            lambda i: sync.info(f"Book returned: {title} by {member}, Fine: ${fine:.2f}"), calls),
+        "queued JSON, %-args": time_calls(
+            lambda i: queued.info("Book returned: %s by %s, Fine: $%.2f", title, member, fine,
+                                  extra={"transaction_id": i}), calls),
+        "below level (debug)": time_calls(
+            lambda i: queued.debug("Book returned: %s by %s, Fine: $%.2f", title, member, fine), calls),
+    }
+    started = time.perf_counter()
+    listener.stop()  # waits until the listener has written everything
+    drain = time.perf_counter() - started
+    sync_handler.close()
+    file_handler.close()
+
+    print(f"\n📝 {calls:,} log calls, latency in the calling thread (µs)")
+    print(f"{'Setup':<30} {'Mean':>8} {'p50':>8} {'p99':>8}")
+    for name, stats in results.items():
+        print(f"{name:<30} {stats['mean']:>8.2f} {stats['p50']:>8.2f} {stats['p99']:>8.2f}")
+    print(f"(listener drained the remaining queue in {drain * 1000:.1f} ms)")
+
+
+def bench_operations(cycles: int, directory: str) -> None:
+    from app import LibraryManagementSystem
+    from backends import SQLiteBackend
+
+    lms = LibraryManagementSystem(backend=SQLiteBackend({"path": os.path.join(directory, "bench.db")}))
+    with lms.transaction() as cursor:
+        cursor.execute(lms.BOOK_INSERT_QUERY, ("Solaris", "Stanislaw Lem", "Science", 1961, 12.0))
+        book_id = cursor.lastrowid
+        lms.inventory.add_copies(book_id, 1, cursor)
+        cursor.execute(lms.MEMBER_INSERT_QUERY, ("Ada", "Okafor", "ada@example.org", "5550000000"))
+        member_id = cursor.lastrowid
+
+    def cycle() -> float:
+        started = time.perf_counter()
+        result = lms.issue(book_id, member_id)
+        lms.return_transaction(result["transaction_id"])
+        return (time.perf_counter() - started) * 1e6
+
+    root = logging.getLogger()
+    timings = {}
+    for _ in range(2):  # alternate twice so drift in the database does not favour either side
+        for label, level in (("logging on", logging.INFO), ("logging off", logging.CRITICAL)):
+            root.setLevel(level)
+            samples = [cycle() for _ in range(cycles // 2)]
+            timings.setdefault(label, []).extend(samples)
+    root.setLevel(logging.INFO)
+    lms.pool.close_all()
+
+    on, off = statistics.median(timings["logging on"]), statistics.median(timings["logging off"])
+    print(f"\n📚 {cycles:,} issue + return cycles (2 INFO records each), median µs per cycle")
+    print(f"logging on {on:.1f}, logging off {off:.1f}: overhead {on - off:.1f} µs "
+          f"({(on - off) / off * 100 if off else 0:.1f}%) per cycle")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the cost of logging on the request path.")
+    parser.add_argument("--calls", type=int, default=50_000, help="log calls per setup")
+    parser.add_argument("--cycles", type=int, default=2_000, help="issue + return cycles")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the benchmark's own records out of library_system.log
+        configure_logging(dict(LOG_CONFIG, file=os.path.join(directory, "app.log"), console=False))
+        bench_calls(args.calls, directory)
+        bench_operations(args.cycles, directory)
+        stop_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Search Benchmark
+Compares the leading-wildcard LIKE query with the inverted search index on
+synthetic catalogs, using the embedded SQLite backend.
+
+Usage:
+    python benchmarks/bench_search.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import LibraryManagementSystem  # noqa: E402
+from backends import SQLiteBackend  # noqa: E402
+
+WORDS = ("shadow river garden empire silent winter night stone crown ocean machine secret "
+         "forest glass dragon letter city storm memory island journey summer kingdom fire").split()
+SURNAMES = ("Tolkien Austen Orwell Morrison Atwood Okafor Nakamura Garcia Novak Lindqvist "
+            "Haddad Kowalski Mbeki Rossi Dubois Chen Patel Ivanova Murphy Silva").split()
+GENRES = ["Fiction", "Fantasy", "History", "Science", "Poetry", "Mystery", "Biography", "Travel"]
+QUERIES = ["tolkien", "winter", "dragon king", "sec", "ocean storm", "zzz"]
+
+LIKE_QUERY = "SELECT ID, title, Author, Genre, PublishedYear, Price FROM books WHERE title LIKE %s OR Author LIKE %s"
+
+
+def populate(lms: LibraryManagementSystem, size: int, seed: int = 42) -> None:
+    """Insert ``size`` synthetic books in large batches."""
+    rng = random.Random(seed)
+    batch: List[tuple] = []
+    for i in range(size):
+        title = " ".join(rng.sample(WORDS, rng.randint(2, 4))).title()
+        author = f"{rng.choice(SURNAMES)} {rng.choice(SURNAMES)}"
+        batch.append((title, author, rng.choice(GENRES), rng.randint(1900, 2025), round(rng.uniform(5, 80), 2)))
+        if len(batch) == 50_000 or i == size - 1:
+            with lms.transaction() as cursor:
+                cursor.executemany(lms.BOOK_INSERT_QUERY, batch)
+            batch.clear()
+
+
+def time_calls(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": statistics.median(samples), "max_ms": max(samples)}
+
+
+def run(size: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        lms = LibraryManagementSystem(backend=SQLiteBackend({"path": os.path.join(tmp, "bench.db")}))
+        started = time.perf_counter()
+        populate(lms, size)
+        load_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        lms.search_index  # build once, as the app does on first search
+        build_s = time.perf_counter() - started
+
+        print(f"\n📚 {size:,} books (load {load_s:.1f}s, index build {build_s:.1f}s)")
+        print(f"{'Query':<14} {'LIKE median':>12} {'Index median':>13} {'Speedup':>9} {'Hits':>8}")
+        for keyword in QUERIES:
+            like = time_calls(lambda: lms.execute_query(LIKE_QUERY, (f"%{keyword}%", f"%{keyword}%"), fetch=True),
+                              repeat)
+            indexed = time_calls(lambda: lms.search(keyword), repeat)
+            total, _ = lms.search(keyword)
+            speedup = like["median_ms"] / indexed["median_ms"] if indexed["median_ms"] else float("inf")
+            print(f"{keyword:<14} {like['median_ms']:>10.2f}ms {indexed['median_ms']:>11.2f}ms "
+                  f"{speedup:>8.1f}x {total:>8}")
+        lms.pool.close_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark LIKE search against the inverted index.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query")
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Times fresh interpreter processes for scripted use: the interactive menu of
+app.py driven through stdin (import everything, connect, show the menu,
+run one report, exit) against the lms.py subcommands, and a batch of
+commands in one lms.py process against one process per command. Runs on a
+small SQLite library built in a temporary directory.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 10 --batch 50
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def build_library(path: str) -> None:
+    """A small library (the point is process startup, not query cost)."""
+    from app import LibraryManagementSystem
+    from backends import SQLiteBackend
+    from bench_circulation import populate_loans, populate_members
+    from bench_search import populate as populate_books
+
+    lms = LibraryManagementSystem(backend=SQLiteBackend({"path": path, "auto_migrate": True}))
+    logging.getLogger().setLevel(logging.WARNING)
+    populate_books(lms, 2_000)
+    populate_members(lms, 500)
+    populate_loans(lms, 10_000, 2_000, 500)
+    lms.pool.close_all()
+
+
+def time_process(command: List[str], env: Dict[str, str], cwd: str, stdin: Optional[str],
+                 repeat: int) -> Dict[str, float]:
+    """Median and best wall time (ms) of a fresh process running ``command`` in ``cwd``."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, input=stdin, env=env, cwd=cwd, text=True, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median": statistics.median(samples), "best": min(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure process startup for scripted library use.")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per measurement")
+    parser.add_argument("--batch", type=int, default=50, help="commands in the batch comparison")
+    args = parser.parse_args()
+
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as directory:
+        db = os.path.join(directory, "startup.db")
+        build_library(db)
+        # Processes run in the temporary directory, so their library_system.log is written there
+        env = dict(os.environ, DB_BACKEND="sqlite", SQLITE_PATH=db, PYTHONPATH=ROOT)
+        lms = [python, os.path.join(ROOT, "lms.py")]
+        report = ["report", "top-books", "--limit", "5"]
+        # Analytics -> most issued (limit 5) -> Enter -> Exit
+        menu_input = "9\n1\n5\n\n11\n"
+        runs = {
+            "python -c pass (interpreter)": ([python, "-c", "pass"], None),
+            "lms.py --help": (lms + ["--help"], None),
+            "import app (no connection)": ([python, "-c", "import app"], None),
+            "import mysql.connector (driver)": ([python, "-c", "import mysql.connector"], None),
+            "app.py menu -> top books": ([python, os.path.join(ROOT, "app.py")], menu_input),
+            "lms.py report top-books": (lms + report, None),
+            "lms.py search": (lms + ["search", "history", "--limit", "5"], None),
+        }
+        print(f"🚀 Fresh process wall time, {args.repeat} runs each (ms)")
+        print(f"{'Command':<34} {'Median':>8} {'Best':>8}")
+        for name, (command, stdin) in runs.items():
+            stats = time_process(command, env, directory, stdin, args.repeat)
+            print(f"{name:<34} {stats['median']:>8.1f} {stats['best']:>8.1f}")
+
+        lines = "\n".join(" ".join(report) for _ in range(args.batch)) + "\n"
+        one_process = time_process(lms + ["batch"], env, directory, lines, max(args.repeat // 2, 1))["median"]
+        started = time.perf_counter()
+        for _ in range(args.batch):
+            subprocess.run(lms + report, env=env, cwd=directory, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        separate = (time.perf_counter() - started) * 1000
+        print(f"\n📋 {args.batch} report commands: one lms.py batch {one_process:.0f} ms, "
+              f"separate processes {separate:.0f} ms ({separate / one_process:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# client.py
+# Thin client for the library service (service.py) with the same method names as LibraryManagementSystem
+
+import http.client
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from config import APP_CONFIG, SERVICE_CONFIG
+from app import CirculationError, LibraryError, LibraryManagementSystem
+
+
+# Methods safe to send again when the connection drops before the response arrives
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+
+class ServiceError(Exception):
+    """Raised when the service cannot be reached or cannot complete a request (busy, timeout, 5xx)."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class _RemoteAnalytics:
+    """The ``analytics`` reports of a LibraryManagementSystem, answered by the service."""
+
+    def __init__(self, client: "LibraryClient"):
+        self._client = client
+
+    def _report(self, name: str, limit: int) -> List[List[Any]]:
+        return self._client.request("GET", f"/reports/{name}", {"limit": limit})["rows"]
+
+    def top_books(self, limit: int = 5) -> List[List[Any]]:
+        return self._report("top_books", limit)
+
+    def top_borrowers(self, limit: int = 5) -> List[List[Any]]:
+        return self._report("top_borrowers", limit)
+
+    def top_genres(self, limit: int = 5) -> List[List[Any]]:
+        return self._report("top_genres", limit)
+
+    def busiest_days(self, limit: int = 5) -> List[List[Any]]:
+        return self._report("busiest_days", limit)
+
+    def rebuild(self) -> None:
+        self._client.request("POST", "/reports/rebuild")
+
+
+class _RemoteInventory:
+    """The ``inventory`` lookups of a LibraryManagementSystem, answered by the service."""
+
+    def __init__(self, client: "LibraryClient"):
+        self._client = client
+
+    def availability(self, book_id: int) -> Optional[Tuple[int, int]]:
+        """(available, total) copies of a title, or None if the book does not exist."""
+        try:
+            payload = self._client.request("GET", f"/books/{int(book_id)}/availability")
+        except LibraryError:
+            return None
+        return payload["available"], payload["total"]
+
+
+class _RemoteHolds:
+    """The ``holds`` operations of a LibraryManagementSystem, answered by the service."""
+
+    def __init__(self, client: "LibraryClient"):
+        self._client = client
+
+    def place(self, book_id: int, member_id: int) -> Dict[str, Any]:
+        return self._client.request("POST", "/holds", body={"book_id": book_id, "member_id": member_id})
+
+    def cancel(self, hold_id: int) -> Optional[Tuple[int, int]]:
+        """Cancel a hold; returns (hold ID, member ID) of the hold that received its copy, if any."""
+        passed_to = self._client.request("POST", f"/holds/{int(hold_id)}/cancel")["passed_to"]
+        return (passed_to[0], passed_to[1]) if passed_to else None
+
+
+class LibraryClient:
+    """Calls a running library service over HTTP/JSON.
+
+    Methods mirror the core LibraryManagementSystem operations, so the CLI can
+    use either one. Rule violations come back as CirculationError/LibraryError;
+    transport problems, 503 (busy) and 504 (timeout) raise ServiceError. Rows
+    are JSON lists, with dates as ISO strings and prices as floats. Each thread
+    keeps its own keep-alive connection.
+
+    Only GET requests are retried after a dropped connection. A POST such as
+    an issue or a return may already have committed on the server, so it is
+    never sent twice; instead it goes out on a fresh connection whenever the
+    kept-alive one has been idle long enough that the service may have closed it.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0,
+                 max_idle: float = SERVICE_CONFIG["idle_timeout"] / 2):
+        url = urlsplit(base_url if "://" in base_url else f"http://{base_url}")
+        if url.scheme != "http" or not url.hostname:
+            raise ValueError(f"Unsupported service URL '{base_url}' (expected http://host:port)")
+        self.base_url = f"http://{url.netloc}"
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.analytics = _RemoteAnalytics(self)
+        self.inventory = _RemoteInventory(self)
+        self.holds = _RemoteHolds(self)
+        self._local = threading.local()
+
+    def _connection(self, fresh: bool = False) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        idle = time.monotonic() - getattr(self._local, "last_used", 0.0)
+        if connection is not None and fresh and idle > self.max_idle:
+            self.close()
+            connection = None
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                body: Optional[Dict[str, Any]] = None) -> Any:
+        """Send one request and return the decoded JSON payload."""
+        if params:
+            path = f"{path}?{urlencode({k: v for k, v in params.items() if v is not None})}"
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data else {}
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(2):
+            connection = self._connection(fresh=not idempotent)
+            try:
+                connection.request(method, path, body=data, headers=headers)
+                response = connection.getresponse()
+                raw = response.read()
+                self._local.last_used = time.monotonic()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self.close()
+                if not idempotent:
+                    # The server may have committed before the connection dropped; sending it again could
+                    # issue a second loan or charge a fine twice
+                    raise ServiceError(f"Library service at {self.base_url} closed the connection during "
+                                       f"{method} {path}; it may or may not have completed: {e}") from e
+                # The server closed an idle keep-alive connection; reconnect once
+                if attempt:
+                    raise ServiceError(f"Library service at {self.base_url} closed the connection: {e}") from e
+            except OSError as e:
+                self.close()
+                raise ServiceError(f"Cannot reach library service at {self.base_url}: {e}") from e
+        if response.getheader("Connection", "").lower() == "close":
+            self.close()
+        try:
+            payload = json.loads(raw) if raw else {}
+        except ValueError:
+            raise ServiceError(f"Invalid response from library service (HTTP {response.status})",
+                               response.status) from None
+        if response.status < 400:
+            return payload
+        message = payload.get("error", f"HTTP {response.status}")
+        if response.status == 409:
+            raise CirculationError(message)
+        if response.status < 500:
+            raise LibraryError(message)
+        raise ServiceError(message, response.status)
+
+    def ping(self) -> bool:
+        """True if the service answers its health check."""
+        try:
+            return self.health().get("status") == "ok"
+        except (ServiceError, LibraryError):
+            return False
+
+    def health(self) -> Dict[str, Any]:
+        return self.request("GET", "/health")
+
+    def create_book(self, title: str, author: str, genre: Optional[str], year: int, price: float,
+                    copies: int = 1) -> int:
+        return self.request("POST", "/books", body={"title": title, "author": author, "genre": genre,
+                                                    "year": year, "price": price, "copies": copies})["book_id"]
+
+    def create_member(self, first_name: str, last_name: str, email: str, phone: str) -> int:
+        return self.request("POST", "/members", body={"first_name": first_name, "last_name": last_name,
+                                                      "email": email, "phone": phone})["member_id"]
+
+    def issue(self, book_id: int, member_id: int) -> Dict[str, Any]:
+        return self.request("POST", "/loans", body={"book_id": book_id, "member_id": member_id})
+
+    def return_transaction(self, transaction_id: int) -> Dict[str, Any]:
+        return self.request("POST", f"/loans/{int(transaction_id)}/return")
+
+    def pay_fine(self, transaction_id: int) -> Dict[str, Any]:
+        return self.request("POST", f"/loans/{int(transaction_id)}/pay")
+
+    def search(self, keyword: str, limit: Optional[int] = None, offset: int = 0) -> Tuple[int, List[List[Any]]]:
+        payload = self.request("GET", "/search", {"q": keyword, "limit": limit, "offset": offset})
+        return payload["total"], payload["rows"]
+
+    def fetch_page(self, listing: str, after: Optional[List[Any]] = None,
+                   page_size: Optional[int] = None) -> List[List[Any]]:
+        params = {"page_size": page_size, "after": json.dumps(after) if after else None}
+        return self.request("GET", f"/listings/{listing}", params)["rows"]
+
+    def iter_pages(self, listing: str, page_size: Optional[int] = None) -> Iterator[List[List[Any]]]:
+        """Yield listing pages from the service, seeking after the last row of each page."""
+        key_positions = LibraryManagementSystem.LISTINGS[listing][2]
+        page_size = page_size or APP_CONFIG["list_page_size"]
+        after: Optional[List[Any]] = None
+        while True:
+            page = self.fetch_page(listing, after, page_size)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after = [page[-1][position] for position in key_positions]
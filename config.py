@@ -4,6 +4,9 @@
 import os
 from typing import Dict, Any
 
+# Storage backend: "mysql" (DB_CONFIG) or "sqlite" (SQLITE_CONFIG, embedded, no server needed)
+DB_BACKEND: str = os.getenv("DB_BACKEND", "mysql")
+
 # Database configuration
 DB_CONFIG: Dict[str, Any] = {
     "host": os.getenv("DB_HOST", "localhost"),
@@ -11,7 +14,24 @@ DB_CONFIG: Dict[str, Any] = {
     "password": os.getenv("DB_PASSWORD", "admin123"),
     "database": os.getenv("DB_NAME", "library_management_system"),
     "autocommit": True,
-    "charset": "utf8mb4"
+    "charset": "utf8mb4",
+    "connection_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "10")),  # Seconds to wait for a new connection
+    # Connection pool settings (consumed by db_pool, not passed to the driver)
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),          # Maximum open connections
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")), # Seconds to wait for a free connection
+    "pool_recycle": 3600,                                     # Reopen connections older than this (seconds)
+    "pool_ping_interval": 30                                  # Health-check idle connections after this (seconds)
+}
+
+# Embedded SQLite configuration (used when DB_BACKEND is "sqlite")
+SQLITE_CONFIG: Dict[str, Any] = {
+    "path": os.getenv("SQLITE_PATH", "library_management_system.db"),  # ":memory:" for a throwaway DB
+    "timeout": 30,            # Seconds to wait on a locked database
+    "journal_mode": "WAL",    # Readers never block the writer
+    "synchronous": "NORMAL",  # Safe with WAL, avoids an fsync per commit
+    "auto_migrate": True,     # Apply pending migrations.py versions on first connect
+    "pool_size": 5,
+    "pool_timeout": 10.0
 }
 
 # Application settings
@@ -19,12 +39,51 @@ APP_CONFIG: Dict[str, Any] = {
     "fine_rate_per_day": 5.0,  # Fine amount per day in currency
     "grace_period_days": 14,   # Days before fine starts
     "max_books_per_member": 5, # Maximum books a member can borrow
-    "default_return_period": 30 # Default return period in days
+    "max_unpaid_fines": 0.0,   # Members owing more than this in unpaid fines cannot borrow
+    "default_return_period": 30, # Default return period in days
+    "import_batch_size": 1000,  # Rows per executemany batch in bulk_import
+    "search_page_size": 20,     # Search results shown per page
+    "search_max_results": 500,  # Upper bound on results returned for one search
+    "list_page_size": 25,       # Rows per page in show_books / show_members / show_transactions
+    "fine_batch_size": 50000,   # Loans per batch in the nightly fine job (fines.py)
+    "max_holds_per_member": 5,  # Active holds (waiting or ready) a member can have
+    "hold_pickup_days": 3,      # Days a copy set aside for a hold waits before the hold expires
+    "hold_expiry_batch_size": 500,  # Holds expired per transaction (holds.py expire)
+    "archive_after_days": 365,  # Returned, settled loans older than this move out of transactions (archive.py)
+    "archive_batch_size": 1000  # Loans moved per transaction when archiving
+}
+
+# Entity cache for book/member lookups by ID
+CACHE_CONFIG: Dict[str, Any] = {
+    "enabled": os.getenv("LMS_CACHE", "on").lower() not in ("0", "off", "false"),  # LMS_CACHE=off to debug
+    "max_entries": 10000,   # Upper bound on cached entities (LRU eviction beyond this)
+    "ttl_seconds": 300      # Entries older than this are reloaded
+}
+
+# HTTP/JSON service (service.py) shared by many terminals
+SERVICE_CONFIG: Dict[str, Any] = {
+    "host": os.getenv("LMS_SERVICE_HOST", "127.0.0.1"),  # Local only by default; there is no authentication
+    "port": int(os.getenv("LMS_SERVICE_PORT", "8080")),
+    "workers": 5,             # Threads running database operations (keep <= the connection pool_size)
+    "max_pending": 50,        # Operations running or queued before new requests get 503
+    "request_timeout": 10.0,  # Seconds before a request is answered with 504
+    "idle_timeout": 60.0,     # Seconds a keep-alive connection may sit idle
+    "max_body_bytes": 65536   # Larger request bodies are rejected with 413
 }
 
 # Logging configuration
 LOG_CONFIG: Dict[str, Any] = {
     "level": "INFO",
     "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    "file": "library_system.log"
+    "file": "library_system.log",
+    "json": True,             # File records as JSON lines (the console keeps the text format)
+    "rotation": "size",       # "size", "time" or None (grow forever)
+    "max_bytes": 10 * 1024 * 1024,  # Rotate after this many bytes (rotation "size")
+    "rotate_when": "midnight",      # Rotation interval for rotation "time" (TimedRotatingFileHandler "when")
+    "backup_count": 7,        # Rotated files kept
+    "console": True,          # Also log to stdout
+    "flush_interval": 0.2,    # Seconds between background writes of queued records
+    "slow_query_ms": float(os.getenv("LMS_SLOW_QUERY_MS", "500")),  # Log statements slower than this (0 disables)
+    "query_profiling": os.getenv("LMS_PROFILE", "off").lower() in ("1", "on", "true"),  # Aggregate query stats
+    "query_sample_rate": float(os.getenv("LMS_PROFILE_SAMPLE", "1.0"))  # Share of operations profiled (0-1)
 }
@@ -0,0 +1,213 @@
+# db_pool.py
+# Connection pooling for the Library Management System
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Keys in DB_CONFIG that configure the pool rather than the driver
+POOL_OPTIONS: Tuple[str, ...] = ("pool_size", "pool_timeout", "pool_recycle", "pool_ping_interval")
+
+
+def split_pool_config(config: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split a DB config into driver connect arguments and pool options."""
+    connect_kwargs = {k: v for k, v in config.items() if k not in POOL_OPTIONS}
+    pool_kwargs = {k[len("pool_"):]: v for k, v in config.items() if k in POOL_OPTIONS}
+    return connect_kwargs, pool_kwargs
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class _PooledEntry:
+    """Bookkeeping for one physical connection held by the pool."""
+
+    __slots__ = ("connection", "created_at", "last_used")
+
+    def __init__(self, connection: Any):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable database connections.
+
+    ``connect`` is any zero-argument callable returning a DB-API style
+    connection, so the pool works with ``mysql.connector`` as well as a fake
+    driver in tests. Idle connections are health-checked before reuse when
+    they have been idle longer than ``ping_interval`` seconds, and recycled
+    once they are older than ``recycle`` seconds. Pings, connects and closes
+    happen outside the pool lock, so one slow or dead connection never holds
+    up other checkouts and releases. ``on_acquire``, if given, receives the
+    seconds each checkout took (waiting plus any connect).
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int = 5, timeout: float = 10.0,
+                 recycle: float = 3600.0, ping_interval: float = 30.0,
+                 on_acquire: Optional[Callable[[float], None]] = None):
+        if size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.logger = logging.getLogger(__name__)
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self.on_acquire = on_acquire
+        self._idle: Deque[_PooledEntry] = deque()
+        self._in_use: Dict[int, _PooledEntry] = {}
+        self._pending = 0  # slots reserved for connections being opened
+        self._cond = threading.Condition()
+        self._stats = {"hits": 0, "misses": 0, "created": 0, "discarded": 0,
+                       "health_check_failures": 0, "timeouts": 0}
+
+    def acquire(self) -> Any:
+        """Check out a connection, reusing an idle one when possible."""
+        if self.on_acquire is None:
+            return self._checkout()
+        started = time.perf_counter()
+        connection = self._checkout()
+        self.on_acquire(time.perf_counter() - started)
+        return connection
+
+    def _checkout(self) -> Any:
+        deadline = time.monotonic() + self.timeout
+        stale: List[_PooledEntry] = []
+        entry: Optional[_PooledEntry] = None
+        try:
+            with self._cond:
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()
+                        if self._expired(entry):
+                            stale.append(entry)
+                            self._stats["discarded"] += 1
+                            entry = None
+                            continue
+                        # Counted as in use while it is checked, so no other thread can take it
+                        self._in_use[id(entry.connection)] = entry
+                        break
+                    if len(self._in_use) + self._pending < self.size:
+                        self._pending += 1
+                        self._stats["misses"] += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available within {self.timeout}s "
+                            f"(pool_size={self.size})"
+                        )
+                    self._cond.wait(remaining)
+        finally:
+            for old in stale:
+                self._close(old)
+
+        if entry is None:
+            return self._open()
+        if time.monotonic() - entry.last_used < self.ping_interval or self._alive(entry.connection):
+            with self._cond:
+                entry.last_used = time.monotonic()
+                self._stats["hits"] += 1
+            return entry.connection
+        # Failed its health check: close it and open a replacement in the same slot
+        with self._cond:
+            del self._in_use[id(entry.connection)]
+            self._pending += 1
+            self._stats["health_check_failures"] += 1
+            self._stats["discarded"] += 1
+            self._stats["misses"] += 1
+        self._close(entry)
+        return self._open()
+
+    def _open(self) -> Any:
+        """Open a connection for a slot already reserved in ``_pending``."""
+        # Open the new connection outside the lock so other threads are not blocked
+        try:
+            connection = self._connect()
+        except BaseException:
+            with self._cond:
+                self._pending -= 1
+                self._cond.notify()
+            raise
+        entry = _PooledEntry(connection)
+        with self._cond:
+            self._pending -= 1
+            self._in_use[id(connection)] = entry
+            self._stats["created"] += 1
+        return connection
+
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it when ``discard`` is set."""
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                return
+            closing = discard or self._expired(entry)
+            if closing:
+                self._stats["discarded"] += 1
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            self._cond.notify()
+        if closing:
+            self._close(entry)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Context manager that checks a connection out and back in."""
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        except BaseException:
+            discard = not self._alive(connection)
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool counters (hits, misses, created, discarded, ...)."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["in_use"] = len(self._in_use)
+            stats["idle"] = len(self._idle)
+            return stats
+
+    def close_all(self) -> None:
+        """Close every idle connection; in-use connections close on release."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._stats["discarded"] += len(idle)
+            self.recycle = 0  # anything still checked out is closed when returned
+        for entry in idle:
+            self._close(entry)
+
+    def _expired(self, entry: _PooledEntry) -> bool:
+        return time.monotonic() - entry.created_at >= self.recycle
+
+    def _alive(self, connection: Any) -> bool:
+        """Health check: ping the server if the driver supports it."""
+        try:
+            if hasattr(connection, "ping"):
+                connection.ping(reconnect=False)
+                return True
+            if hasattr(connection, "is_connected"):
+                return bool(connection.is_connected())
+            return True
+        except Exception:
+            return False
+
+    def _close(self, entry: _PooledEntry) -> None:
+        # Called without the lock held; callers count the discard
+        try:
+            entry.connection.close()
+        except Exception as e:
+            self.logger.debug("Ignoring error while closing pooled connection: %s", e)
@@ -0,0 +1,10 @@
+# errors.py
+# Exceptions shared by the library modules (re-exported by app)
+
+
+class LibraryError(Exception):
+    """Raised when a request refers to a missing record or breaks a library rule."""
+
+
+class CirculationError(LibraryError):
+    """Raised when a circulation rule (availability, borrow limit, ...) rejects a request."""
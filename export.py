@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Report Export
+Streams the transaction history, the book catalog and the most-issued
+ranking into CSV, JSONL or Parquet files for reporting tools. Rows are read
+in batches from a streaming cursor and written as they arrive, so memory
+stays flat however many rows are exported.
+
+Usage:
+    python export.py transactions loans-2024.csv.gz --since 2024-01-01 --until 2024-12-31
+    python export.py transactions - --member 42 --format jsonl     # "-" writes to stdout
+    python export.py most_issued top.parquet --since 2025-01-01     # Parquet needs pyarrow
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from archive import HISTORY_VIEW, load_pyarrow
+from profiling import profiled
+
+FORMATS = ("csv", "jsonl", "parquet")
+DEFAULT_BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """One exportable result set.
+
+    ``columns`` are (name, kind) pairs with kind "int", "str", "date" or
+    "amount"; ``filters`` maps a filter name to the SQL condition it adds.
+    """
+    query: str
+    columns: Tuple[Tuple[str, str], ...]
+    filters: Dict[str, str]
+    suffix: str = ""  # Appended after the WHERE clause (GROUP BY / ORDER BY)
+
+
+_HISTORY_FILTERS = {
+    "since": "t.IssueDate >= %s",
+    "until": "t.IssueDate <= %s",
+    "member_id": "t.MemberID = %s",
+    "book_id": "t.BookID = %s",
+}
+
+EXPORTS: Dict[str, ExportSpec] = {
+    # Live and archived loans; rows come in storage order, not sorted, so the database never sorts the history
+    "transactions": ExportSpec(
+        f"""
+        SELECT t.ID, t.BookID, b.title, t.MemberID, CONCAT(m.FirstName, ' ', m.LastName),
+               t.IssueDate, t.ReturnDate, t.FineAmount, t.FinePaid
+        FROM {HISTORY_VIEW} t
+        JOIN books b ON t.BookID = b.ID
+        JOIN members m ON t.MemberID = m.ID
+        """,
+        (("TransactionID", "int"), ("BookID", "int"), ("BookTitle", "str"), ("MemberID", "int"),
+         ("MemberName", "str"), ("IssueDate", "date"), ("ReturnDate", "date"), ("FineAmount", "amount"),
+         ("FinePaid", "int")),
+        _HISTORY_FILTERS,
+    ),
+    "books": ExportSpec(
+        """
+        SELECT b.ID, b.title, b.Author, b.Genre, b.PublishedYear, b.Price,
+               i.available_copies, i.total_copies
+        FROM books b LEFT JOIN book_inventory i ON i.BookID = b.ID
+        """,
+        (("BookID", "int"), ("Title", "str"), ("Author", "str"), ("Genre", "str"), ("PublishedYear", "int"),
+         ("Price", "amount"), ("AvailableCopies", "int"), ("TotalCopies", "int")),
+        {"book_id": "b.ID = %s"},
+        "ORDER BY b.ID",
+    ),
+    # Every title with loans in the filtered range, most issued first
+    "most_issued": ExportSpec(
+        f"""
+        SELECT t.BookID, b.title, b.Author, COUNT(*) AS times_issued, MAX(t.IssueDate)
+        FROM {HISTORY_VIEW} t
+        JOIN books b ON t.BookID = b.ID
+        """,
+        (("BookID", "int"), ("Title", "str"), ("Author", "str"), ("TimesIssued", "int"),
+         ("LastIssued", "date")),
+        _HISTORY_FILTERS,
+        "GROUP BY t.BookID, b.title, b.Author ORDER BY times_issued DESC, t.BookID",
+    ),
+}
+
+
+def build_query(spec: ExportSpec, filters: Dict[str, Any]) -> Tuple[str, Tuple]:
+    """SQL and parameters for ``spec`` with the given (non-None) filters applied."""
+    active = {name: value for name, value in filters.items() if value is not None}
+    unknown = sorted(set(active) - set(spec.filters))
+    if unknown:
+        raise ValueError(f"Filter(s) not available for this export: {', '.join(unknown)}")
+    conditions = [spec.filters[name] for name in spec.filters if name in active]
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"{spec.query.rstrip()}{where} {spec.suffix}".rstrip()
+    return query, tuple(active[name] for name in spec.filters if name in active)
+
+
+def _as_date(value: Any) -> Optional[date]:
+    # SQLite returns aggregates and view columns as ISO strings, declared DATE columns as dates
+    if value is None or isinstance(value, date):
+        return value.date() if isinstance(value, datetime) else value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class _CsvWriter:
+    def __init__(self, handle: IO[str], columns: Tuple[Tuple[str, str], ...]):
+        self._writer = csv.writer(handle)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write(self, rows: List[Tuple]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        pass
+
+
+class _JsonlWriter:
+    def __init__(self, handle: IO[str], columns: Tuple[Tuple[str, str], ...]):
+        self._handle = handle
+        self._names = [name for name, _ in columns]
+
+    def write(self, rows: List[Tuple]) -> None:
+        self._handle.writelines(
+            json.dumps(dict(zip(self._names, map(_json_value, row))), ensure_ascii=False) + "\n" for row in rows)
+
+    def close(self) -> None:
+        pass
+
+
+class _ParquetWriter:
+    """Writes each batch as one row group, so only a batch is ever held in memory."""
+
+    def __init__(self, path: str, columns: Tuple[Tuple[str, str], ...], compression: str):
+        pa, pq = load_pyarrow()
+        self._pa = pa
+        types = {"int": pa.int64(), "str": pa.string(), "date": pa.date32(), "amount": pa.float64()}
+        self._columns = columns
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._writer = pq.ParquetWriter(path, self._schema, compression=compression)
+
+    def write(self, rows: List[Tuple]) -> None:
+        arrays = []
+        for index, (_, kind) in enumerate(self._columns):
+            values = [row[index] for row in rows]
+            if kind == "date":
+                values = [_as_date(value) for value in values]
+            elif kind == "amount":
+                values = [None if value is None else float(value) for value in values]
+            arrays.append(values)
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+@dataclass
+class ExportReport:
+    """Outcome of one export run."""
+    dataset: str
+    path: str
+    fmt: str
+    rows: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        rate = self.rows / self.elapsed if self.elapsed else 0.0
+        return (f"{self.dataset}: {self.rows} rows to {self.path} ({self.fmt}) in {self.elapsed:.2f}s "
+                f"({rate:,.0f} rows/sec)")
+
+
+def detect_format(path: str) -> str:
+    """Format implied by a file name such as "loans.jsonl.gz" (CSV if it says nothing)."""
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "parquet" if name.endswith(".parquet") else "csv"
+
+
+class ReportExporter:
+    """Streams an export query into a file, ``batch_size`` rows at a time."""
+
+    def __init__(self, lms: Any, batch_size: Optional[int] = None):
+        self.lms = lms
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def profiler(self) -> Any:
+        return self.lms.profiler
+
+    @profiled("export")
+    def export(self, dataset: str, path: str, fmt: Optional[str] = None, compress: Optional[bool] = None,
+               since: Optional[date] = None, until: Optional[date] = None,
+               member_id: Optional[int] = None, book_id: Optional[int] = None) -> ExportReport:
+        """Write ``dataset`` to ``path`` ("-" for stdout) as CSV, JSONL or Parquet.
+
+        The format and gzip compression default to what the file name says.
+        Parquet files are compressed internally (zstd with ``compress``,
+        snappy otherwise) and cannot go to stdout.
+        """
+        spec = EXPORTS[dataset]
+        fmt = fmt or detect_format(path)
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}' (use {', '.join(FORMATS)})")
+        if fmt == "parquet" and path == "-":
+            raise ValueError("Parquet exports need a file path, not stdout")
+        compress = path.endswith(".gz") if compress is None else compress
+        query, params = build_query(spec, {"since": since, "until": until,
+                                           "member_id": member_id, "book_id": book_id})
+        if fmt == "parquet":
+            load_pyarrow()  # fail before anything is opened or queried
+
+        report = ExportReport(dataset, path, fmt)
+        started = time.perf_counter()
+        handle = self._open(path, compress) if fmt != "parquet" else None
+        writer: Any = None
+        rows: Optional[Iterator[Tuple]] = None
+        try:
+            if fmt == "parquet":
+                writer = _ParquetWriter(path, spec.columns, "zstd" if compress else "snappy")
+            else:
+                writer = (_CsvWriter if fmt == "csv" else _JsonlWriter)(handle, spec.columns)
+            rows = self.lms.stream_query(query, params, batch_size=self.batch_size)
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                writer.write(batch)
+                report.rows += len(batch)
+        finally:
+            if rows is not None:
+                rows.close()  # returns the connection even if writing failed part way
+            if writer is not None:
+                writer.close()
+            if handle is sys.stdout:
+                handle.flush()
+            elif handle is not None:
+                handle.close()
+        report.elapsed = time.perf_counter() - started
+        self.logger.info("Export finished - %s", report.summary())
+        return report
+
+    @staticmethod
+    def _open(path: str, compress: bool) -> IO[str]:
+        if path == "-":
+            if compress:
+                return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb"),
+                                        encoding="utf-8", newline="")
+            return sys.stdout
+        if compress:
+            return io.TextIOWrapper(gzip.open(path, "wb"), encoding="utf-8", newline="")
+        return open(path, "w", encoding="utf-8", newline="")
+
+
+def main() -> None:
+    """Command-line entry point for report exports."""
+    from app import LibraryManagementSystem
+    from config import LOG_CONFIG
+    from logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Export library reports to CSV, JSONL or Parquet.")
+    parser.add_argument("dataset", choices=sorted(EXPORTS), help="what to export")
+    parser.add_argument("path", help='output file (".gz" compresses CSV/JSONL), or "-" for stdout')
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file name, else csv")
+    parser.add_argument("--gzip", action="store_true", default=None, help="compress even without a .gz name")
+    parser.add_argument("--since", type=date.fromisoformat, help="loans issued on or after (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="loans issued on or before (YYYY-MM-DD)")
+    parser.add_argument("--member", type=int, help="only this member's loans")
+    parser.add_argument("--book", type=int, help="only this book")
+    parser.add_argument("--batch-size", type=int, help=f"rows per fetch and write (default {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    if args.path == "-":
+        # The export owns stdout; log records still go to the log file
+        configure_logging(dict(LOG_CONFIG, console=False))
+    exporter = ReportExporter(LibraryManagementSystem(), batch_size=args.batch_size)
+    try:
+        report = exporter.export(args.dataset, args.path, args.format, args.gzip, since=args.since,
+                                 until=args.until, member_id=args.member, book_id=args.book)
+    except (ValueError, RuntimeError) as e:  # RuntimeError: Parquet without pyarrow
+        parser.error(str(e))
+    # Keep stdout clean when the export itself went there
+    print(f"📤 {report.summary()}", file=sys.stderr if args.path == "-" else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
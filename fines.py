@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Batch Fine Engine
+Recomputes the fines accruing on open loans in one pass, charging each up
+to today with the same formula as return_book:
+
+    fine = (days on loan - grace_period_days) * fine_rate_per_day, if positive
+
+Returned loans are never touched: their fine was fixed by the return, and
+once paid (or counted in a member's unpaid total) it must not change when the
+rate or grace period does. Accrued fines on open loans are not part of
+``member_status``; return_book charges the final amount.
+
+Meant to run as a nightly job, e.g. from cron:
+    15 2 * * *  cd /opt/library && python fines.py --method sql
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterator, List, Optional, Tuple
+
+from config import APP_CONFIG
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the set-based SQL method needs nothing extra
+    np = None
+
+# Days an open loan has been out as of the run date
+_DAYS = "DATEDIFF(%s, IssueDate)"
+_FINE = f"CASE WHEN {_DAYS} > %s THEN ({_DAYS} - %s) * %s ELSE 0 END"
+
+FINE_UPDATE_QUERY = f"""
+    UPDATE transactions
+    SET FineAmount = {_FINE}
+    WHERE ID BETWEEN %s AND %s
+      AND ReturnDate IS NULL
+      AND IssueDate IS NOT NULL
+      AND COALESCE(FineAmount, -1) <> {_FINE}
+"""
+FINE_SCAN_QUERY = """
+    SELECT ID, IssueDate, FineAmount
+    FROM transactions
+    WHERE ReturnDate IS NULL AND IssueDate IS NOT NULL
+"""
+# ReturnDate IS NULL again: a loan returned since the scan keeps the fine its return charged
+FINE_WRITE_QUERY = "UPDATE transactions SET FineAmount = %s WHERE ID = %s AND ReturnDate IS NULL"
+
+
+@dataclass
+class FineRunReport:
+    """Outcome of one batch fine run."""
+    method: str
+    as_of: date
+    rows_scanned: int = 0
+    rows_updated: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        scanned = f"{self.rows_scanned} scanned, " if self.rows_scanned else ""
+        return (f"Fines as of {self.as_of} ({self.method}): {scanned}{self.rows_updated} updated "
+                f"in {self.elapsed:.2f}s")
+
+
+class FineEngine:
+    """Computes and writes back the accrued fines of all open loans in bulk."""
+
+    def __init__(self, lms: Any, batch_size: Optional[int] = None):
+        self.lms = lms
+        self.batch_size = batch_size or APP_CONFIG["fine_batch_size"]
+        self.grace = APP_CONFIG["grace_period_days"]
+        self.rate = APP_CONFIG["fine_rate_per_day"]
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, method: str = "sql", as_of: Optional[date] = None) -> FineRunReport:
+        """Recompute open-loan fines with ``method`` ("sql" or "numpy") as of ``as_of`` (default today)."""
+        as_of = as_of or date.today()
+        report = FineRunReport(method, as_of)
+        started = time.perf_counter()
+        if method == "sql":
+            self._run_sql(report)
+        elif method == "numpy":
+            self._run_numpy(report)
+        else:
+            raise ValueError(f"Unknown fine method '{method}' (use 'sql' or 'numpy')")
+        report.elapsed = time.perf_counter() - started
+        self.logger.info("%s", report.summary())
+        return report
+
+    def _run_sql(self, report: FineRunReport) -> None:
+        """One set-based UPDATE per ID range; only rows whose fine changes are written."""
+        fine_params = (report.as_of, self.grace, report.as_of, self.grace, self.rate)
+        bounds = self.lms.execute_query("SELECT MIN(ID), MAX(ID) FROM transactions", fetch=True)
+        low, high = bounds[0] if bounds else (None, None)
+        if low is None:
+            return
+        for start in range(low, high + 1, self.batch_size):
+            with self.lms.transaction() as cursor:
+                cursor.execute(FINE_UPDATE_QUERY, (*fine_params, start, start + self.batch_size - 1, *fine_params))
+                report.rows_updated += max(cursor.rowcount, 0)
+
+    def _run_numpy(self, report: FineRunReport) -> None:
+        """Stream open loans in chunks, compute fines with vectorized date arithmetic, write changes back."""
+        if np is None:
+            raise RuntimeError("The numpy fine method requires NumPy (pip install numpy)")
+        as_of = np.datetime64(report.as_of, "D")
+        for chunk in self._chunks(self.lms.stream_query(FINE_SCAN_QUERY, batch_size=self.batch_size)):
+            ids = np.fromiter((row[0] for row in chunk), dtype=np.int64, count=len(chunk))
+            issued = np.array([row[1] for row in chunk], dtype="datetime64[D]")
+            current = np.array([float(row[2]) if row[2] is not None else -1.0 for row in chunk])
+
+            days = (as_of - issued).astype(np.int64)
+            fines = np.where(days > self.grace, (days - self.grace) * self.rate, 0.0)
+            changed = np.abs(fines - current) > 0.005
+            report.rows_scanned += len(chunk)
+            if changed.any():
+                updates = list(zip(np.round(fines[changed], 2).tolist(), ids[changed].tolist()))
+                with self.lms.transaction() as cursor:
+                    cursor.executemany(FINE_WRITE_QUERY, updates)
+                    report.rows_updated += max(cursor.rowcount, 0)
+
+    def _chunks(self, rows: Iterator[Tuple]) -> Iterator[List[Tuple]]:
+        chunk: List[Tuple] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.batch_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def outstanding_total(self) -> float:
+        """Total fines accrued on loans that are still open."""
+        rows = self.lms.execute_query(
+            "SELECT COALESCE(SUM(FineAmount), 0) FROM transactions WHERE ReturnDate IS NULL", fetch=True)
+        return float(rows[0][0]) if rows else 0.0
+
+
+def main() -> None:
+    """Command-line entry point for the nightly fine job."""
+    from app import LibraryManagementSystem
+
+    parser = argparse.ArgumentParser(description="Recompute accrued fines for all open loans.")
+    parser.add_argument("--method", choices=["sql", "numpy"], default="sql",
+                        help="set-based UPDATE in the database, or vectorized NumPy in Python")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="accrue open loans up to this date (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, help="rows per batch")
+    args = parser.parse_args()
+
+    engine = FineEngine(LibraryManagementSystem(), batch_size=args.batch_size)
+    report = engine.run(args.method, as_of=args.as_of)
+    print(f"💰 {report.summary()}")
+    print(f"💰 Outstanding fines on open loans: ${engine.outstanding_total():.2f}")
+
+
+if __name__ == "__main__":
+    main()
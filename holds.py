@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Hold Queue
+First-come, first-served holds on titles with no copy on the shelf. When a
+copy comes back, the return sets it aside for the oldest waiting hold in the
+same transaction; the member then has ``hold_pickup_days`` to collect it.
+Holds that are not collected expire in batches, each passing its copy on to
+the next member in the queue (or back to the shelf).
+
+Expire uncollected holds nightly, e.g. from cron:
+    30 2 * * *  cd /opt/library && python holds.py expire
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import APP_CONFIG
+from errors import CirculationError, LibraryError
+from inventory import ON_HOLD, ON_LOAN, SET_COPY_STATUS_QUERY
+from profiling import profiled
+
+WAITING, READY, FULFILLED, CANCELLED, EXPIRED = "waiting", "ready", "fulfilled", "cancelled", "expired"
+
+HOLDS_DDL: Dict[str, Tuple[str, ...]] = {
+    "mysql": (
+        """
+        CREATE TABLE holds (
+            ID INT PRIMARY KEY AUTO_INCREMENT,
+            BookID INT NOT NULL,
+            MemberID INT NOT NULL,
+            Status VARCHAR(16) NOT NULL DEFAULT 'waiting',
+            PlacedOn DATE NOT NULL,
+            CopyID INT NULL,
+            ReadyOn DATE NULL,
+            FOREIGN KEY (BookID) REFERENCES books(ID),
+            FOREIGN KEY (MemberID) REFERENCES members(ID),
+            FOREIGN KEY (CopyID) REFERENCES copies(ID)
+        )
+        """,
+    ),
+    "sqlite": (
+        """
+        CREATE TABLE holds (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            BookID INTEGER NOT NULL,
+            MemberID INTEGER NOT NULL,
+            Status VARCHAR(16) NOT NULL DEFAULT 'waiting',
+            PlacedOn DATE NOT NULL,
+            CopyID INTEGER NULL,
+            ReadyOn DATE NULL,
+            FOREIGN KEY (BookID) REFERENCES books(ID),
+            FOREIGN KEY (MemberID) REFERENCES members(ID),
+            FOREIGN KEY (CopyID) REFERENCES copies(ID)
+        )
+        """,
+    ),
+}
+# The queue of a title is a range of (BookID, Status, ID), so the head of even a
+# very long queue is a single index seek and a position is an index-only count.
+HOLDS_INDEXES: Tuple[str, ...] = (
+    "CREATE INDEX idx_holds_queue ON holds (BookID, Status, ID)",
+    "CREATE INDEX idx_holds_member ON holds (MemberID, Status, BookID)",
+    "CREATE INDEX idx_holds_expiry ON holds (Status, ReadyOn, ID)",
+)
+
+# A member who already has the title on loan is passed over (their hold stays in the queue)
+NEXT_HOLD_QUERY = """
+    SELECT ID, MemberID FROM holds
+    WHERE BookID = %s AND Status = 'waiting'
+      AND NOT EXISTS (SELECT 1 FROM transactions t
+                      WHERE t.MemberID = holds.MemberID AND t.BookID = holds.BookID AND t.ReturnDate IS NULL)
+    ORDER BY ID
+    LIMIT 1
+    FOR UPDATE
+"""
+READY_HOLD_QUERY = """
+    SELECT ID, CopyID FROM holds
+    WHERE MemberID = %s AND Status = 'ready' AND BookID = %s
+    FOR UPDATE
+"""
+MEMBER_HOLDS_QUERY = """
+    SELECT COUNT(*), SUM(CASE WHEN BookID = %s THEN 1 ELSE 0 END)
+    FROM holds
+    WHERE MemberID = %s AND Status IN ('waiting', 'ready')
+"""
+QUEUE_POSITION_QUERY = "SELECT COUNT(*) FROM holds WHERE BookID = %s AND Status = 'waiting' AND ID <= %s"
+EXPIRED_HOLDS_QUERY = """
+    SELECT ID, BookID, CopyID FROM holds
+    WHERE Status = 'ready' AND ReadyOn < %s
+    ORDER BY ReadyOn, ID
+    LIMIT %s
+"""
+HOLD_INSERT_QUERY = "INSERT INTO holds (BookID, MemberID, Status, PlacedOn) VALUES (%s, %s, 'waiting', CURDATE())"
+HOLD_READY_QUERY = "UPDATE holds SET Status = 'ready', CopyID = %s, ReadyOn = CURDATE() WHERE ID = %s"
+HOLD_STATUS_QUERY = "UPDATE holds SET Status = %s WHERE ID = %s AND Status = %s"
+FULFIL_WAITING_QUERY = """
+    UPDATE holds SET Status = 'fulfilled' WHERE MemberID = %s AND BookID = %s AND Status = 'waiting'
+"""
+
+
+@dataclass
+class ExpiryReport:
+    """Outcome of one hold expiry run."""
+    as_of: date
+    expired: int = 0
+    passed_on: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        return (f"Holds uncollected before {self.as_of}: {self.expired} expired, {self.passed_on} copies passed "
+                f"to the next hold, {self.batches} batches in {self.elapsed:.2f}s")
+
+
+class HoldQueue:
+    """Places, fulfils, cancels and expires holds.
+
+    Every path that touches a title's holds (issue, return, place, cancel,
+    expiry) first locks the title's ``book_inventory`` row, so a copy can never
+    be shelved while a hold for the title is being placed. Paths that also
+    change a member (issue, return, place) lock the member's ``member_status``
+    row before the title's, so the locks are always taken in the same order.
+    """
+
+    def __init__(self, lms: Any):
+        self.lms = lms
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def profiler(self) -> Any:
+        return self.lms.profiler
+
+    @profiled("place_hold")
+    def place(self, book_id: int, member_id: int) -> Dict[str, Any]:
+        """Queue a member for a title that has no copy on the shelf; returns the hold and its position."""
+        limit = APP_CONFIG["max_holds_per_member"]
+        with self.lms.transaction() as cursor:
+            self.lms.member_status.lock(cursor, member_id)
+            counts = self.lms.inventory.counts(cursor, book_id, lock=True)
+            if counts is None:
+                raise CirculationError("Book ID not found.")
+            if counts[0] > 0:
+                raise CirculationError("A copy of this book is available; issue it instead.")
+            if counts[1] == 0:
+                raise CirculationError("This book has no copies in circulation.")
+            cursor.execute(MEMBER_HOLDS_QUERY, (book_id, member_id))
+            active, for_title = cursor.fetchone()
+            if for_title:
+                raise CirculationError("Member already has a hold on this book.")
+            if active >= limit:
+                raise CirculationError(f"Member has reached maximum limit of {limit} holds.")
+            cursor.execute(self.lms.OPEN_LOAN_QUERY, (member_id, book_id))
+            if cursor.fetchone():
+                raise CirculationError("Member already has this book on loan.")
+
+            cursor.execute(HOLD_INSERT_QUERY, (book_id, member_id))
+            hold_id = cursor.lastrowid
+            cursor.execute(QUEUE_POSITION_QUERY, (book_id, hold_id))
+            position = cursor.fetchone()[0]
+            book_title = self.lms.book_title(book_id, cursor)
+            member_name = self.lms.member_name(member_id, cursor)
+
+        self.logger.info("Hold placed: %s for %s (position %d)", book_title, member_name, position,
+                         extra={"hold_id": hold_id, "book_id": book_id, "member_id": member_id})
+        return {"hold_id": hold_id, "position": position, "book_title": book_title, "member_name": member_name}
+
+    def claim(self, cursor: Any, book_id: int, member_id: int) -> Optional[int]:
+        """Check out the copy set aside for this member, if any; returns its copy ID.
+
+        Call inside the issuing transaction, before taking a copy off the shelf.
+        """
+        cursor.execute(READY_HOLD_QUERY, (member_id, book_id))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        hold_id, copy_id = row
+        cursor.execute(HOLD_STATUS_QUERY, (FULFILLED, hold_id, READY))
+        cursor.execute(SET_COPY_STATUS_QUERY, (ON_LOAN, copy_id))
+        return copy_id
+
+    def fulfil_waiting(self, cursor: Any, book_id: int, member_id: int) -> None:
+        """Close the member's waiting hold on a title once they have taken a shelf copy of it.
+
+        Call inside the issuing transaction, so the hold does not later claim a second copy.
+        """
+        cursor.execute(FULFIL_WAITING_QUERY, (member_id, book_id))
+
+    def pass_on(self, cursor: Any, book_id: int, copy_id: Optional[int]) -> Optional[Tuple[int, int]]:
+        """Set a returned copy aside for the next waiting hold, or put it back on the shelf.
+
+        Call inside the returning transaction. Returns (hold ID, member ID) of
+        the hold that received the copy, or None if it went back on the shelf.
+        """
+        self.lms.inventory.counts(cursor, book_id, lock=True)
+        return self._hand_on(cursor, book_id, copy_id)
+
+    def _hand_on(self, cursor: Any, book_id: int, copy_id: Optional[int]) -> Optional[Tuple[int, int]]:
+        # Caller holds the title's inventory lock; a copy not set aside is counted back onto the shelf
+        if copy_id is not None:
+            cursor.execute(NEXT_HOLD_QUERY, (book_id,))
+            row = cursor.fetchone()
+            if row is not None:
+                hold_id, member_id = row
+                cursor.execute(HOLD_READY_QUERY, (copy_id, hold_id))
+                cursor.execute(SET_COPY_STATUS_QUERY, (ON_HOLD, copy_id))
+                return hold_id, member_id
+        self.lms.inventory.give_back(cursor, book_id, copy_id)
+        return None
+
+    @profiled("cancel_hold")
+    def cancel(self, hold_id: int) -> Optional[Tuple[int, int]]:
+        """Cancel a waiting or ready hold; a ready hold's copy goes to the next hold in the queue.
+
+        Returns (hold ID, member ID) of the hold that received the copy, if any.
+        """
+        rows = self.lms.execute_query("SELECT BookID FROM holds WHERE ID = %s", (hold_id,), fetch=True)
+        if not rows:
+            raise LibraryError("Hold ID not found.")
+        book_id = rows[0][0]
+        passed_to = None
+        with self.lms.transaction() as cursor:
+            self.lms.inventory.counts(cursor, book_id, lock=True)
+            cursor.execute("SELECT Status, CopyID FROM holds WHERE ID = %s FOR UPDATE", (hold_id,))
+            status, copy_id = cursor.fetchone()
+            if status not in (WAITING, READY):
+                raise LibraryError(f"Hold is already {status}.")
+            cursor.execute(HOLD_STATUS_QUERY, (CANCELLED, hold_id, status))
+            if status == READY:
+                passed_to = self._hand_on(cursor, book_id, copy_id)
+        self.logger.info("Hold cancelled: %s", hold_id, extra={"hold_id": hold_id, "book_id": book_id})
+        return passed_to
+
+    def queue_length(self, book_id: int) -> int:
+        """Number of members waiting for a title."""
+        rows = self.lms.execute_query("SELECT COUNT(*) FROM holds WHERE BookID = %s AND Status = 'waiting'",
+                                      (book_id,), fetch=True)
+        return rows[0][0] if rows else 0
+
+    def member_holds(self, member_id: int) -> List[Tuple]:
+        """(hold ID, title, status, placed on, ready on) of a member's active holds."""
+        rows = self.lms.execute_query("""
+            SELECT h.ID, b.title, h.Status, h.PlacedOn, h.ReadyOn
+            FROM holds h JOIN books b ON b.ID = h.BookID
+            WHERE h.MemberID = %s AND h.Status IN ('waiting', 'ready')
+            ORDER BY h.ID
+        """, (member_id,), fetch=True)
+        return rows if isinstance(rows, list) else []
+
+    @profiled("expire_holds")
+    def expire(self, as_of: Optional[date] = None, batch_size: Optional[int] = None) -> ExpiryReport:
+        """Expire ready holds not collected within ``hold_pickup_days``, one bounded batch per transaction."""
+        as_of = as_of or date.today()
+        if as_of > date.today():
+            # Copies passed on today would count as uncollected too and the whole queue would cascade
+            raise ValueError("Holds cannot be expired as of a future date.")
+        batch_size = batch_size or APP_CONFIG["hold_expiry_batch_size"]
+        cutoff = as_of - timedelta(days=APP_CONFIG["hold_pickup_days"])
+        report = ExpiryReport(as_of)
+        started = time.perf_counter()
+        while True:
+            with self.lms.transaction() as cursor:
+                cursor.execute(EXPIRED_HOLDS_QUERY, (cutoff, batch_size))
+                batch = cursor.fetchall()
+                # Lock titles in a fixed order so concurrent runs cannot deadlock each other
+                for hold_id, book_id, copy_id in sorted(batch, key=lambda row: (row[1], row[0])):
+                    self.lms.inventory.counts(cursor, book_id, lock=True)
+                    cursor.execute(HOLD_STATUS_QUERY, (EXPIRED, hold_id, READY))
+                    if cursor.rowcount == 0:  # collected or cancelled since the batch was read
+                        continue
+                    report.expired += 1
+                    report.passed_on += self._hand_on(cursor, book_id, copy_id) is not None
+            report.batches += 1
+            if len(batch) < batch_size:
+                break
+        report.elapsed = time.perf_counter() - started
+        self.logger.info("%s", report.summary())
+        return report
+
+
+def main() -> None:
+    """Command-line entry point for hold maintenance."""
+    from app import LibraryManagementSystem
+
+    parser = argparse.ArgumentParser(description="Maintain the hold queues.")
+    parser.add_argument("command", choices=["expire"])
+    parser.add_argument("--as-of", type=date.fromisoformat, help="expire as if today were this date (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, help="holds per transaction")
+    args = parser.parse_args()
+
+    report = LibraryManagementSystem().holds.expire(as_of=args.as_of, batch_size=args.batch_size)
+    print(f"📌 {report.summary()}")
+
+
+if __name__ == "__main__":
+    main()
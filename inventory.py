@@ -0,0 +1,241 @@
+# inventory.py
+# Physical copies of each title and the per-title counter that answers availability
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from errors import CirculationError, LibraryError
+from profiling import profiled
+
+AVAILABLE, ON_LOAN, ON_HOLD, WITHDRAWN = "available", "on_loan", "on_hold", "withdrawn"
+
+# One row per physical copy, and one counter row per title. The counter is what
+# circulation reads and updates; the copies say which item is on the shelf.
+INVENTORY_DDL: Dict[str, Tuple[str, ...]] = {
+    "mysql": (
+        """
+        CREATE TABLE copies (
+            ID INT PRIMARY KEY AUTO_INCREMENT,
+            BookID INT NOT NULL,
+            Barcode VARCHAR(32) UNIQUE,
+            Status VARCHAR(16) NOT NULL DEFAULT 'available',
+            FOREIGN KEY (BookID) REFERENCES books(ID)
+        )
+        """,
+        """
+        ALTER TABLE transactions
+            ADD COLUMN CopyID INT NULL,
+            ADD FOREIGN KEY (CopyID) REFERENCES copies(ID)
+        """,
+    ),
+    "sqlite": (
+        """
+        CREATE TABLE copies (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            BookID INTEGER NOT NULL,
+            Barcode VARCHAR(32) UNIQUE,
+            Status VARCHAR(16) NOT NULL DEFAULT 'available',
+            FOREIGN KEY (BookID) REFERENCES books(ID)
+        )
+        """,
+        "ALTER TABLE transactions ADD COLUMN CopyID INTEGER REFERENCES copies(ID)",
+    ),
+}
+INVENTORY_SHARED_DDL: Tuple[str, ...] = (
+    "CREATE INDEX idx_copies_book_status ON copies (BookID, Status, ID)",
+    """
+    CREATE TABLE book_inventory (
+        BookID INT PRIMARY KEY,
+        total_copies INT NOT NULL DEFAULT 0,
+        available_copies INT NOT NULL DEFAULT 0,
+        CHECK (available_copies >= 0 AND available_copies <= total_copies),
+        FOREIGN KEY (BookID) REFERENCES books(ID)
+    )
+    """,
+)
+
+# Every title gets at least one copy (the model before copies existed)
+CREATE_MISSING_COPIES = """
+    INSERT INTO copies (BookID, Status)
+    SELECT b.ID, 'available' FROM books b
+    WHERE NOT EXISTS (SELECT 1 FROM copies c WHERE c.BookID = b.ID)
+"""
+# Loans made before copies existed are tied to the title's first copy
+LINK_LEGACY_LOANS = """
+    UPDATE transactions
+    SET CopyID = (SELECT MIN(c.ID) FROM copies c WHERE c.BookID = transactions.BookID)
+    WHERE ReturnDate IS NULL AND CopyID IS NULL
+"""
+SYNC_STATEMENTS: Tuple[str, ...] = (
+    """
+    UPDATE copies SET Status = 'available'
+    WHERE Status = 'on_loan'
+      AND ID NOT IN (SELECT CopyID FROM transactions WHERE ReturnDate IS NULL AND CopyID IS NOT NULL)
+    """,
+    """
+    UPDATE copies SET Status = 'on_loan'
+    WHERE ID IN (SELECT CopyID FROM transactions WHERE ReturnDate IS NULL AND CopyID IS NOT NULL)
+    """,
+    "DELETE FROM book_inventory",
+    """
+    INSERT INTO book_inventory (BookID, total_copies, available_copies)
+    SELECT BookID,
+           SUM(CASE WHEN Status <> 'withdrawn' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN Status = 'available' THEN 1 ELSE 0 END)
+    FROM copies
+    GROUP BY BookID
+    """,
+)
+BACKFILL_STATEMENTS: Tuple[str, ...] = (CREATE_MISSING_COPIES, LINK_LEGACY_LOANS) + SYNC_STATEMENTS
+
+AVAILABILITY_QUERY = "SELECT available_copies, total_copies FROM book_inventory WHERE BookID = %s"
+TAKE_COPY_QUERY = """
+    UPDATE book_inventory SET available_copies = available_copies - 1
+    WHERE BookID = %s AND available_copies > 0
+"""
+RETURN_COPY_QUERY = "UPDATE book_inventory SET available_copies = available_copies + 1 WHERE BookID = %s"
+PICK_COPY_QUERY = """
+    SELECT ID FROM copies
+    WHERE BookID = %s AND Status = 'available'
+    ORDER BY ID
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+"""
+SET_COPY_STATUS_QUERY = "UPDATE copies SET Status = %s WHERE ID = %s"
+COPY_INSERT_QUERY = "INSERT INTO copies (BookID, Barcode, Status) VALUES (%s, %s, %s)"
+UNLINKED_LOANS_QUERY = "SELECT ID, BookID FROM transactions WHERE ReturnDate IS NULL AND CopyID IS NULL ORDER BY ID"
+
+
+class Inventory:
+    """Tracks the copies of each title and keeps ``book_inventory`` in step with them.
+
+    ``take``/``give_back`` run on the caller's transaction cursor, so the counter,
+    the copy status and the loan commit or roll back together. Concurrent issues
+    of one title serialize on its counter row; the conditional decrement makes
+    it impossible to hand out more copies than are on the shelf.
+    """
+
+    def __init__(self, lms: Any):
+        self.lms = lms
+        self.logger = logging.getLogger(__name__)
+        self._inventory_upsert = lms.backend.upsert(
+            "book_inventory", "BookID",
+            "(BookID, total_copies, available_copies) VALUES (%s, %s, %s)",
+            "total_copies = total_copies + %s, available_copies = available_copies + %s")
+
+    @property
+    def profiler(self) -> Any:
+        return self.lms.profiler
+
+    def take(self, cursor: Any, book_id: int) -> Tuple[int, int]:
+        """Claim an available copy of ``book_id``; returns (copy ID, copies left).
+
+        Call inside the issuing transaction. Raises CirculationError if the
+        title is unknown or every copy is out.
+        """
+        cursor.execute(TAKE_COPY_QUERY, (book_id,))
+        if cursor.rowcount == 0:
+            if self.counts(cursor, book_id) is None:
+                raise CirculationError("Book ID not found.")
+            raise CirculationError("No copies of this book are available.")
+        cursor.execute(PICK_COPY_QUERY, (book_id,))
+        row = cursor.fetchone()
+        if row is None:
+            # The counter said a copy was free but none is marked so: the tables have drifted
+            raise LibraryError("Inventory is out of sync for this book; run an inventory rebuild.")
+        copy_id = row[0]
+        cursor.execute(SET_COPY_STATUS_QUERY, (ON_LOAN, copy_id))
+        return copy_id, self.counts(cursor, book_id)[0]
+
+    def counts(self, cursor: Any, book_id: int, lock: bool = False) -> Optional[Tuple[int, int]]:
+        """(available, total) read from the counter row on the caller's cursor; ``lock`` holds it FOR UPDATE."""
+        cursor.execute(AVAILABILITY_QUERY + (" FOR UPDATE" if lock else ""), (book_id,))
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else None
+
+    def give_back(self, cursor: Any, book_id: int, copy_id: Optional[int]) -> None:
+        """Put a returned copy back on the shelf (call inside the returning transaction)."""
+        cursor.execute(RETURN_COPY_QUERY, (book_id,))
+        if copy_id is not None:
+            cursor.execute(SET_COPY_STATUS_QUERY, (AVAILABLE, copy_id))
+
+    def add_copies(self, book_id: int, count: int = 1, cursor: Optional[Any] = None) -> List[Tuple[int, int]]:
+        """Add ``count`` copies of a title, in the caller's transaction if a cursor is given.
+
+        Each new copy goes to the title's next waiting hold, like a returned one,
+        and only the rest go on the shelf. Returns (hold ID, member ID) of the
+        holds that received a copy.
+        """
+        if count < 1:
+            raise LibraryError("Number of copies must be at least 1.")
+        if cursor is None:
+            with self.lms.transaction() as cursor:
+                return self.add_copies(book_id, count, cursor)
+        # Counts the copies in and locks the counter row before the holds; availability is
+        # added per copy as it is shelved
+        cursor.execute(self._inventory_upsert, (book_id, count, 0, count, 0))
+        passed_to = []
+        for _ in range(count):
+            cursor.execute(COPY_INSERT_QUERY, (book_id, None, AVAILABLE))
+            hold = self.lms.holds._hand_on(cursor, book_id, cursor.lastrowid)
+            if hold is not None:
+                passed_to.append(hold)
+        return passed_to
+
+    def withdraw_copy(self, copy_id: int) -> None:
+        """Take a copy out of circulation (lost or damaged). It must be on the shelf."""
+        with self.lms.transaction() as cursor:
+            cursor.execute("SELECT BookID, Status FROM copies WHERE ID = %s FOR UPDATE", (copy_id,))
+            row = cursor.fetchone()
+            if row is None:
+                raise LibraryError("Copy ID not found.")
+            book_id, status = row
+            if status != AVAILABLE:
+                raise LibraryError(f"Copy is {status.replace('_', ' ')} and cannot be withdrawn.")
+            cursor.execute(TAKE_COPY_QUERY, (book_id,))
+            cursor.execute("UPDATE book_inventory SET total_copies = total_copies - 1 WHERE BookID = %s",
+                           (book_id,))
+            cursor.execute(SET_COPY_STATUS_QUERY, (WITHDRAWN, copy_id))
+        self.logger.info("Copy withdrawn: %s", copy_id, extra={"book_id": book_id})
+
+    def remove_title(self, cursor: Any, book_id: int) -> None:
+        """Drop a title's copies and counter (for deleting a book with no loan history)."""
+        cursor.execute("DELETE FROM book_inventory WHERE BookID = %s", (book_id,))
+        cursor.execute("DELETE FROM copies WHERE BookID = %s", (book_id,))
+
+    @profiled("availability")
+    def availability(self, book_id: int) -> Optional[Tuple[int, int]]:
+        """(available, total) copies of a title from its counter row, or None if unknown."""
+        rows = self.lms.execute_query(AVAILABILITY_QUERY, (book_id,), fetch=True)
+        return tuple(rows[0]) if rows else None
+
+    @profiled("inventory_rebuild")
+    def rebuild(self) -> None:
+        """Reconcile copies and counters with the loans (e.g. after a bulk import).
+
+        Titles without copies get one, open loans without a copy are given a free
+        copy (a new one if the title has none left), copy statuses are reset from
+        the open loans and every counter is recomputed.
+        """
+        with self.lms.transaction() as cursor:
+            cursor.execute(CREATE_MISSING_COPIES)
+            cursor.execute(UNLINKED_LOANS_QUERY)
+            unlinked = cursor.fetchall()
+            for transaction_id, book_id in unlinked:
+                cursor.execute("""
+                    SELECT c.ID FROM copies c
+                    WHERE c.BookID = %s AND c.Status <> 'withdrawn'
+                      AND NOT EXISTS (SELECT 1 FROM transactions t
+                                      WHERE t.CopyID = c.ID AND t.ReturnDate IS NULL)
+                    ORDER BY c.ID LIMIT 1
+                """, (book_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(COPY_INSERT_QUERY, (book_id, None, ON_LOAN))
+                    copy_id = cursor.lastrowid
+                else:
+                    copy_id = row[0]
+                cursor.execute("UPDATE transactions SET CopyID = %s WHERE ID = %s", (copy_id, transaction_id))
+            for statement in SYNC_STATEMENTS:
+                cursor.execute(statement)
+        self.logger.info("Inventory rebuilt (%d open loans linked to copies)", len(unlinked))
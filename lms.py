@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Library Command Line
+Non-interactive subcommands for scripts, cron jobs and kiosks, next to the
+interactive menu of app.py:
+
+    python lms.py search "le guin" --limit 5
+    python lms.py issue 12 7
+    python lms.py return 345
+    python lms.py report top-books --limit 10
+    python lms.py --json batch < returns.txt        # one subcommand per line
+    python lms.py --remote http://127.0.0.1:8080 search dune
+
+Startup only imports what parsing the command line needs. The application
+modules (and with them the database driver) are imported when the first
+command runs, and no connection is opened until its first query. A batch
+runs every line in one process, so they share the connection pool and the
+search index; a kiosk can also point --remote at service.py, whose index is
+already warm.
+
+Exit status: 0 on success, 1 if an operation was refused or failed (any line
+of a batch), 2 for a usage error.
+"""
+
+import argparse
+import json
+import shlex
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO, Tuple
+
+# report name -> (analytics method, column headers)
+REPORTS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "top-books": ("top_books", ("Title", "Author", "Times Issued")),
+    "top-borrowers": ("top_borrowers", ("Member", "Email", "Loans", "Last Loan")),
+    "top-genres": ("top_genres", ("Genre", "Times Issued")),
+    "busiest-days": ("busiest_days", ("Date", "Issues", "Returns", "Total")),
+}
+
+
+class UsageError(Exception):
+    """A batch line that does not parse as a subcommand."""
+
+
+class _Parser(argparse.ArgumentParser):
+    # Inside a batch a bad line is reported and skipped instead of exiting the process
+    def error(self, message: str) -> None:
+        raise UsageError(f"{self.prog}: {message}")
+
+
+def _add_commands(subparsers: Any) -> None:
+    search = subparsers.add_parser("search", help="ranked keyword search of the catalog")
+    search.add_argument("keyword", nargs="+")
+    search.add_argument("--limit", type=int, help="results to show (default: search_page_size)")
+    search.add_argument("--offset", type=int, default=0, help="skip this many results")
+    issue = subparsers.add_parser("issue", help="lend a book to a member")
+    issue.add_argument("book_id", type=int)
+    issue.add_argument("member_id", type=int)
+    returned = subparsers.add_parser("return", help="return a loan and charge any fine")
+    returned.add_argument("transaction_id", type=int)
+    report = subparsers.add_parser("report", help="circulation summaries")
+    report.add_argument("name", choices=sorted(REPORTS))
+    report.add_argument("--limit", type=int, default=5)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run library operations without the interactive menu.")
+    parser.add_argument("--remote", metavar="URL", help="send operations to a running service.py")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per result")
+    parser.add_argument("--timing", action="store_true",
+                        help="report application startup, each command and the total time on stderr")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_commands(subparsers)
+    batch = subparsers.add_parser("batch", help="run one subcommand per line from a file or stdin")
+    batch.add_argument("file", nargs="?", default="-", help='file of commands (default "-": stdin)')
+    batch.add_argument("--stop-on-error", action="store_true", help="stop at the first failed line")
+    return parser
+
+
+def build_line_parser() -> argparse.ArgumentParser:
+    """Parser for one batch line (the same subcommands, without batch itself)."""
+    parser = _Parser(prog="batch line", add_help=False)
+    _add_commands(parser.add_subparsers(dest="command", required=True, parser_class=_Parser))
+    return parser
+
+
+def _json_default(value: Any) -> Any:
+    # Dates and DECIMAL prices/fines from the database
+    return value.isoformat() if hasattr(value, "isoformat") else float(value)
+
+
+class CommandLine:
+    """Runs parsed subcommands against the local database or a service.
+
+    The application is imported and constructed on the first command, not
+    when the object is created, so ``--help`` and usage errors never pay for it.
+    """
+
+    def __init__(self, remote: Optional[str] = None, as_json: bool = False, out: TextIO = sys.stdout,
+                 timing: bool = False):
+        self.remote = remote
+        self.as_json = as_json
+        self.out = out
+        self.timing = timing
+        self.startup = 0.0  # seconds spent importing and constructing the application
+        self.lms: Any = None
+        self.line: Optional[int] = None  # batch line being run, reported with each result
+
+    @property
+    def api(self) -> Any:
+        if self.lms is None:
+            started = time.perf_counter()
+            from config import LOG_CONFIG
+            from logging_setup import configure_logging
+            # stdout carries the results; records still go to the log file
+            configure_logging(dict(LOG_CONFIG, console=False))
+            from app import LibraryManagementSystem
+            self.lms = LibraryManagementSystem()
+            if self.remote:
+                self.lms.use_service(self.remote)
+            self.startup = time.perf_counter() - started
+            if self.timing:
+                print(f"⏱️ startup: {self.startup * 1000:.1f} ms (import and set up the application)",
+                      file=sys.stderr)
+        return self.lms.api
+
+    def expected_errors(self) -> Tuple[type, ...]:
+        """Errors reported as a failed command: rule violations and database or service failures."""
+        from errors import LibraryError
+        from db_pool import PoolTimeoutError
+        extra = self.lms.operation_errors if self.lms is not None else (PoolTimeoutError,)
+        return (LibraryError, *extra)
+
+    def run(self, args: argparse.Namespace) -> bool:
+        """Run one subcommand; prints its result (or error) and returns whether it succeeded."""
+        handler: Callable[[argparse.Namespace], Any] = getattr(self, f"do_{args.command}")
+        started, startup_before = time.perf_counter(), self.startup
+        try:
+            handler(args)
+            return True
+        except Exception as e:
+            if not isinstance(e, self.expected_errors()):
+                raise
+            self.emit_error(args.command, e)
+            return False
+        finally:
+            if self.timing:
+                # Startup paid during the first command is reported on its own line
+                elapsed = time.perf_counter() - started - (self.startup - startup_before)
+                where = f"line {self.line} " if self.line is not None else ""
+                print(f"⏱️ {where}{args.command}: {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+    def emit(self, command: str, result: Dict[str, Any], text: Callable[[], None]) -> None:
+        if self.as_json:
+            print(json.dumps({**self._tag(command), "ok": True, **result}, default=_json_default), file=self.out)
+        else:
+            text()
+
+    def emit_error(self, command: str, error: Exception) -> None:
+        if self.as_json:
+            print(json.dumps({**self._tag(command), "ok": False, "error": str(error)}), file=self.out)
+        else:
+            where = f"line {self.line}: " if self.line is not None else ""
+            print(f"❌ {where}{command}: {error}", file=sys.stderr)
+
+    def _tag(self, command: str) -> Dict[str, Any]:
+        return {"command": command} if self.line is None else {"line": self.line, "command": command}
+
+    def do_search(self, args: argparse.Namespace) -> None:
+        keyword = " ".join(args.keyword)
+        total, rows = self.api.search(keyword, limit=args.limit, offset=args.offset)
+
+        def text() -> None:
+            print(f"🔍 {total} found for '{keyword}'", file=self.out)
+            for row in rows:
+                print(f"{row[0]:<6} {row[1]:<30} {row[2]:<20} {row[3] or 'N/A':<15} {row[4]:<6} "
+                      f"${float(row[5]):.2f}", file=self.out)
+        columns = ("id", "title", "author", "genre", "year", "price")
+        self.emit("search", {"keyword": keyword, "total": total,
+                             "results": [dict(zip(columns, row)) for row in rows]}, text)
+
+    def do_issue(self, args: argparse.Namespace) -> None:
+        result = self.api.issue(args.book_id, args.member_id)
+        self.emit("issue", result, lambda: print(
+            f"✅ Book '{result['book_title']}' issued to {result['member_name']} "
+            f"(transaction {result['transaction_id']}).", file=self.out))
+
+    def do_return(self, args: argparse.Namespace) -> None:
+        result = self.api.return_transaction(args.transaction_id)
+
+        def text() -> None:
+            print(f"✅ Book '{result['book_title']}' returned by {result['member_name']}. "
+                  f"Fine: ${result['fine']:.2f}", file=self.out)
+            if result.get("hold_id"):
+                print(f"📌 Set this copy aside for member {result['held_for']} (hold #{result['hold_id']}).",
+                      file=self.out)
+        self.emit("return", result, text)
+
+    def do_report(self, args: argparse.Namespace) -> None:
+        method, headers = REPORTS[args.name]
+        rows = getattr(self.api.analytics, method)(args.limit)
+
+        def text() -> None:
+            print("\t".join(headers), file=self.out)
+            for row in rows:
+                print("\t".join("N/A" if value is None else str(value) for value in row), file=self.out)
+        self.emit("report", {"report": args.name,
+                             "rows": [dict(zip(headers, row)) for row in rows]}, text)
+
+    def run_batch(self, lines: Sequence[str], stop_on_error: bool = False) -> Tuple[int, int]:
+        """Run each non-blank, non-comment line as a subcommand; returns (succeeded, failed)."""
+        parser = build_line_parser()
+        succeeded = failed = 0
+        for line_no, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            self.line = line_no
+            try:
+                args = parser.parse_args(shlex.split(line))
+            except (UsageError, ValueError) as e:  # ValueError: unbalanced quotes
+                self.emit_error("parse", e)
+                ok = False
+            else:
+                ok = self.run(args)
+            succeeded += ok
+            failed += not ok
+            if not ok and stop_on_error:
+                break
+        self.line = None
+        return succeeded, failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns the exit status."""
+    started = time.perf_counter()
+    args = build_parser().parse_args(argv)
+    cli = CommandLine(remote=args.remote, as_json=args.json, timing=args.timing)
+    try:
+        if args.command == "batch":
+            handle = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+            with handle:
+                succeeded, failed = cli.run_batch(handle, stop_on_error=args.stop_on_error)
+            print(f"📋 Batch: {succeeded} succeeded, {failed} failed", file=sys.stderr)
+            ok = failed == 0
+        else:
+            ok = cli.run(args)
+    finally:
+        if cli.lms is not None:
+            cli.lms.pool.close_all()
+        if args.timing:
+            print(f"⏱️ total {args.command}: {(time.perf_counter() - started) * 1000:.1f} ms in process "
+                  f"({len(sys.modules)} modules loaded)", file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Member Status
+One maintained row per member with the number of open loans, the fines owed
+on returned loans that are not paid yet, and the date of the last activity.
+Issue, return and fine payment update it in their own transactions, so the
+borrowing checks read a single row by primary key instead of counting loans.
+
+Rebuild or verify it against the transactions table:
+    python member_status.py verify     # exit status 1 if any member is out of step
+    python member_status.py rebuild
+"""
+
+import argparse
+import logging
+from typing import Any, List, Tuple
+
+from config import APP_CONFIG
+from errors import CirculationError
+from profiling import profiled
+
+MEMBER_STATUS_DDL: Tuple[str, ...] = (
+    """
+    CREATE TABLE member_status (
+        MemberID INT PRIMARY KEY,
+        open_loans INT NOT NULL DEFAULT 0,
+        unpaid_fines DECIMAL(10,2) NOT NULL DEFAULT 0,
+        last_activity DATE,
+        FOREIGN KEY (MemberID) REFERENCES members(ID)
+    )
+    """,
+)
+
+# Per-member figures as derived from the loans themselves
+_COMPUTED = """
+    SELECT m.ID AS MemberID,
+           COALESCE(SUM(CASE WHEN t.ReturnDate IS NULL AND t.ID IS NOT NULL THEN 1 ELSE 0 END), 0) AS open_loans,
+           COALESCE(SUM(CASE WHEN t.ReturnDate IS NOT NULL AND t.FinePaid = 0 THEN t.FineAmount ELSE 0 END), 0)
+               AS unpaid_fines,
+           MAX(COALESCE(t.ReturnDate, t.IssueDate)) AS last_activity
+    FROM members m
+    LEFT JOIN transactions t ON t.MemberID = m.ID
+"""
+REBUILD_STATEMENTS: Tuple[str, ...] = (
+    "DELETE FROM member_status",
+    f"""
+    INSERT INTO member_status (MemberID, open_loans, unpaid_fines, last_activity)
+    {_COMPUTED}
+    GROUP BY m.ID
+    """,
+)
+INSERT_ONE_QUERY = f"""
+    INSERT INTO member_status (MemberID, open_loans, unpaid_fines, last_activity)
+    {_COMPUTED}
+    WHERE m.ID = %s
+    GROUP BY m.ID
+"""
+VERIFY_QUERY = f"""
+    SELECT c.MemberID, s.open_loans, s.unpaid_fines, c.open_loans, c.unpaid_fines
+    FROM ({_COMPUTED} GROUP BY m.ID) c
+    LEFT JOIN member_status s ON s.MemberID = c.MemberID
+    WHERE s.MemberID IS NULL
+       OR s.open_loans <> c.open_loans
+       OR ABS(s.unpaid_fines - c.unpaid_fines) > 0.005
+    ORDER BY c.MemberID
+"""
+STATUS_QUERY = "SELECT open_loans, unpaid_fines FROM member_status WHERE MemberID = %s"
+ISSUE_UPDATE_QUERY = """
+    UPDATE member_status SET open_loans = open_loans + 1, last_activity = CURDATE() WHERE MemberID = %s
+"""
+RETURN_UPDATE_QUERY = """
+    UPDATE member_status
+    SET open_loans = open_loans - 1, unpaid_fines = unpaid_fines + %s, last_activity = CURDATE()
+    WHERE MemberID = %s
+"""
+PAYMENT_UPDATE_QUERY = """
+    UPDATE member_status SET unpaid_fines = unpaid_fines - %s, last_activity = CURDATE() WHERE MemberID = %s
+"""
+
+
+class MemberStatus:
+    """Keeps ``member_status`` in step with each member's loans and fines.
+
+    The ``record_*`` methods and ``lock``/``check_can_borrow`` run on the
+    caller's transaction cursor. ``lock`` takes the member's status row
+    ``FOR UPDATE``, which serializes concurrent issues by the same member so
+    the open loan count read under the lock is always current.
+    """
+
+    def __init__(self, lms: Any):
+        self.lms = lms
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def profiler(self) -> Any:
+        return self.lms.profiler
+
+    def lock(self, cursor: Any, member_id: int) -> Tuple[int, float]:
+        """Lock the member's status row and return (open loans, unpaid fines).
+
+        A member added outside the application (raw SQL) gets a row computed
+        from the loans on first use. Raises CirculationError for an unknown member.
+        """
+        cursor.execute(STATUS_QUERY + " FOR UPDATE", (member_id,))
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute(INSERT_ONE_QUERY, (member_id,))
+            if cursor.rowcount == 0:
+                raise CirculationError("Member ID not found.")
+            cursor.execute(STATUS_QUERY + " FOR UPDATE", (member_id,))
+            row = cursor.fetchone()
+        return row[0], float(row[1] or 0)
+
+    def check_can_borrow(self, cursor: Any, member_id: int) -> None:
+        """Lock the member's row and raise CirculationError if the borrowing rules say no."""
+        open_loans, unpaid = self.lock(cursor, member_id)
+        if unpaid > APP_CONFIG["max_unpaid_fines"]:
+            raise CirculationError(f"Member has ${unpaid:.2f} in unpaid fines; please settle them first.")
+        if open_loans >= APP_CONFIG["max_books_per_member"]:
+            raise CirculationError(
+                f"Member has reached maximum limit of {APP_CONFIG['max_books_per_member']} books."
+            )
+
+    def add(self, cursor: Any, member_id: int) -> None:
+        """Create the row for a new member (call inside the inserting transaction)."""
+        cursor.execute("INSERT INTO member_status (MemberID, open_loans, unpaid_fines) VALUES (%s, 0, 0)",
+                       (member_id,))
+
+    def remove(self, cursor: Any, member_id: int) -> None:
+        cursor.execute("DELETE FROM member_status WHERE MemberID = %s", (member_id,))
+
+    def record_issue(self, cursor: Any, member_id: int) -> None:
+        cursor.execute(ISSUE_UPDATE_QUERY, (member_id,))
+
+    def record_return(self, cursor: Any, member_id: int, fine: float) -> None:
+        cursor.execute(RETURN_UPDATE_QUERY, (fine, member_id))
+
+    def record_payment(self, cursor: Any, member_id: int, amount: float) -> None:
+        cursor.execute(PAYMENT_UPDATE_QUERY, (amount, member_id))
+
+    @profiled("member_status_rebuild")
+    def rebuild(self) -> None:
+        """Recompute every member's row from the transactions table."""
+        with self.lms.transaction() as cursor:
+            for statement in REBUILD_STATEMENTS:
+                cursor.execute(statement)
+        self.logger.info("Member status rebuilt from transactions")
+
+    @profiled("member_status_verify")
+    def verify(self) -> List[Tuple]:
+        """Members whose row is missing or disagrees with their loans.
+
+        Rows are (member ID, stored open loans, stored unpaid fines, actual open
+        loans, actual unpaid fines); the stored values are None for a missing row.
+        """
+        # Read on a transaction cursor so a database error is raised, not mistaken for "all in step"
+        with self.lms.transaction() as cursor:
+            cursor.execute(VERIFY_QUERY)
+            return cursor.fetchall()
+
+
+def main() -> None:
+    """Command-line entry point for member status maintenance."""
+    from app import LibraryManagementSystem
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify the per-member status table.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    args = parser.parse_args()
+
+    status = LibraryManagementSystem().member_status
+    if args.command == "rebuild":
+        status.rebuild()
+        print("✅ Member status rebuilt from transactions.")
+        return
+    mismatches = status.verify()
+    for member_id, open_loans, unpaid, actual_open, actual_unpaid in mismatches[:20]:
+        stored = "missing" if open_loans is None else f"{open_loans} open, ${float(unpaid):.2f} unpaid"
+        print(f"❌ Member {member_id}: stored {stored}; "
+              f"actual {actual_open} open, ${float(actual_unpaid):.2f} unpaid")
+    if len(mismatches) > 20:
+        print(f"   ... and {len(mismatches) - 20} more")
+    print(f"{'❌' if mismatches else '✅'} {len(mismatches)} members out of step with their loans.")
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Schema Migrations
+Versioned schema changes for the library database, applied in order and
+recorded in the ``schema_version`` table.
+
+Usage:
+    python migrations.py status     # show applied / pending versions
+    python migrations.py migrate    # apply pending migrations
+    python migrations.py check      # EXPLAIN the hot queries and verify index use
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import analytics
+import archive
+import holds
+import inventory
+import member_status
+from analytics import REBUILD_STATEMENTS, SUMMARY_TABLES_DDL
+from archive import ARCHIVE_DDL, ARCHIVE_SHARED_DDL
+from holds import HOLDS_DDL, HOLDS_INDEXES
+from inventory import BACKFILL_STATEMENTS, INVENTORY_DDL, INVENTORY_SHARED_DDL
+from member_status import MEMBER_STATUS_DDL, REBUILD_STATEMENTS as MEMBER_STATUS_REBUILD
+from search_index import CATALOG_CHANGES_DDL, CATALOG_VERSION_DDL
+
+SCHEMA_VERSION_DDL = {
+    "mysql": """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+}
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema version: the statements to run for each SQL dialect."""
+    version: int
+    description: str
+    statements: Dict[str, Tuple[str, ...]]
+
+    def for_dialect(self, dialect: str) -> Tuple[str, ...]:
+        return self.statements.get(dialect, self.statements.get("default", ()))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Composite indexes for open-loan lookups and history ordering", {
+        # (BookID, ReturnDate) and (MemberID, ReturnDate) answer "... = ? AND ReturnDate IS NULL"
+        # with an index-only range read, and also cover the open-loan COUNT(*)s.
+        "default": (
+            "CREATE INDEX idx_transactions_book_open ON transactions (BookID, ReturnDate)",
+            "CREATE INDEX idx_transactions_member_open ON transactions (MemberID, ReturnDate)",
+            "CREATE INDEX idx_transactions_issue_date ON transactions (IssueDate, ID)",
+        ),
+    }),
+    Migration(2, "Sort indexes for keyset-paginated book and member listings", {
+        "default": (
+            "CREATE INDEX idx_books_title ON books (title, ID)",
+            "CREATE INDEX idx_members_name ON members (LastName, FirstName, ID)",
+        ),
+    }),
+    Migration(3, "Circulation summary tables (per book, member, genre and day), backfilled", {
+        "default": SUMMARY_TABLES_DDL + REBUILD_STATEMENTS,
+    }),
+    Migration(4, "Copies per title with an available-copies counter, one copy per existing book", {
+        dialect: ddl + INVENTORY_SHARED_DDL + BACKFILL_STATEMENTS for dialect, ddl in INVENTORY_DDL.items()
+    }),
+    Migration(5, "Hold queues per title", {
+        dialect: ddl + HOLDS_INDEXES for dialect, ddl in HOLDS_DDL.items()
+    }),
+    Migration(6, "Fine payment flag and per-member status rows, backfilled", {
+        # Fines of loans returned before payments were tracked are treated as settled
+        "default": (
+            "ALTER TABLE transactions ADD COLUMN FinePaid BOOLEAN NOT NULL DEFAULT 0",
+            "UPDATE transactions SET FinePaid = 1 WHERE ReturnDate IS NOT NULL",
+        ) + MEMBER_STATUS_DDL + MEMBER_STATUS_REBUILD,
+    }),
+    Migration(7, "Archive table for closed loans and the transactions_all history view", {
+        dialect: ddl + ARCHIVE_SHARED_DDL for dialect, ddl in ARCHIVE_DDL.items()
+    }),
+    Migration(8, "Shared catalog version that tells search indexes to rebuild", {
+        "default": CATALOG_VERSION_DDL,
+    }),
+    Migration(9, "Books changed by each catalog version, for patching search indexes", {
+        "default": CATALOG_CHANGES_DDL,
+    }),
+]
+
+
+@dataclass
+class PlanCheck:
+    """Result of EXPLAINing one hot query."""
+    name: str
+    expected: Tuple[str, ...]
+    used: List[str] = field(default_factory=list)
+    plan: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(index in self.used for index in self.expected)
+
+
+class MigrationRunner:
+    """Applies MIGRATIONS to the database behind a LibraryManagementSystem."""
+
+    def __init__(self, lms: Any, migrations: Optional[List[Migration]] = None):
+        self.lms = lms
+        self.dialect = lms.backend.dialect
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+        self.logger = logging.getLogger(__name__)
+
+    def applied_versions(self, connection: Any) -> List[int]:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(SCHEMA_VERSION_DDL[self.dialect])
+            cursor.execute("SELECT version FROM schema_version ORDER BY version")
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def current_version(self) -> int:
+        with self.lms.pool.connection() as connection:
+            versions = self.applied_versions(connection)
+        return versions[-1] if versions else 0
+
+    def pending(self, connection: Any) -> List[Migration]:
+        applied = set(self.applied_versions(connection))
+        return [m for m in self.migrations if m.version not in applied]
+
+    def migrate(self, connection: Optional[Any] = None) -> List[int]:
+        """Apply every pending migration; returns the versions applied."""
+        if connection is None:
+            with self.lms.pool.connection() as pooled:
+                return self.migrate(pooled)
+
+        applied = []
+        for migration in self.pending(connection):
+            cursor = connection.cursor()
+            try:
+                # MySQL commits DDL implicitly, so each migration is recorded right after it runs
+                for statement in migration.for_dialect(self.dialect):
+                    cursor.execute(statement)
+                cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                               (migration.version, migration.description))
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                self.logger.error("Migration %s failed: %s", migration.version, migration.description)
+                raise
+            finally:
+                cursor.close()
+            self.logger.info("Applied migration %s: %s", migration.version, migration.description)
+            applied.append(migration.version)
+        return applied
+
+    def hot_queries(self) -> List[Tuple[str, str, Tuple, Tuple[str, ...]]]:
+        """(name, query, sample params, indexes it must use) for the circulation hot paths."""
+        lms = self.lms
+        primary_key = "INTEGER PRIMARY KEY" if self.dialect == "sqlite" else "PRIMARY"
+        # SQLite only aliases INTEGER PRIMARY KEY to the rowid; an INT key gets its own index
+        inventory_key = "sqlite_autoindex_book_inventory_1" if self.dialect == "sqlite" else "PRIMARY"
+        status_key = "sqlite_autoindex_member_status_1" if self.dialect == "sqlite" else "PRIMARY"
+        return [
+            ("issue_book: member status", member_status.STATUS_QUERY, (1,), (status_key,)),
+            ("issue_book: title already on loan", lms.OPEN_LOAN_QUERY, (1, 1), ("idx_transactions_member_open",)),
+            ("issue_book: take a copy", inventory.TAKE_COPY_QUERY, (1,), (inventory_key,)),
+            ("issue_book: pick a free copy", inventory.PICK_COPY_QUERY, (1,), ("idx_copies_book_status",)),
+            ("issue_book: collect a held copy", holds.READY_HOLD_QUERY, (1, 1), ("idx_holds_member",)),
+            ("return_book: close loan", lms.RETURN_UPDATE_QUERY, (14, 14, 5.0, 1), (primary_key,)),
+            ("return_book: next hold in queue", holds.NEXT_HOLD_QUERY, (1,), ("idx_holds_queue",)),
+            ("place_hold: queue position", holds.QUEUE_POSITION_QUERY, (1, 1000), ("idx_holds_queue",)),
+            ("expire_holds: uncollected batch", holds.EXPIRED_HOLDS_QUERY, ("2025-01-01", 500),
+             ("idx_holds_expiry",)),
+            ("show_transactions: first page", lms.page_query("transactions", after=False),
+             lms.page_params("transactions", None, 50), ("idx_transactions_issue_date", "idx_archive_issue_date")),
+            ("show_transactions: next page", lms.page_query("transactions", after=True),
+             lms.page_params("transactions", ["2025-01-01", 100], 50),
+             ("idx_transactions_issue_date", "idx_archive_issue_date")),
+            ("archive: first batch", archive.ARCHIVE_BATCH_QUERY, ("2025-01-01", "2025-01-01", 1000),
+             ("idx_transactions_issue_date",)),
+            ("archive: next batch", archive.ARCHIVE_RESUME_QUERY,
+             ("2025-01-01", "2025-01-01", "2024-06-01", "2024-06-01", "2024-06-01", 100, 1000),
+             ("idx_transactions_issue_date",)),
+            ("show_books: next page", lms.page_query("books", after=True),
+             (*lms.seek_params(["M", 100]), 50), ("idx_books_title",)),
+            ("most_issued_books: top N", analytics.TOP_BOOKS_QUERY, (5,), ("idx_book_circulation_rank",)),
+            ("show_members: next page", lms.page_query("members", after=True),
+             (*lms.seek_params(["Smith", "Ann", 100]), 50), ("idx_members_name",)),
+        ]
+
+    def explain_check(self) -> List[PlanCheck]:
+        """EXPLAIN each hot query and report which of the expected indexes it uses."""
+        results = []
+        with self.lms.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                for name, query, params, expected in self.hot_queries():
+                    check = PlanCheck(name, expected)
+                    if self.dialect == "sqlite":
+                        cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+                        for row in cursor.fetchall():
+                            detail = row[-1]
+                            check.plan.append(detail)
+                            check.used.extend(index for index in expected if index in detail)
+                    else:
+                        cursor.execute(f"EXPLAIN {query}", params)
+                        columns = [d[0] for d in cursor.description]
+                        for row in cursor.fetchall():
+                            info = dict(zip(columns, row))
+                            check.plan.append(f"{info.get('table')}: key={info.get('key')} "
+                                              f"type={info.get('type')} extra={info.get('Extra')}")
+                            if info.get("key"):
+                                check.used.append(info["key"])
+                    results.append(check)
+            finally:
+                cursor.close()
+        return results
+
+
+def main() -> None:
+    """Command-line entry point for schema migrations."""
+    from app import LibraryManagementSystem
+
+    parser = argparse.ArgumentParser(description="Manage library database schema versions.")
+    parser.add_argument("command", choices=["status", "migrate", "check"])
+    args = parser.parse_args()
+
+    runner = MigrationRunner(LibraryManagementSystem())
+    if args.command == "status":
+        with runner.lms.pool.connection() as connection:
+            pending = runner.pending(connection)
+        print(f"📐 Schema version: {runner.current_version()}")
+        for migration in pending:
+            print(f"   pending {migration.version}: {migration.description}")
+    elif args.command == "migrate":
+        applied = runner.migrate()
+        print(f"✅ Applied migrations: {applied}" if applied else "✅ Schema is up to date.")
+    else:
+        failures = 0
+        for check in runner.explain_check():
+            status = "✅" if check.ok else "❌"
+            print(f"{status} {check.name} (expects {', '.join(check.expected)})")
+            for line in check.plan:
+                print(f"     {line}")
+            failures += not check.ok
+        raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
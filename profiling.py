@@ -0,0 +1,303 @@
+# profiling.py
+# Query instrumentation: statement timings, slow-query log and round trips per operation
+
+import functools
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_IN_LIST = re.compile(r"%s(\s*,\s*%s)+")
+OTHER_STATEMENTS = "<other statements>"
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_statement(query: str) -> str:
+    """Collapse whitespace and IN (%s, %s, ...) lists so equivalent statements aggregate together."""
+    return _IN_LIST.sub("%s, ...", " ".join(query.split()))
+
+
+@dataclass
+class StatementStats:
+    """Aggregated timings for one normalized statement (seconds)."""
+    calls: int = 0
+    execute: float = 0.0
+    fetch: float = 0.0
+    rows: int = 0
+    slowest: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.execute + self.fetch
+
+
+@dataclass
+class OperationStats:
+    """Aggregated cost of one named operation: wall time, DB time and round trips."""
+    calls: int = 0
+    elapsed: float = 0.0
+    connect: float = 0.0
+    database: float = 0.0
+    statements: int = 0
+    max_statements: int = 0
+
+
+class _ActiveOperation:
+    __slots__ = ("name", "sampled", "connect", "database", "statements")
+
+    def __init__(self, name: str, sampled: bool):
+        self.name = name
+        self.sampled = sampled
+        self.connect = 0.0
+        self.database = 0.0
+        self.statements = 0
+
+
+class QueryProfiler:
+    """Collects per-statement and per-operation timings.
+
+    ``enabled`` turns on aggregation; ``sample_rate`` (0-1) then limits it to a
+    random share of operations (and of statements run outside any operation),
+    so it can stay on in production. Every statement of a sampled operation is
+    recorded, which keeps its round-trip count exact. Statements slower than
+    ``slow_query_ms`` are logged whether or not profiling is enabled.
+    """
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 1.0, slow_query_ms: float = 0.0,
+                 max_statements: int = 500):
+        self.enabled = enabled
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms else 0.0
+        self.max_statements = max_statements
+        self.logger = logging.getLogger(__name__)
+        self._statements: Dict[str, StatementStats] = {}
+        self._operations: Dict[str, OperationStats] = {}
+        self._connect = StatementStats()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def active(self) -> bool:
+        """True if cursors need wrapping at all (profiling on or a slow-query threshold set)."""
+        return self.enabled or bool(self.slow_query_seconds)
+
+    def _sample(self) -> bool:
+        return self.enabled and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+
+    def statement_sampled(self) -> bool:
+        """Whether the next statement on this thread should be aggregated."""
+        operation = getattr(self._local, "operation", None)
+        return operation.sampled if operation is not None else self._sample()
+
+    # Recording -------------------------------------------------------------------
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """Attribute the statements run inside the block to operation ``name``.
+
+        Nested operations are folded into the outermost one, so the outer
+        operation is charged for every round trip made by the calls beneath it.
+        """
+        if not self.enabled or getattr(self._local, "operation", None) is not None:
+            yield
+            return
+        active = _ActiveOperation(name, self._sample())
+        self._local.operation = active
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.operation = None
+            if active.sampled:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    stats = self._operations.setdefault(name, OperationStats())
+                    stats.calls += 1
+                    stats.elapsed += elapsed
+                    stats.connect += active.connect
+                    stats.database += active.database
+                    stats.statements += active.statements
+                    stats.max_statements = max(stats.max_statements, active.statements)
+
+    def record_connect(self, seconds: float) -> None:
+        """Record the time spent checking out (and possibly opening) a pooled connection."""
+        operation = getattr(self._local, "operation", None)
+        if operation is not None:
+            if not operation.sampled:
+                return
+            operation.connect += seconds
+        elif not self._sample():
+            return
+        with self._lock:
+            self._connect.calls += 1
+            self._connect.execute += seconds
+            self._connect.slowest = max(self._connect.slowest, seconds)
+
+    def record(self, query: str, execute: float, fetch: float, rows: int, sampled: bool) -> None:
+        """Record one finished statement (called by ProfiledCursor)."""
+        total = execute + fetch
+        if self.slow_query_seconds and total >= self.slow_query_seconds:
+            self.logger.warning("Slow query (%.1f ms: execute %.1f, fetch %.1f, %d rows): %s",
+                                total * 1000, execute * 1000, fetch * 1000, rows, normalize_statement(query))
+        if not sampled:
+            return
+        operation = getattr(self._local, "operation", None)
+        if operation is not None:
+            operation.statements += 1
+            operation.database += total
+        key = normalize_statement(query)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    key = OTHER_STATEMENTS
+                stats = self._statements.setdefault(key, StatementStats())
+            stats.calls += 1
+            stats.execute += execute
+            stats.fetch += fetch
+            stats.rows += rows
+            stats.slowest = max(stats.slowest, total)
+
+    def cursor(self, cursor: Any) -> Any:
+        """Wrap a DB-API cursor so its statements are timed (returned as-is when inactive)."""
+        return ProfiledCursor(cursor, self) if self.active else cursor
+
+    # Reporting ---------------------------------------------------------------------
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._operations.clear()
+            self._connect = StatementStats()
+
+    def top_statements(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Statements ordered by total time, with per-phase timings in milliseconds."""
+        with self._lock:
+            ranked = sorted(self._statements.items(), key=lambda item: item[1].total, reverse=True)[:limit]
+        return [{"statement": statement, "calls": stats.calls, "total_ms": round(stats.total * 1000, 3),
+                 "avg_ms": round(stats.total * 1000 / stats.calls, 3),
+                 "execute_ms": round(stats.execute * 1000, 3), "fetch_ms": round(stats.fetch * 1000, 3),
+                 "max_ms": round(stats.slowest * 1000, 3), "rows": stats.rows}
+                for statement, stats in ranked]
+
+    def operation_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-operation calls, average wall/connect/DB time (ms) and round trips per call."""
+        with self._lock:
+            operations = dict(self._operations)
+        return {name: {"calls": stats.calls,
+                       "avg_ms": round(stats.elapsed * 1000 / stats.calls, 3),
+                       "avg_connect_ms": round(stats.connect * 1000 / stats.calls, 3),
+                       "avg_db_ms": round(stats.database * 1000 / stats.calls, 3),
+                       "round_trips": round(stats.statements / stats.calls, 2),
+                       "max_round_trips": stats.max_statements}
+                for name, stats in sorted(operations.items())}
+
+    def connect_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = self._connect
+            return {"checkouts": stats.calls, "total_ms": round(stats.execute * 1000, 3),
+                    "max_ms": round(stats.slowest * 1000, 3)}
+
+    def report(self, limit: int = 10) -> str:
+        """Human-readable summary: connection checkouts, operations and top statements by total time."""
+        sampling = f", sampling {self.sample_rate:.0%}" if self.sample_rate < 1.0 else ""
+        connect = self.connect_stats()
+        lines = [f"Query profile{sampling}: {connect['checkouts']} connection checkouts, "
+                 f"{connect['total_ms']:.1f} ms waiting (max {connect['max_ms']:.1f} ms)"]
+        operations = self.operation_stats()
+        if operations:
+            lines.append(f"{'Operation':<24} {'Calls':>6} {'Avg ms':>9} {'Connect':>9} {'DB ms':>9} {'Trips':>6}")
+            for name, stats in operations.items():
+                lines.append(f"{name:<24} {stats['calls']:>6} {stats['avg_ms']:>9.2f} "
+                             f"{stats['avg_connect_ms']:>9.2f} {stats['avg_db_ms']:>9.2f} {stats['round_trips']:>6.1f}")
+        statements = self.top_statements(limit)
+        if statements:
+            lines.append(f"{'Total ms':>9} {'Calls':>6} {'Avg ms':>8} {'Exec ms':>9} {'Fetch ms':>9} "
+                         f"{'Rows':>8}  Statement")
+            for stats in statements:
+                lines.append(f"{stats['total_ms']:>9.1f} {stats['calls']:>6} {stats['avg_ms']:>8.2f} "
+                             f"{stats['execute_ms']:>9.1f} {stats['fetch_ms']:>9.1f} {stats['rows']:>8}  "
+                             f"{stats['statement'][:100]}")
+        return "\n".join(lines)
+
+
+class ProfiledCursor:
+    """Cursor proxy that times execute and fetch calls and reports each statement on completion.
+
+    A statement is complete when the next one is executed or the cursor is closed,
+    so fetch time and row counts are attributed to the statement that produced them.
+    """
+
+    def __init__(self, cursor: Any, profiler: QueryProfiler):
+        self._cursor = cursor
+        self._profiler = profiler
+        self._pending: Optional[List[Any]] = None  # [query, execute s, fetch s, rows fetched, sampled]
+
+    def _flush(self) -> None:
+        if self._pending is not None:
+            query, execute, fetch, rows, sampled = self._pending
+            self._pending = None
+            if rows is None:
+                rows = max(self._cursor.rowcount or 0, 0)
+            self._profiler.record(query, execute, fetch, rows, sampled)
+
+    def _run(self, method: Callable[..., Any], query: str, *args: Any) -> Any:
+        self._flush()
+        sampled = self._profiler.statement_sampled()
+        if not sampled and not self._profiler.slow_query_seconds:
+            return method(query, *args)
+        started = time.perf_counter()
+        result = method(query, *args)
+        self._pending = [query, time.perf_counter() - started, 0.0, None, sampled]
+        return self if result is self._cursor else result
+
+    def execute(self, query: str, params: Any = ()) -> Any:
+        return self._run(self._cursor.execute, query, params)
+
+    def executemany(self, query: str, seq_of_params: Any) -> Any:
+        return self._run(self._cursor.executemany, query, seq_of_params)
+
+    def _fetch(self, method: Callable[..., Any], *args: Any) -> Any:
+        if self._pending is None:
+            return method(*args)
+        started = time.perf_counter()
+        result = method(*args)
+        self._pending[2] += time.perf_counter() - started
+        fetched = 0 if result is None else (len(result) if isinstance(result, list) else 1)
+        self._pending[3] = (self._pending[3] or 0) + fetched
+        return result
+
+    def fetchone(self) -> Any:
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size: Optional[int] = None) -> Any:
+        return self._fetch(self._cursor.fetchmany, *(() if size is None else (size,)))
+
+    def fetchall(self) -> Any:
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.fetchone, None)
+
+    def close(self) -> None:
+        self._flush()
+        self._cursor.close()
+
+    def __getattr__(self, name: str) -> Any:
+        # rowcount, lastrowid, description, ...
+        return getattr(self._cursor, name)
+
+
+def profiled(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Method decorator that runs the call inside ``self.profiler.operation(name)``."""
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            with self.profiler.operation(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
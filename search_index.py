@@ -0,0 +1,156 @@
+# search_index.py
+# In-memory inverted index for book search
+
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# How much a match in each field contributes to a book's score
+FIELD_WEIGHTS: Dict[str, float] = {"title": 3.0, "author": 2.0, "genre": 1.0}
+
+# Bonus applied when a query term matches a token exactly rather than as a prefix
+EXACT_MATCH_BONUS = 1.5
+
+# Shared catalog version, bumped by every books write, so a process can tell its index missed a change
+CATALOG_VERSION_DDL: Tuple[str, ...] = (
+    "CREATE TABLE catalog_version (ID INT PRIMARY KEY, version BIGINT NOT NULL DEFAULT 0)",
+    "INSERT INTO catalog_version (ID, version) VALUES (1, 0)",
+)
+CATALOG_BUMP_QUERY = "UPDATE catalog_version SET version = version + 1 WHERE ID = 1"
+# (version, highest book ID); the MAX also catches books inserted by plain SQL that never bumped the version
+CATALOG_STATE_QUERY = "SELECT version, (SELECT MAX(ID) FROM books) FROM catalog_version WHERE ID = 1"
+# The books each version changed, so a stale index re-reads only those rows. A version with no rows
+# here (see LibraryManagementSystem.catalog_changed) makes every process rebuild its index instead.
+CATALOG_CHANGES_DDL: Tuple[str, ...] = (
+    "CREATE TABLE catalog_changes (version BIGINT NOT NULL, BookID INT NOT NULL, PRIMARY KEY (version, BookID))",
+)
+CATALOG_CHANGE_INSERT_QUERY = """
+    INSERT INTO catalog_changes (version, BookID) SELECT version, %s FROM catalog_version WHERE ID = 1
+"""
+CATALOG_CHANGES_QUERY = "SELECT version, BookID FROM catalog_changes WHERE version > %s AND version <= %s"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase, accent-free word tokens."""
+    if not text:
+        return []
+    normalized = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return _TOKEN.findall(stripped)
+
+
+class BookSearchIndex:
+    """Inverted index over book title, author and genre.
+
+    Every query term is treated as a prefix (``tolk`` finds ``Tolkien``), all
+    terms must match (AND semantics), and results are ranked by the summed
+    field weights of the matching tokens. The index only stores IDs and
+    tokens; callers fetch the rows for the page they display.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_tokens: Dict[int, Tuple[str, ...]] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def __contains__(self, book_id: int) -> bool:
+        return book_id in self._doc_tokens
+
+    def add(self, book_id: int, title: Optional[str], author: Optional[str], genre: Optional[str]) -> None:
+        """Index a book, replacing any previous entry for the same ID."""
+        weights: Dict[str, float] = {}
+        for field, text in (("title", title), ("author", author), ("genre", genre)):
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + FIELD_WEIGHTS[field]
+        with self._lock:
+            self._remove_locked(book_id)
+            for token, weight in weights.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._vocabulary_dirty = True
+                postings[book_id] = weight
+            self._doc_tokens[book_id] = tuple(weights)
+
+    def add_many(self, rows: Iterable[Tuple[int, Optional[str], Optional[str], Optional[str]]]) -> int:
+        """Index (ID, title, author, genre) rows; returns how many were added."""
+        count = 0
+        for book_id, title, author, genre in rows:
+            self.add(book_id, title, author, genre)
+            count += 1
+        return count
+
+    def remove(self, book_id: int) -> None:
+        """Drop a book from the index (no-op if it is not indexed)."""
+        with self._lock:
+            self._remove_locked(book_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_tokens.clear()
+            self._vocabulary = []
+            self._vocabulary_dirty = False
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[int]]:
+        """Return (total matches, ranked book IDs for the requested page)."""
+        terms = tokenize(query)
+        if not terms:
+            return 0, []
+        with self._lock:
+            scores: Optional[Dict[int, float]] = None
+            # Start with the most selective term so the running intersection stays small
+            for term_scores in sorted((self._match_term(term) for term in set(terms)), key=len):
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {book_id: score + term_scores[book_id]
+                              for book_id, score in scores.items() if book_id in term_scores}
+                if not scores:
+                    return 0, []
+        assert scores is not None
+        top = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return len(scores), [book_id for book_id, _ in top[offset:]]
+
+    def _match_term(self, term: str) -> Dict[int, float]:
+        """Scores of every book containing a token that starts with ``term``."""
+        matches: Dict[int, float] = {}
+        for token in self._tokens_with_prefix(term):
+            bonus = EXACT_MATCH_BONUS if token == term else 1.0
+            for book_id, weight in self._postings[token].items():
+                score = weight * bonus
+                if score > matches.get(book_id, 0.0):
+                    matches[book_id] = score
+        return matches
+
+    def _tokens_with_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        tokens = []
+        for i in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            token = self._vocabulary[i]
+            if not token.startswith(prefix):
+                break
+            tokens.append(token)
+        return tokens
+
+    def _remove_locked(self, book_id: int) -> None:
+        for token in self._doc_tokens.pop(book_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(book_id, None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_dirty = True
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Library Service
+Serves the library operations (add, issue, return, search, listings and
+analytics) as a local HTTP/JSON API so many terminals can share one process,
+one connection pool and one warm search index and entity cache.
+
+Requests are parsed on an asyncio event loop; the blocking database work runs
+on a bounded thread pool. When too many operations are already running or
+queued the service answers 503 straight away instead of letting the queue
+grow, and an operation that takes longer than the request timeout is answered
+with 504.
+
+    python service.py --port 8080
+    python app.py --remote http://127.0.0.1:8080
+
+Routes:
+    GET  /health                         pool/cache stats and load
+    POST /books                          {"title", "author", "genre", "year", "price", "copies"}
+    GET  /books/<id>/availability        available and total copies
+    POST /members                        {"first_name", "last_name", "email", "phone"}
+    POST /loans                          {"book_id", "member_id"}
+    POST /loans/<id>/return
+    POST /loans/<id>/pay                 mark the loan's fine as paid
+    POST /holds                          {"book_id", "member_id"}
+    POST /holds/<id>/cancel
+    GET  /search?q=...&limit=&offset=
+    GET  /listings/<books|members|transactions>?after=<json key>&page_size=
+    GET  /reports/<top_books|top_borrowers|top_genres|busiest_days>?limit=
+    POST /reports/rebuild
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from functools import partial
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config import APP_CONFIG, SERVICE_CONFIG
+from app import CirculationError, LibraryError, LibraryManagementSystem, validation_error
+
+REPORTS = ("top_books", "top_borrowers", "top_genres", "busiest_days")
+
+BOOK_FIELDS = (("title", "title", True), ("author", "author", True), ("genre", "genre", False),
+               ("year", "year", True), ("price", "price", True))
+MEMBER_FIELDS = (("first_name", "first name", True), ("last_name", "last name", True),
+                 ("email", "email", True), ("phone", "phone", True))
+
+
+class HTTPError(Exception):
+    """An error answered with a specific status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, default=_json_default).encode("utf-8")
+
+
+def _validated(body: Dict[str, Any], fields: Tuple[Tuple[str, str, bool], ...]) -> Dict[str, str]:
+    """Check a JSON body with the same rules as the CLI prompts; raise HTTPError(400) on the first problem."""
+    values = {}
+    for key, field_type, required in fields:
+        value = body.get(key)
+        value = "" if value is None else str(value).strip()
+        error = validation_error(value, field_type, required)
+        if error:
+            raise HTTPError(400, f"{key}: {error}")
+        values[key] = value
+    return values
+
+
+def _int_param(value: Any, name: str, default: Optional[int] = None) -> int:
+    if value in (None, "") and default is not None:
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be a whole number.") from None
+    if number < 0:
+        raise HTTPError(400, f"{name} cannot be negative.")
+    return number
+
+
+class LibraryService:
+    """Asyncio HTTP/JSON front end for a LibraryManagementSystem.
+
+    ``workers`` threads run the database operations; at most ``max_pending``
+    operations may be running or queued at once. An operation that times out
+    keeps its slot until its thread really finishes, so a slow database cannot
+    be buried under more work than it was given.
+    """
+
+    def __init__(self, lms: LibraryManagementSystem, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, request_timeout: Optional[float] = None):
+        self.lms = lms
+        self.workers = workers or SERVICE_CONFIG["workers"]
+        self.max_pending = max(max_pending or SERVICE_CONFIG["max_pending"], self.workers)
+        self.request_timeout = request_timeout or SERVICE_CONFIG["request_timeout"]
+        self.idle_timeout = SERVICE_CONFIG["idle_timeout"]
+        self.max_body_bytes = SERVICE_CONFIG["max_body_bytes"]
+        self.logger = logging.getLogger(__name__)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="lms-worker")
+        self.pending = 0
+        self.stats = {"requests": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+        self._routes: Tuple[Tuple[str, "re.Pattern[str]", Callable[..., Any]], ...] = (
+            ("GET", re.compile(r"/health"), self._health),
+            ("POST", re.compile(r"/books"), self._add_book),
+            ("GET", re.compile(r"/books/(\d+)/availability"), self._availability),
+            ("POST", re.compile(r"/members"), self._add_member),
+            ("POST", re.compile(r"/loans"), self._issue),
+            ("POST", re.compile(r"/loans/(\d+)/return"), self._return),
+            ("POST", re.compile(r"/loans/(\d+)/pay"), self._pay_fine),
+            ("POST", re.compile(r"/holds"), self._place_hold),
+            ("POST", re.compile(r"/holds/(\d+)/cancel"), self._cancel_hold),
+            ("GET", re.compile(r"/search"), self._search),
+            ("GET", re.compile(r"/listings/(\w+)"), self._listing),
+            ("POST", re.compile(r"/reports/rebuild"), self._rebuild),
+            ("GET", re.compile(r"/reports/(\w+)"), self._report),
+        )
+
+    # Running blocking operations --------------------------------------------------
+
+    async def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking library operation on the worker pool with backpressure and a timeout."""
+        if self.pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise HTTPError(503, "Service is busy, please retry shortly.")
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = self.executor.submit(func, *args)
+        # The slot is released on the loop that took it, whether or not serve() is running
+        future.add_done_callback(partial(self._operation_finished, loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.request_timeout)
+        except asyncio.TimeoutError:
+            # A queued operation is cancelled; one that already started still completes in the background
+            self.stats["timeouts"] += 1
+            raise HTTPError(504, f"Operation did not finish within {self.request_timeout:g}s.") from None
+
+    def _operation_finished(self, loop: asyncio.AbstractEventLoop, _future: Any) -> None:
+        # Called on the worker thread; the counter is only touched on the event loop
+        try:
+            loop.call_soon_threadsafe(self._release_slot)
+        except RuntimeError:  # loop already closed during shutdown
+            pass
+
+    def _release_slot(self) -> None:
+        self.pending -= 1
+
+    # Handlers -----------------------------------------------------------------
+
+    async def _health(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        return 200, {"status": "ok", "pending": self.pending, "max_pending": self.max_pending,
+                     "workers": self.workers, "requests": dict(self.stats),
+                     "pool": self.lms.pool_stats(), "cache": self.lms.cache_stats()}
+
+    async def _add_book(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        book = _validated(body, BOOK_FIELDS)
+        copies = _int_param(body.get("copies"), "copies", 1)
+        book_id = await self.call(self.lms.create_book, book["title"], book["author"], book["genre"] or None,
+                                  int(book["year"]), float(book["price"]), copies)
+        return 201, {"book_id": book_id}
+
+    async def _availability(self, query: Dict[str, str], body: Dict[str, Any], book_id: str) -> Tuple[int, Any]:
+        counts = await self.call(self.lms.inventory.availability, int(book_id))
+        if counts is None:
+            raise HTTPError(404, "Book ID not found.")
+        return 200, {"book_id": int(book_id), "available": counts[0], "total": counts[1]}
+
+    async def _add_member(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        member = _validated(body, MEMBER_FIELDS)
+        member_id = await self.call(self.lms.create_member, member["first_name"], member["last_name"],
+                                    member["email"], member["phone"])
+        return 201, {"member_id": member_id}
+
+    async def _issue(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        book_id = _int_param(body.get("book_id"), "book_id")
+        member_id = _int_param(body.get("member_id"), "member_id")
+        return 201, await self.call(self.lms.issue, book_id, member_id)
+
+    async def _return(self, query: Dict[str, str], body: Dict[str, Any], transaction_id: str) -> Tuple[int, Any]:
+        return 200, await self.call(self.lms.return_transaction, int(transaction_id))
+
+    async def _pay_fine(self, query: Dict[str, str], body: Dict[str, Any], transaction_id: str) -> Tuple[int, Any]:
+        return 200, await self.call(self.lms.pay_fine, int(transaction_id))
+
+    async def _place_hold(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        book_id = _int_param(body.get("book_id"), "book_id")
+        member_id = _int_param(body.get("member_id"), "member_id")
+        return 201, await self.call(self.lms.holds.place, book_id, member_id)
+
+    async def _cancel_hold(self, query: Dict[str, str], body: Dict[str, Any], hold_id: str) -> Tuple[int, Any]:
+        passed_to = await self.call(self.lms.holds.cancel, int(hold_id))
+        return 200, {"hold_id": int(hold_id), "passed_to": list(passed_to) if passed_to else None}
+
+    async def _search(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        keyword = query.get("q", "").strip()
+        if not keyword:
+            raise HTTPError(400, "Search keyword cannot be empty.")
+        limit = _int_param(query.get("limit"), "limit", APP_CONFIG["search_page_size"])
+        offset = _int_param(query.get("offset"), "offset", 0)
+        total, rows = await self.call(partial(self.lms.search, keyword, limit=limit, offset=offset))
+        return 200, {"total": total, "rows": rows}
+
+    async def _listing(self, query: Dict[str, str], body: Dict[str, Any], listing: str) -> Tuple[int, Any]:
+        if listing not in self.lms.LISTINGS:
+            raise HTTPError(404, f"Unknown listing '{listing}'.")
+        page_size = min(_int_param(query.get("page_size"), "page_size", APP_CONFIG["list_page_size"]),
+                        APP_CONFIG["search_max_results"])
+        try:
+            after = json.loads(query["after"]) if query.get("after") else None
+        except ValueError:
+            raise HTTPError(400, "after must be a JSON array of sort key values.") from None
+        if after is not None and (not isinstance(after, list)
+                                  or len(after) != len(self.lms.LISTINGS[listing][2])):
+            raise HTTPError(400, "after must be a JSON array of sort key values.")
+        return 200, {"rows": await self.call(self.lms.fetch_page, listing, after, page_size)}
+
+    async def _report(self, query: Dict[str, str], body: Dict[str, Any], report: str) -> Tuple[int, Any]:
+        if report not in REPORTS:
+            raise HTTPError(404, f"Unknown report '{report}'.")
+        limit = min(_int_param(query.get("limit"), "limit", 5), APP_CONFIG["search_max_results"])
+        return 200, {"rows": await self.call(getattr(self.lms.analytics, report), limit)}
+
+    async def _rebuild(self, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        await self.call(self.lms.analytics.rebuild)
+        return 200, {"status": "rebuilt"}
+
+    # HTTP plumbing ------------------------------------------------------------
+
+    async def dispatch(self, method: str, target: str, raw_body: bytes) -> Tuple[int, Any]:
+        """Route one request and turn library errors into HTTP statuses."""
+        self.stats["requests"] += 1
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            if not isinstance(body, dict):
+                raise ValueError
+        except ValueError:
+            return 400, {"error": "Request body must be a JSON object."}
+        path = url.path.rstrip("/") or "/"
+        allowed = []
+        for route_method, pattern, handler in self._routes:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            try:
+                return await handler(query, body, *match.groups())
+            except HTTPError as e:
+                return e.status, {"error": str(e)}
+            except CirculationError as e:
+                return 409, {"error": str(e), "type": "CirculationError"}
+            except LibraryError as e:
+                return 422, {"error": str(e), "type": "LibraryError"}
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error("%s %s failed: %s", method, path, e)
+                return 500, {"error": "Internal error, see the service log."}
+        if allowed:
+            return 405, {"error": f"Use {' or '.join(allowed)} for {path}."}
+        return 404, {"error": f"No route for {path}."}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection until it closes or idles out."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line."}, keep_alive=False)
+                    break
+                headers = await asyncio.wait_for(self._read_headers(reader), self.idle_timeout)
+                length = int(headers.get("content-length", "0") or 0)
+                if length > self.max_body_bytes:
+                    await self._respond(writer, 413, {"error": "Request body too large."}, keep_alive=False)
+                    break
+                raw_body = await reader.readexactly(length) if length else b""
+                status, payload = await self.dispatch(method.upper(), target, raw_body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+        body = _encode(payload)
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host: Optional[str] = None, port: Optional[int] = None,
+                    ready: Optional[Callable[[Tuple[str, int]], None]] = None) -> None:
+        """Listen on ``host``:``port`` until cancelled; ``ready`` receives the bound address."""
+        server = await asyncio.start_server(self.handle_connection,
+                                            host or SERVICE_CONFIG["host"],
+                                            SERVICE_CONFIG["port"] if port is None else port)
+        address = server.sockets[0].getsockname()[:2]
+        self.logger.info("Library service listening on http://%s:%s (%d workers, %d max pending)",
+                         address[0], address[1], self.workers, self.max_pending)
+        if ready:
+            ready(address)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.logger.info("Library service stopped: %s", self.stats)
+
+
+def main() -> None:
+    """Command-line entry point for the library service."""
+    parser = argparse.ArgumentParser(description="Serve the library operations over HTTP/JSON.")
+    parser.add_argument("--host", help=f"interface to bind (default {SERVICE_CONFIG['host']})")
+    parser.add_argument("--port", type=int, help=f"port to listen on (default {SERVICE_CONFIG['port']})")
+    parser.add_argument("--workers", type=int, help="threads running database operations")
+    parser.add_argument("--max-pending", type=int, help="running + queued operations before answering 503")
+    parser.add_argument("--timeout", type=float, help="seconds before a request is answered with 504")
+    args = parser.parse_args()
+
+    lms = LibraryManagementSystem()
+    service = LibraryService(lms, workers=args.workers, max_pending=args.max_pending,
+                             request_timeout=args.timeout)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Library service stopped.")
+    finally:
+        lms.pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+-- SQLite equivalent of "Library Mgmt System.sql" (used by the embedded backend)
+
+CREATE TABLE IF NOT EXISTS books (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(100) NOT NULL,
+    Author VARCHAR(150) NOT NULL,
+    Genre VARCHAR(50),
+    Price DECIMAL(10,2),
+    PublishedYear INTEGER DEFAULT 2025,
+    CHECK (Price > 0)
+);
+
+CREATE TABLE IF NOT EXISTS members (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    FirstName VARCHAR(50) NOT NULL,
+    LastName VARCHAR(50) NOT NULL,
+    Email VARCHAR(100) UNIQUE,
+    Phone VARCHAR(10)
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    BookID INTEGER,
+    MemberID INTEGER,
+    IssueDate DATE,
+    ReturnDate DATE,
+    FineAmount DECIMAL(10,2) DEFAULT 0,
+    FOREIGN KEY(BookID) REFERENCES books(ID),
+    FOREIGN KEY(MemberID) REFERENCES members(ID)
+);
@@ -0,0 +1,26 @@
+# conftest.py
+# Makes the top-level modules importable and keeps test runs out of the real log file
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import LOG_CONFIG  # noqa: E402
+
+LOG_CONFIG.update(file=os.path.join(tempfile.mkdtemp(prefix="lms-tests-"), "library_system.log"), console=False)
+
+
+@pytest.fixture
+def lms(tmp_path):
+    """A library on a fresh SQLite database file, with the schema migrated."""
+    from app import LibraryManagementSystem
+    from backends import SQLiteBackend
+
+    system = LibraryManagementSystem(backend=SQLiteBackend({"path": str(tmp_path / "library.db"),
+                                                            "auto_migrate": True}))
+    yield system
+    system.pool.close_all()
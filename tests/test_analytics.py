@@ -0,0 +1,36 @@
+# test_analytics.py
+# Circulation summaries maintained by issue and return match a rebuild from the loans (SQLite backend)
+
+import pytest
+
+from errors import CirculationError
+
+
+def reports(lms):
+    analytics = lms.analytics
+    return (analytics.top_books(10), analytics.top_borrowers(10), analytics.top_genres(10),
+            analytics.busiest_days(10))
+
+
+def test_summaries_match_a_rebuild_after_issue_and_return(lms):
+    members = [lms.create_member("Patron", f"Test{i}", f"patron{i}@example.com", "5550101000") for i in range(3)]
+    books = [lms.create_book("Dune", "Frank Herbert", "Fiction", 1965, 9.99, copies=3),
+             lms.create_book("Cosmos", "Carl Sagan", "Science", 1980, 12.00),
+             lms.create_book("Untitled", "Anonymous", None, 2000, 5.00)]
+    loans = [lms.issue(books[0], member_id)["transaction_id"] for member_id in members]
+    loans.append(lms.issue(books[1], members[0])["transaction_id"])
+    loans.append(lms.issue(books[2], members[1])["transaction_id"])
+    for loan in loans[:3]:
+        lms.return_transaction(loan)
+    lms.issue(books[0], members[2])
+    # A refused issue rolls back with its summary updates
+    with pytest.raises(CirculationError):
+        lms.issue(books[1], members[1])
+
+    maintained = reports(lms)
+    assert maintained[0][0] == ("Dune", "Frank Herbert", 4)
+    assert maintained[2] == [("Fiction", 4), ("", 1), ("Science", 1)]
+    assert [(issues, returns) for _, issues, returns, _ in maintained[3]] == [(6, 3)]
+
+    lms.analytics.rebuild()
+    assert reports(lms) == maintained
@@ -0,0 +1,32 @@
+# test_archive.py
+# Batched archival resumes after each batch and leaves open or unpaid loans live (SQLite backend)
+
+from datetime import date, timedelta
+
+
+def test_batches_resume_past_loans_that_stay_live(lms):
+    member_ids = [lms.create_member("Arch", f"Ive{i}", f"archive{i}@example.com", "555-0102") for i in range(4)]
+    book_ids = [lms.create_book(f"Old Title {i}", "Author", "History", 1990, 4.0, copies=20) for i in range(6)]
+    issued = date.today() - timedelta(days=800)
+    settled, kept = [], []
+    with lms.transaction() as cursor:
+        # Several loans share each issue date, so batch boundaries fall inside runs of equal dates
+        for i in range(40):
+            day = issued + timedelta(days=i // 4)
+            is_open = i % 5 == 0
+            unpaid = i % 7 == 0 and not is_open
+            cursor.execute(
+                "INSERT INTO transactions (BookID, MemberID, IssueDate, ReturnDate, FineAmount, FinePaid) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (book_ids[i % 6], member_ids[i % 4], day, None if is_open else day + timedelta(days=10),
+                 5.0 if unpaid else 0, 0 if unpaid else 1))
+            (kept if is_open or unpaid else settled).append(cursor.lastrowid)
+
+    report = lms.archive.run(older_than_days=365, batch_size=3)
+
+    assert report.archived == len(settled)
+    assert report.batches == len(settled) // 3 + 1
+    live = {row[0] for row in lms.execute_query("SELECT ID FROM transactions", fetch=True)}
+    archived = {row[0] for row in lms.execute_query("SELECT ID FROM transactions_archive", fetch=True)}
+    assert archived == set(settled)
+    assert live == set(kept)
@@ -0,0 +1,53 @@
+# test_bulk_import.py
+# Bulk loads: bad rows go to the error file with their line numbers, good rows still land (SQLite backend)
+
+import csv
+import json
+
+from bulk_import import BulkLoader
+
+
+def rejected(path):
+    with open(path, newline="", encoding="utf-8") as handle:
+        return [(int(line), error, json.loads(record)) for line, error, record in list(csv.reader(handle))[1:]]
+
+
+def test_bad_rows_are_written_to_the_error_file(lms, tmp_path):
+    source = tmp_path / "members.csv"
+    source.write_text("first_name,last_name,email,phone\n"
+                      "Ada,Lovelace,ada@example.com,5550101001\n"
+                      "Charles,Babbage,not-an-email,5550101002\n"
+                      "Ada,Again,ada@example.com,5550101003\n"
+                      "Grace,Hopper,grace@example.com,5550101004\n", encoding="utf-8")
+    errors = tmp_path / "rejected.csv"
+
+    # One batch: the duplicate email fails it, and the row-by-row retry isolates that row
+    report = BulkLoader(lms, batch_size=10, error_path=str(errors)).load("members", str(source))
+
+    assert (report.rows_read, report.rows_inserted, report.rows_rejected) == (4, 2, 2)
+    bad = rejected(errors)
+    assert [(line, record["last_name"]) for line, _, record in bad] == [(3, "Babbage"), (4, "Again")]
+    assert bad[0][1].startswith("Email:")
+    names = lms.execute_query("SELECT LastName FROM members ORDER BY ID", fetch=True)
+    assert [row[0] for row in names] == ["Lovelace", "Hopper"]
+    assert lms.member_status.verify() == []
+
+
+def test_imported_books_are_shelved_and_searchable(lms, tmp_path):
+    lms.create_book("Existing", "Someone", "Fiction", 2000, 5.0)
+    assert lms.search("gibson") == (0, [])
+    source = tmp_path / "books.jsonl"
+    source.write_text(json.dumps({"title": "Neuromancer", "author": "William Gibson", "genre": "Fiction",
+                                  "year": 1984, "price": 7.5}) + "\n"
+                      "{not json\n"
+                      + json.dumps({"title": "Count Zero", "author": "William Gibson", "year": 1986,
+                                    "price": 7.5}) + "\n", encoding="utf-8")
+    errors = tmp_path / "rejected.csv"
+
+    report = BulkLoader(lms, batch_size=1, error_path=str(errors)).load("books", str(source))
+
+    assert (report.rows_inserted, report.rows_rejected, report.batches) == (2, 1, 3)
+    assert [(line, error.split(":")[0]) for line, error, _ in rejected(errors)] == [(2, "Invalid JSON")]
+    total, rows = lms.search("gibson")
+    assert total == 2
+    assert all(lms.inventory.availability(row[0]) == (1, 1) for row in rows)
@@ -0,0 +1,61 @@
+# test_cache.py
+# Entity cache: LRU/TTL behaviour and invalidation by book and member writes (SQLite backend)
+
+import time
+
+from cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entry_is_reloaded():
+    cache = LRUCache(ttl_seconds=0.01)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return "value"
+
+    assert cache.get_or_load("key", load) == "value"
+    assert cache.get_or_load("key", load) == "value"
+    time.sleep(0.02)
+    assert cache.get_or_load("key", load) == "value"
+    assert len(loads) == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_missing_rows_are_not_cached():
+    cache = LRUCache()
+    assert cache.get_or_load("key", lambda: None) is None
+    assert cache.get_or_load("key", lambda: "created since") == "created since"
+
+
+def test_book_writes_invalidate_the_cached_title(lms):
+    book_id = lms.create_book("Dune", "Frank Herbert", "Fiction", 1965, 9.99)
+    assert lms.book_title(book_id) == "Dune"
+    assert lms.book_title(book_id) == "Dune"
+    assert lms.cache_stats()["hits"] >= 1
+
+    lms.update_book(book_id, {"title": "Dune Messiah"})
+    assert lms.book_title(book_id) == "Dune Messiah"
+    lms.delete_book(book_id)
+    assert lms.book_title(book_id) is None
+
+
+def test_member_writes_invalidate_the_cached_name(lms):
+    member_id = lms.create_member("Ada", "Reader", "ada@example.com", "5550101001")
+    assert lms.member_name(member_id) == "Ada Reader"
+
+    lms.update_member(member_id, {"last_name": "Lovelace"})
+    assert lms.member_name(member_id) == "Ada Lovelace"
+    lms.delete_member(member_id)
+    assert lms.member_name(member_id) is None
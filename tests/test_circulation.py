@@ -0,0 +1,100 @@
+# test_circulation.py
+# Issue and return as single transactions under concurrent clerks. SQLite only: BEGIN IMMEDIATE runs
+# one writer at a time, so these check the outcomes, not MySQL row locking (see test_lock_order.py)
+
+import threading
+from typing import Any, Callable, List
+
+import pytest
+
+from errors import CirculationError
+
+
+def run_concurrently(count: int, action: Callable[[int], Any]) -> List[Any]:
+    """Run ``action(i)`` on ``count`` threads released together; returns results or raised errors."""
+    barrier = threading.Barrier(count)
+    results: List[Any] = [None] * count
+
+    def worker(i: int) -> None:
+        barrier.wait()
+        try:
+            results[i] = action(i)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def make_members(lms, count: int) -> List[int]:
+    return [lms.create_member("Clerk", f"Test{i}", f"member{i}@example.com", "555-0100") for i in range(count)]
+
+
+def loan_count(lms, book_id: int) -> int:
+    return lms.execute_query("SELECT COUNT(*) FROM transactions WHERE BookID = %s", (book_id,), fetch=True)[0][0]
+
+
+def test_last_copy_is_issued_once(lms):
+    book_id = lms.create_book("The Dispossessed", "Ursula K. Le Guin", "Fiction", 1974, 9.99, copies=1)
+    members = make_members(lms, 20)
+
+    results = run_concurrently(len(members), lambda i: lms.issue(book_id, members[i]))
+
+    issued = [r for r in results if isinstance(r, dict)]
+    refused = [r for r in results if isinstance(r, CirculationError)]
+    assert len(issued) == 1
+    assert len(refused) == len(members) - 1, [r for r in results if isinstance(r, Exception)]
+    assert loan_count(lms, book_id) == 1
+    assert lms.inventory.availability(book_id)[0] == 0
+
+
+def test_each_copy_goes_to_one_member(lms):
+    book_id = lms.create_book("Kindred", "Octavia E. Butler", "Fiction", 1979, 12.50, copies=3)
+    members = make_members(lms, 20)
+
+    results = run_concurrently(len(members), lambda i: lms.issue(book_id, members[i]))
+
+    issued = [r for r in results if isinstance(r, dict)]
+    assert len(issued) == 3
+    assert len({r["copy_id"] for r in issued}) == 3
+    assert all(isinstance(r, CirculationError) for r in results if not isinstance(r, dict))
+    assert loan_count(lms, book_id) == 3
+    available, total = lms.inventory.availability(book_id)
+    assert (available, total) == (0, 3)
+
+
+def test_concurrent_returns_of_one_loan(lms):
+    book_id = lms.create_book("Solaris", "Stanislaw Lem", "Fiction", 1961, 8.00, copies=1)
+    member_id = make_members(lms, 1)[0]
+    loan = lms.issue(book_id, member_id)
+
+    results = run_concurrently(10, lambda i: lms.return_transaction(loan["transaction_id"]))
+
+    assert sum(isinstance(r, dict) for r in results) == 1
+    assert all(isinstance(r, CirculationError) for r in results if not isinstance(r, dict))
+    assert lms.inventory.availability(book_id) == (1, 1)
+
+
+def test_member_cannot_borrow_a_second_copy(lms):
+    book_id = lms.create_book("Beloved", "Toni Morrison", "Fiction", 1987, 11.00, copies=3)
+    member_id = make_members(lms, 1)[0]
+    lms.issue(book_id, member_id)
+
+    with pytest.raises(CirculationError, match="already has a copy"):
+        lms.issue(book_id, member_id)
+    assert lms.inventory.availability(book_id) == (2, 3)
+
+
+def test_concurrent_issues_to_one_member_give_one_copy(lms):
+    book_id = lms.create_book("Ubik", "Philip K. Dick", "Fiction", 1969, 7.00, copies=5)
+    member_id = make_members(lms, 1)[0]
+
+    results = run_concurrently(10, lambda i: lms.issue(book_id, member_id))
+
+    assert sum(isinstance(r, dict) for r in results) == 1
+    assert loan_count(lms, book_id) == 1
+    assert lms.inventory.availability(book_id) == (4, 5)
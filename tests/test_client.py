@@ -0,0 +1,50 @@
+# test_client.py
+# LibraryClient against a server that drops the connection without answering
+
+import socket
+import socketserver
+import threading
+
+import pytest
+
+from client import LibraryClient, ServiceError
+
+
+class DroppingHandler(socketserver.StreamRequestHandler):
+    """Reads one request (as if it were processed) and closes the connection without a response."""
+
+    def handle(self) -> None:
+        request_line = self.rfile.readline().decode()
+        length = 0
+        for line in iter(self.rfile.readline, b"\r\n"):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        self.rfile.read(length)
+        self.server.received.append(request_line.split()[0])
+        self.connection.shutdown(socket.SHUT_RDWR)
+
+
+@pytest.fixture
+def dropping_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), DroppingHandler)
+    server.daemon_threads = True
+    server.received = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_post_is_not_sent_twice(dropping_server):
+    client = LibraryClient(f"127.0.0.1:{dropping_server.server_address[1]}", timeout=5)
+    with pytest.raises(ServiceError, match="may or may not have completed"):
+        client.issue(1, 2)
+    assert dropping_server.received == ["POST"]
+
+
+def test_get_is_retried_once(dropping_server):
+    client = LibraryClient(f"127.0.0.1:{dropping_server.server_address[1]}", timeout=5)
+    with pytest.raises(ServiceError):
+        client.health()
+    assert dropping_server.received == ["GET", "GET"]
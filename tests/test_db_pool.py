@@ -0,0 +1,127 @@
+# test_db_pool.py
+# ConnectionPool against a fake driver: exhaustion, health checks, release on error
+
+import threading
+import time
+
+import pytest
+
+from db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Stands in for a driver connection; ``alive`` controls what ping() does."""
+
+    def __init__(self, number: int):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.ping_delay = 0.0
+
+    def ping(self, reconnect: bool = False) -> None:
+        time.sleep(self.ping_delay)
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeDriver:
+    def __init__(self):
+        self.opened = []
+
+    def connect(self) -> FakeConnection:
+        connection = FakeConnection(len(self.opened) + 1)
+        self.opened.append(connection)
+        return connection
+
+
+def test_reuses_idle_connection():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver.connect, size=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(driver.opened) == 1
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 1
+
+
+def test_exhausted_pool_times_out():
+    pool = ConnectionPool(FakeDriver().connect, size=1, timeout=0.1)
+    pool.acquire()
+    started = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.1
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_connection_released_by_another_thread():
+    pool = ConnectionPool(FakeDriver().connect, size=1, timeout=2.0)
+    held = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+    assert pool.acquire() is held
+
+
+def test_stale_connection_is_replaced():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver.connect, size=1, ping_interval=0)
+    stale = pool.acquire()
+    pool.release(stale)
+    stale.alive = False
+
+    fresh = pool.acquire()
+    assert fresh is not stale
+    assert stale.closed
+    stats = pool.stats()
+    assert stats["health_check_failures"] == 1
+    assert stats["in_use"] == 1 and stats["idle"] == 0
+
+
+def test_expired_connection_is_recycled():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver.connect, size=1, recycle=0)
+    old = pool.acquire()
+    pool.release(old)
+    assert old.closed
+    assert pool.acquire() is not old
+
+
+def test_connection_returned_when_block_raises():
+    pool = ConnectionPool(FakeDriver().connect, size=1, timeout=0.1)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as connection:
+            raise RuntimeError("query failed")
+    assert not connection.closed
+    assert pool.stats()["in_use"] == 0
+    with pool.connection() as again:
+        assert again is connection
+
+
+def test_dead_connection_discarded_when_block_raises():
+    pool = ConnectionPool(FakeDriver().connect, size=1)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as connection:
+            connection.alive = False
+            raise RuntimeError("lost connection")
+    assert connection.closed
+    stats = pool.stats()
+    assert stats["in_use"] == 0 and stats["idle"] == 0
+
+
+def test_slow_ping_does_not_block_other_checkouts():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver.connect, size=2, ping_interval=0)
+    slow = pool.acquire()
+    pool.release(slow)
+    slow.ping_delay = 0.5
+
+    pinging = threading.Thread(target=pool.acquire)
+    pinging.start()
+    time.sleep(0.05)  # the other thread is now inside the ping
+    started = time.monotonic()
+    other = pool.acquire()
+    assert time.monotonic() - started < 0.25
+    assert other is not slow
+    pinging.join()
@@ -0,0 +1,71 @@
+# test_export.py
+# Streaming exports: filters, formats, and the error that stops a stream (SQLite backend)
+
+import gzip
+import json
+
+import pytest
+
+from export import ReportExporter
+
+
+@pytest.fixture
+def catalog(lms):
+    return [lms.create_book(f"Export {i}", "Author", "Essays", 2001, 3.5) for i in range(25)]
+
+
+def test_csv_and_jsonl_exports(lms, catalog, tmp_path):
+    exporter = ReportExporter(lms, batch_size=7)
+    report = exporter.export("books", str(tmp_path / "books.csv.gz"))
+    with gzip.open(tmp_path / "books.csv.gz", "rt", encoding="utf-8") as handle:
+        lines = handle.read().splitlines()
+    assert report.rows == 25 and len(lines) == 26
+    assert lines[0].startswith("BookID,Title")
+
+    exporter.export("books", str(tmp_path / "one.jsonl"), book_id=catalog[3])
+    rows = [json.loads(line) for line in (tmp_path / "one.jsonl").read_text().splitlines()]
+    assert [row["Title"] for row in rows] == ["Export 3"]
+
+
+def test_writer_error_is_not_masked_and_connection_returns(lms, catalog, tmp_path, monkeypatch):
+    def broken_write(self, rows):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("export._CsvWriter.write", broken_write)
+    with pytest.raises(OSError, match="disk full"):
+        ReportExporter(lms, batch_size=5).export("books", str(tmp_path / "books.csv"))
+    assert lms.pool_stats()["in_use"] == 0
+
+
+def test_abandoned_stream_drains_unread_rows(lms, catalog):
+    class RecordingConnection:
+        """Wraps a pooled connection and records consume_results() calls."""
+
+        def __init__(self, inner):
+            self._inner = inner
+            self.consumed = 0
+
+        def consume_results(self):
+            self.consumed += 1
+
+        def __getattr__(self, name):
+            return getattr(self._inner, name)
+
+    wrapped = {}
+    acquire = lms.pool.acquire
+
+    def recording_acquire():
+        connection = RecordingConnection(acquire())
+        wrapped["connection"] = connection
+        return connection
+
+    release = lms.pool.release
+    lms.pool.acquire = recording_acquire
+    lms.pool.release = lambda connection, discard=False: release(connection._inner, discard)
+    rows = lms.stream_query("SELECT ID FROM books", batch_size=5)
+    next(rows)
+    rows.close()
+    assert wrapped["connection"].consumed == 1
+
+    assert len(list(lms.stream_query("SELECT ID FROM books", batch_size=5))) == 25
+    assert wrapped["connection"].consumed == 0
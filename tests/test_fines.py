@@ -0,0 +1,59 @@
+# test_fines.py
+# The nightly fine job only accrues open loans and leaves member_status in step (SQLite backend)
+
+from datetime import date, timedelta
+
+import pytest
+
+from config import APP_CONFIG
+from fines import FineEngine, np
+
+
+def backdated_loan(lms, book_id, member_id, days_out):
+    """Issue a loan and move its issue date ``days_out`` days into the past."""
+    loan = lms.issue(book_id, member_id)
+    lms.execute_query("UPDATE transactions SET IssueDate = %s WHERE ID = %s",
+                      (date.today() - timedelta(days=days_out), loan["transaction_id"]))
+    return loan["transaction_id"]
+
+
+def fine_of(lms, transaction_id):
+    return float(lms.execute_query("SELECT FineAmount FROM transactions WHERE ID = %s",
+                                   (transaction_id,), fetch=True)[0][0] or 0)
+
+
+@pytest.fixture
+def loans(lms, monkeypatch):
+    """Member 1 with a paid fine, an unpaid fine and an open overdue loan; rates restored afterwards."""
+    monkeypatch.setitem(APP_CONFIG, "max_unpaid_fines", 1000.0)
+    member_id = lms.create_member("Ada", "Reader", "ada@example.com", "555-0101")
+    books = [lms.create_book(f"Title {i}", "Author", "Fiction", 2000, 5.0) for i in range(3)]
+    paid = backdated_loan(lms, books[0], member_id, 30)      # (30 - 14) * 5 = 80
+    lms.return_transaction(paid)
+    lms.pay_fine(paid)
+    unpaid = backdated_loan(lms, books[1], member_id, 23)    # (23 - 14) * 5 = 45
+    lms.return_transaction(unpaid)
+    still_out = backdated_loan(lms, books[2], member_id, 20)
+    return {"paid": paid, "unpaid": unpaid, "open": still_out}
+
+
+@pytest.mark.parametrize("method", ["sql", pytest.param("numpy", marks=pytest.mark.skipif(
+    np is None, reason="NumPy not installed"))])
+def test_rate_change_only_reprices_open_loans(lms, loans, monkeypatch, method):
+    monkeypatch.setitem(APP_CONFIG, "fine_rate_per_day", 10.0)
+    monkeypatch.setitem(APP_CONFIG, "grace_period_days", 7)
+
+    report = FineEngine(lms).run(method)
+
+    assert report.rows_updated == 1
+    assert fine_of(lms, loans["paid"]) == 80.0
+    assert fine_of(lms, loans["unpaid"]) == 45.0
+    assert fine_of(lms, loans["open"]) == (20 - 7) * 10.0
+    assert lms.member_status.verify() == []
+
+
+def test_return_after_accrual_keeps_status_in_step(lms, loans):
+    FineEngine(lms).run("sql")
+    result = lms.return_transaction(loans["open"])
+    assert result["fine"] == (20 - 14) * 5.0
+    assert lms.member_status.verify() == []
@@ -0,0 +1,97 @@
+# test_holds.py
+# Hold queue order, pickup expiry, and the paths that hand copies to waiting holds (SQLite backend)
+
+from datetime import date, timedelta
+
+import pytest
+
+import holds
+
+
+def make_members(lms, count):
+    return [lms.create_member("Patron", f"Test{i}", f"patron{i}@example.com", "555-0100") for i in range(count)]
+
+
+def hold_statuses(lms, book_id):
+    """{member ID: status} of every hold on a title."""
+    return dict(lms.execute_query("SELECT MemberID, Status FROM holds WHERE BookID = %s", (book_id,), fetch=True))
+
+
+@pytest.fixture
+def queued(lms):
+    """A one-copy title on loan to the first member, with the next two members queued for it."""
+    members = make_members(lms, 4)
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0)
+    loan = lms.issue(book_id, members[0])["transaction_id"]
+    placed = [lms.holds.place(book_id, member_id) for member_id in members[1:3]]
+    assert [hold["position"] for hold in placed] == [1, 2]
+    return {"book_id": book_id, "members": members, "loan": loan, "holds": [hold["hold_id"] for hold in placed]}
+
+
+def test_returned_copies_go_to_holds_in_queue_order(lms, queued):
+    book_id, members = queued["book_id"], queued["members"]
+
+    returned = lms.return_transaction(queued["loan"])
+    assert (returned["hold_id"], returned["held_for"]) == (queued["holds"][0], members[1])
+    assert lms.inventory.availability(book_id) == (0, 1)
+    assert lms.holds.queue_length(book_id) == 1
+
+    loan = lms.issue(book_id, members[1])
+    assert loan["copy_id"] is not None
+    returned = lms.return_transaction(loan["transaction_id"])
+    assert returned["held_for"] == members[2]
+    assert hold_statuses(lms, book_id) == {members[1]: holds.FULFILLED, members[2]: holds.READY}
+
+
+def test_uncollected_hold_expires_and_passes_the_copy_on(lms, queued):
+    book_id, members = queued["book_id"], queued["members"]
+    lms.return_transaction(queued["loan"])
+    overdue = date.today() - timedelta(days=4)
+    lms.execute_query("UPDATE holds SET ReadyOn = %s WHERE Status = 'ready'", (overdue,))
+
+    report = lms.holds.expire()
+    assert (report.expired, report.passed_on) == (1, 1)
+    assert hold_statuses(lms, book_id) == {members[1]: holds.EXPIRED, members[2]: holds.READY}
+
+    lms.execute_query("UPDATE holds SET ReadyOn = %s WHERE Status = 'ready'", (overdue,))
+    report = lms.holds.expire()
+    assert (report.expired, report.passed_on) == (1, 0)
+    assert lms.inventory.availability(book_id) == (1, 1)
+
+
+def test_member_with_the_title_on_loan_is_passed_over(lms):
+    members = make_members(lms, 3)
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0, copies=2)
+    lms.issue(book_id, members[0])
+    loan = lms.issue(book_id, members[1])["transaction_id"]
+    # A hold left behind by data loaded outside the application
+    lms.execute_query(holds.HOLD_INSERT_QUERY, (book_id, members[0]))
+    lms.holds.place(book_id, members[2])
+
+    returned = lms.return_transaction(loan)
+    assert returned["held_for"] == members[2]
+    assert hold_statuses(lms, book_id) == {members[0]: holds.WAITING, members[2]: holds.READY}
+
+
+def test_taking_a_shelf_copy_fulfils_the_members_waiting_hold(lms):
+    member_id, other = make_members(lms, 2)
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0, copies=2)
+    lms.execute_query(holds.HOLD_INSERT_QUERY, (book_id, member_id))
+    lms.issue(book_id, member_id)
+    assert hold_statuses(lms, book_id) == {member_id: holds.FULFILLED}
+
+    # The fulfilled hold does not claim the next copy that comes back
+    loan = lms.issue(book_id, other)["transaction_id"]
+    assert lms.return_transaction(loan)["hold_id"] is None
+    assert lms.inventory.availability(book_id) == (1, 2)
+
+
+def test_new_copies_go_to_waiting_holds_before_the_shelf(lms, queued):
+    book_id, members = queued["book_id"], queued["members"]
+
+    passed_to = lms.inventory.add_copies(book_id, 3)
+    assert [member_id for _, member_id in passed_to] == members[1:3]
+    assert lms.inventory.availability(book_id) == (1, 4)
+    assert lms.holds.queue_length(book_id) == 0
+    lms.issue(book_id, members[3])
+    assert lms.inventory.availability(book_id) == (0, 4)
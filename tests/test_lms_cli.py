@@ -0,0 +1,57 @@
+# test_lms_cli.py
+# lms.py batch mode: one result per line, bad lines reported and skipped, exit status (SQLite backend)
+
+import io
+import json
+
+import pytest
+
+from lms import CommandLine, main
+
+
+@pytest.fixture
+def cli(lms):
+    """A JSON command line running against the test library."""
+    command_line = CommandLine(as_json=True, out=io.StringIO())
+    command_line.lms = lms
+    return command_line
+
+
+def results(cli):
+    return [json.loads(line) for line in cli.out.getvalue().splitlines()]
+
+
+def test_batch_runs_every_line_and_reports_failures(lms, cli):
+    member_id = lms.create_member("Ada", "Reader", "ada@example.com", "5550101001")
+    book_id = lms.create_book("The Left Hand of Darkness", "Ursula K. Le Guin", "Fiction", 1969, 9.99)
+    lines = ["# morning returns and loans",
+             'search "le guin" --limit 5',
+             f"issue {book_id} {member_id}",
+             "",
+             f"issue {book_id} {member_id}",
+             "issue twelve 7",
+             "return 1",
+             "report top-books --limit 1"]
+
+    assert cli.run_batch(lines) == (4, 2)
+
+    output = results(cli)
+    assert [(entry["line"], entry["command"], entry["ok"]) for entry in output] == [
+        (2, "search", True), (3, "issue", True), (5, "issue", False), (6, "parse", False),
+        (7, "return", True), (8, "report", True)]
+    assert output[0]["total"] == 1 and output[0]["results"][0]["id"] == book_id
+    assert "already has a copy" in output[2]["error"]
+    assert output[5]["rows"] == [{"Title": "The Left Hand of Darkness", "Author": "Ursula K. Le Guin",
+                                  "Times Issued": 1}]
+
+
+def test_batch_stops_at_the_first_failure_when_asked(cli):
+    assert cli.run_batch(["return 99", 'search "anything"'], stop_on_error=True) == (0, 1)
+    assert [entry["command"] for entry in results(cli)] == ["return"]
+
+
+def test_usage_error_exits_with_status_2(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["issue", "twelve", "7"])
+    assert exit_info.value.code == 2
+    assert "invalid int value" in capsys.readouterr().err
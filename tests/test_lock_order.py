@@ -0,0 +1,120 @@
+# test_lock_order.py
+# The order in which circulation paths lock rows, recorded statement by statement. SQLite runs one
+# writer at a time, so this is what guards the MySQL row-lock order against deadlocks.
+
+import re
+from typing import Any, List
+
+import pytest
+
+# Statements that lock the rows they touch on MySQL/InnoDB
+_LOCKING = re.compile(r"^\s*(?:SELECT\b.*?\bFROM\s+(\w+).*\bFOR\s+UPDATE\b|UPDATE\s+(\w+)|INSERT\s+INTO\s+(\w+)"
+                      r"|DELETE\s+FROM\s+(\w+))", re.IGNORECASE | re.DOTALL)
+ORDERED_TABLES = ("member_status", "book_inventory", "holds")
+
+
+class RecordingCursor:
+    """Passes statements through to the real cursor and keeps the MySQL-flavoured SQL in order."""
+
+    def __init__(self, cursor: Any, statements: List[str]):
+        self._cursor = cursor
+        self.statements = statements
+
+    def execute(self, query: str, params: Any = ()) -> Any:
+        self.statements.append(query)
+        return self._cursor.execute(query, params)
+
+    def executemany(self, query: str, seq_of_params: Any) -> Any:
+        self.statements.append(query)
+        return self._cursor.executemany(query, seq_of_params)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+@pytest.fixture
+def recorded(lms, monkeypatch):
+    """Statements run on transaction cursors from here on."""
+    statements: List[str] = []
+    wrap = lms.profiler.cursor
+    monkeypatch.setattr(lms.profiler, "cursor", lambda cursor: RecordingCursor(wrap(cursor), statements))
+    return statements
+
+
+def lock_order(statements: List[str]) -> List[str]:
+    """The guarded tables in the order their rows are first locked."""
+    order = []
+    for statement in statements:
+        match = _LOCKING.match(statement)
+        table = match and next(name for name in match.groups() if name)
+        if table in ORDERED_TABLES and table not in order:
+            order.append(table)
+    return order
+
+
+def first_lock(statements: List[str], table: str) -> str:
+    return next(s for s in statements if _LOCKING.match(s) and re.search(rf"\b{table}\b", s))
+
+
+@pytest.fixture
+def title_on_loan(lms):
+    """A one-copy title on loan to one member while another member waits for it."""
+    borrower, waiting = (lms.create_member("Patron", f"Test{i}", f"patron{i}@example.com", "555-0100")
+                         for i in range(2))
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0)
+    loan = lms.issue(book_id, borrower)["transaction_id"]
+    lms.holds.place(book_id, waiting)
+    return {"book_id": book_id, "borrower": borrower, "waiting": waiting, "loan": loan}
+
+
+def test_issue_locks_member_then_title_then_holds(lms, recorded):
+    member_id = lms.create_member("Ada", "Reader", "ada@example.com", "555-0101")
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0)
+    recorded.clear()
+
+    lms.issue(book_id, member_id)
+
+    assert lock_order(recorded) == list(ORDERED_TABLES)
+    assert "FOR UPDATE" in first_lock(recorded, "member_status")
+    assert "FOR UPDATE" in first_lock(recorded, "book_inventory")
+
+
+def test_return_locks_member_then_title_then_holds(lms, title_on_loan, recorded):
+    recorded.clear()
+
+    assert lms.return_transaction(title_on_loan["loan"])["held_for"] == title_on_loan["waiting"]
+
+    assert lock_order(recorded) == list(ORDERED_TABLES)
+    # The loan row itself is the first lock; it is no other path's member or title row
+    assert re.match(r"\s*UPDATE transactions", recorded[0])
+
+
+def test_placing_a_hold_locks_member_then_title_then_holds(lms, recorded):
+    borrower, member_id = (lms.create_member("Patron", f"Test{i}", f"patron{i}@example.com", "555-0100")
+                           for i in range(2))
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0)
+    lms.issue(book_id, borrower)
+    recorded.clear()
+
+    lms.holds.place(book_id, member_id)
+
+    assert lock_order(recorded) == list(ORDERED_TABLES)
+
+
+@pytest.mark.parametrize("action", ["cancel", "expire", "add_copies"])
+def test_title_paths_lock_the_title_before_its_holds(lms, title_on_loan, recorded, action):
+    book_id = title_on_loan["book_id"]
+    if action == "add_copies":
+        recorded.clear()
+        lms.inventory.add_copies(book_id, 1)
+    else:
+        lms.return_transaction(title_on_loan["loan"])
+        lms.execute_query("UPDATE holds SET ReadyOn = '2000-01-01' WHERE Status = 'ready'")
+        recorded.clear()
+        if action == "cancel":
+            hold_id = lms.execute_query("SELECT ID FROM holds", fetch=True)[0][0]
+            lms.holds.cancel(hold_id)
+        else:
+            assert lms.holds.expire().expired == 1
+
+    assert lock_order(recorded) == ["book_inventory", "holds"]
@@ -0,0 +1,50 @@
+# test_logging_setup.py
+# JSON log lines with extra fields, and queued records written by the listener thread
+
+import json
+import logging
+
+import pytest
+
+from logging_setup import JSONFormatter, configure_logging, stop_logging
+
+
+@pytest.fixture
+def json_log(tmp_path):
+    """A fresh pipeline writing JSON lines to a temp file; the shared one is rebuilt by the next library."""
+    stop_logging()
+    path = tmp_path / "app.log"
+    configure_logging({"level": "INFO", "format": "%(message)s", "file": str(path), "json": True,
+                       "rotation": None, "console": False, "flush_interval": 60})
+    yield path
+    stop_logging()
+
+
+def lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_extra_fields_and_exceptions_become_json_keys():
+    record = logging.LogRecord("lms", logging.ERROR, __file__, 1, "Book issued: %s", ("Dune",), None)
+    record.book_id = 7
+    record.when = object()  # not JSON-serializable: written as its str()
+    entry = json.loads(JSONFormatter().format(record))
+    assert (entry["level"], entry["logger"], entry["message"], entry["book_id"]) == ("ERROR", "lms",
+                                                                                     "Book issued: Dune", 7)
+    assert entry["when"].startswith("<object object")
+
+
+def test_queued_records_are_written_when_the_listener_stops(json_log):
+    logger = logging.getLogger("lms.test")
+    logger.info("Book returned: %s", "Dune", extra={"transaction_id": 3})
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        logger.exception("Import failed")
+    assert not json_log.exists()  # still queued: the listener only wakes every flush_interval
+
+    stop_logging()
+
+    returned, failed = [entry for entry in lines(json_log) if entry["logger"] == "lms.test"]
+    assert (returned["message"], returned["transaction_id"]) == ("Book returned: Dune", 3)
+    assert failed["level"] == "ERROR" and "ValueError: bad row" in failed["exception"]
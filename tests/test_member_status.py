@@ -0,0 +1,74 @@
+# test_member_status.py
+# Borrowing checks, lazy rows for members added outside the app, and verify/rebuild (SQLite backend)
+
+from datetime import date, timedelta
+
+import pytest
+
+from config import APP_CONFIG
+from errors import CirculationError
+
+
+def status_of(lms, member_id):
+    rows = lms.execute_query("SELECT open_loans, unpaid_fines FROM member_status WHERE MemberID = %s",
+                             (member_id,), fetch=True)
+    return (rows[0][0], float(rows[0][1])) if rows else None
+
+
+def test_member_at_loan_limit_cannot_borrow(lms, monkeypatch):
+    monkeypatch.setitem(APP_CONFIG, "max_books_per_member", 2)
+    member_id = lms.create_member("Ada", "Reader", "ada@example.com", "555-0101")
+    books = [lms.create_book(f"Title {i}", "Author", "Fiction", 2000, 5.0) for i in range(3)]
+    lms.issue(books[0], member_id)
+    lms.issue(books[1], member_id)
+
+    with pytest.raises(CirculationError, match="maximum limit of 2"):
+        lms.issue(books[2], member_id)
+    assert status_of(lms, member_id) == (2, 0.0)
+
+
+def test_member_over_fine_limit_cannot_borrow_until_paid(lms, monkeypatch):
+    monkeypatch.setitem(APP_CONFIG, "max_unpaid_fines", 10.0)
+    member_id = lms.create_member("Ada", "Reader", "ada@example.com", "555-0101")
+    first, second = (lms.create_book(f"Title {i}", "Author", "Fiction", 2000, 5.0) for i in range(2))
+    loan = lms.issue(first, member_id)["transaction_id"]
+    lms.execute_query("UPDATE transactions SET IssueDate = %s WHERE ID = %s",
+                      (date.today() - timedelta(days=20), loan))
+    lms.return_transaction(loan)
+
+    with pytest.raises(CirculationError, match="unpaid fines"):
+        lms.issue(second, member_id)
+    lms.pay_fine(loan)
+    lms.issue(second, member_id)
+    assert status_of(lms, member_id) == (1, 0.0)
+
+
+def test_member_added_with_raw_sql_gets_a_row_on_first_issue(lms):
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0)
+    lms.execute_query("INSERT INTO members (FirstName, LastName, Email, Phone) VALUES (%s, %s, %s, %s)",
+                      ("Raw", "Insert", "raw@example.com", "555-0102"))
+    member_id = lms.execute_query("SELECT ID FROM members WHERE Email = %s", ("raw@example.com",),
+                                  fetch=True)[0][0]
+    assert status_of(lms, member_id) is None
+
+    lms.issue(book_id, member_id)
+    assert status_of(lms, member_id) == (1, 0.0)
+    assert lms.member_status.verify() == []
+
+
+def test_unknown_member_cannot_borrow(lms):
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0)
+    with pytest.raises(CirculationError, match="Member ID not found"):
+        lms.issue(book_id, 999)
+
+
+def test_verify_reports_drift_and_rebuild_repairs_it(lms):
+    member_id = lms.create_member("Ada", "Reader", "ada@example.com", "555-0101")
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0)
+    lms.issue(book_id, member_id)
+    lms.execute_query("UPDATE member_status SET open_loans = 3 WHERE MemberID = %s", (member_id,))
+
+    assert [tuple(row[:2]) for row in lms.member_status.verify()] == [(member_id, 3)]
+    lms.member_status.rebuild()
+    assert lms.member_status.verify() == []
+    assert status_of(lms, member_id) == (1, 0.0)
@@ -0,0 +1,34 @@
+# test_migrations.py
+# Every migration applied once and recorded, and the hot queries use their indexes (SQLite backend)
+
+import sqlite3
+
+import pytest
+
+from migrations import MIGRATIONS, Migration, MigrationRunner
+
+
+def test_all_migrations_are_applied_and_not_rerun(lms):
+    runner = MigrationRunner(lms)
+    assert runner.current_version() == MIGRATIONS[-1].version
+    with lms.pool.connection() as connection:
+        assert runner.applied_versions(connection) == [m.version for m in MIGRATIONS]
+        assert runner.pending(connection) == []
+        assert runner.migrate(connection) == []
+
+
+def test_failed_migration_is_not_recorded(lms):
+    good = Migration(100, "Scratch table", {"default": ("CREATE TABLE scratch (ID INT PRIMARY KEY)",)})
+    bad = Migration(101, "Broken", {"default": ("CREATE INDEX idx_missing ON no_such_table (ID)",)})
+    runner = MigrationRunner(lms, MIGRATIONS + [good, bad])
+
+    with pytest.raises(sqlite3.OperationalError):
+        runner.migrate()
+    assert runner.current_version() == 100
+    with lms.pool.connection() as connection:
+        assert runner.pending(connection) == [bad]
+
+
+def test_hot_queries_use_their_indexes(lms):
+    missing = [(check.name, check.plan) for check in MigrationRunner(lms).explain_check() if not check.ok]
+    assert missing == []
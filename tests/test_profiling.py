@@ -0,0 +1,74 @@
+# test_profiling.py
+# Statement timings, round trips per operation and the slow-query log, against a fake cursor
+
+import logging
+import time
+
+from profiling import QueryProfiler, normalize_statement
+
+
+class FakeCursor:
+    """Returns ``rows`` from every fetch; ``delay`` slows down execute."""
+
+    def __init__(self, rows=(), delay=0.0):
+        self.rows = list(rows)
+        self.delay = delay
+        self.rowcount = -1
+        self.closed = False
+
+    def execute(self, query, params=()):
+        time.sleep(self.delay)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def close(self):
+        self.closed = True
+
+
+def test_equivalent_statements_aggregate_together():
+    assert normalize_statement("SELECT *\n   FROM books WHERE ID IN (%s, %s,%s)") == \
+        "SELECT * FROM books WHERE ID IN (%s, ...)"
+
+
+def test_statements_and_rows_are_counted_per_operation():
+    profiler = QueryProfiler(enabled=True)
+    with profiler.operation("report"):
+        with profiler.operation("nested"):  # folded into the outer operation
+            cursor = profiler.cursor(FakeCursor(rows=[(1,), (2,)]))
+            cursor.execute("SELECT ID FROM books")
+            assert cursor.fetchall() == [(1,), (2,)]
+            cursor.execute("SELECT ID FROM books")
+            cursor.fetchone()
+            cursor.close()
+
+    assert list(profiler.operation_stats()) == ["report"]
+    assert profiler.operation_stats()["report"]["round_trips"] == 2
+    [statement] = profiler.top_statements()
+    assert (statement["statement"], statement["calls"], statement["rows"]) == ("SELECT ID FROM books", 2, 3)
+
+
+def test_slow_statements_are_logged_with_profiling_off(caplog):
+    profiler = QueryProfiler(enabled=False, slow_query_ms=5)
+    cursor = profiler.cursor(FakeCursor(delay=0.01))
+    with caplog.at_level(logging.WARNING, logger="profiling"):
+        cursor.execute("SELECT   SLEEP(1)")
+        cursor.close()
+    [record] = caplog.records
+    assert record.getMessage().startswith("Slow query") and record.getMessage().endswith("): SELECT SLEEP(1)")
+    assert profiler.top_statements() == []
+
+
+def test_circulation_operations_report_their_round_trips(lms):
+    lms.profiler.enabled = True
+    member_id = lms.create_member("Ada", "Reader", "ada@example.com", "5550101001")
+    book_id = lms.create_book("Title", "Author", "Fiction", 2000, 5.0)
+    lms.issue(book_id, member_id)
+
+    stats = lms.profiler.operation_stats()
+    assert stats["issue"]["calls"] == 1
+    assert stats["issue"]["round_trips"] >= 5
+    assert "issue" in lms.profiler.report()
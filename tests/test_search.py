@@ -0,0 +1,88 @@
+# test_search.py
+# Search index freshness when another process changes the catalog (SQLite backend)
+
+from app import LibraryManagementSystem
+from backends import SQLiteBackend
+
+
+def other_process(lms):
+    """A second library on the same database file, standing in for another process."""
+    return LibraryManagementSystem(backend=SQLiteBackend({"path": lms.backend.path, "auto_migrate": True}))
+
+
+def titles(lms, keyword):
+    return [row[1] for row in lms.search(keyword)[1]]
+
+
+def test_sees_books_added_and_edited_elsewhere(lms):
+    lms.create_book("Dune", "Frank Herbert", "Fiction", 1965, 9.99)
+    assert titles(lms, "dune") == ["Dune"]
+
+    other = other_process(lms)
+    added = other.create_book("Dune Messiah", "Frank Herbert", "Fiction", 1969, 9.99)
+    assert sorted(titles(lms, "dune")) == ["Dune", "Dune Messiah"]
+
+    other.update_book(added, {"title": "Children of Dune"})
+    assert sorted(titles(lms, "dune")) == ["Children of Dune", "Dune"]
+    assert titles(lms, "messiah") == []
+
+    other.delete_book(added)
+    assert titles(lms, "dune") == ["Dune"]
+    other.pool.close_all()
+
+
+def test_sees_books_inserted_with_plain_sql(lms):
+    lms.create_book("Neuromancer", "William Gibson", "Fiction", 1984, 7.50)
+    assert titles(lms, "gibson") == ["Neuromancer"]
+    lms.execute_query(lms.BOOK_INSERT_QUERY, ("Count Zero", "William Gibson", "Fiction", 1986, 7.50))
+    assert sorted(titles(lms, "gibson")) == ["Count Zero", "Neuromancer"]
+
+
+def test_own_writes_patch_the_index_without_a_rebuild(lms):
+    lms.create_book("Foundation", "Isaac Asimov", "Fiction", 1951, 6.00)
+    index = lms.search_index
+    book_id = lms.create_book("Foundation and Empire", "Isaac Asimov", "Fiction", 1952, 6.00)
+    lms.update_book(book_id, {"genre": "Science Fiction"})
+    assert lms.search_index is index
+    assert len(titles(lms, "foundation")) == 2
+
+
+def catalog_version(lms):
+    return lms.execute_query("SELECT version FROM catalog_version", fetch=True)[0][0]
+
+
+def test_changes_elsewhere_patch_the_index_in_place(lms):
+    kept = lms.create_book("Hyperion", "Dan Simmons", "Fiction", 1989, 8.00)
+    index = lms.search_index
+
+    other = other_process(lms)
+    renamed = other.create_book("Endymion", "Dan Simmons", "Fiction", 1996, 8.00)
+    other.update_book(renamed, {"title": "The Rise of Endymion"})
+    other.delete_book(kept)
+    lms.execute_query(lms.BOOK_INSERT_QUERY, ("Ilium", "Dan Simmons", "Fiction", 2003, 8.00))
+
+    assert sorted(titles(lms, "simmons")) == ["Ilium", "The Rise of Endymion"]
+    assert lms.search_index is index
+    other.pool.close_all()
+
+
+def test_price_change_leaves_the_catalog_version_alone(lms):
+    book_id = lms.create_book("Snow Crash", "Neal Stephenson", "Fiction", 1992, 8.00)
+    index, version = lms.search_index, catalog_version(lms)
+
+    lms.update_book(book_id, {"price": 9.50, "year": 1993})
+    assert catalog_version(lms) == version
+    assert lms.search_index is index
+    assert lms.search("snow")[1][0][5] == 9.50
+
+
+def test_unrecorded_catalog_change_rebuilds_the_index(lms):
+    lms.create_book("Solaris", "Stanislaw Lem", "Fiction", 1961, 8.00)
+    index = lms.search_index
+    lms.execute_query("UPDATE books SET title = %s", ("Fiasco",))
+
+    other = other_process(lms)
+    other.catalog_changed()
+    assert titles(lms, "fiasco") == ["Fiasco"]
+    assert lms.search_index is not index
+    other.pool.close_all()
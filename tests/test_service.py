@@ -0,0 +1,21 @@
+# test_service.py
+# LibraryService.call used directly, without serve() (SQLite backend)
+
+import asyncio
+
+from service import LibraryService
+
+
+def test_call_without_serve_releases_its_slot(lms):
+    service = LibraryService(lms, workers=2, max_pending=4)
+
+    async def run():
+        book_id = await service.call(lms.create_book, "Piranesi", "Susanna Clarke", "Fiction", 2020, 12.0)
+        await asyncio.sleep(0.05)  # let the done callback reach the loop
+        return book_id
+
+    try:
+        assert asyncio.run(run()) > 0
+        assert service.pending == 0
+    finally:
+        service.executor.shutdown()